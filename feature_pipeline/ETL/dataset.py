@@ -0,0 +1,291 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence, Tuple
+
+
+# Nanoseconds in an hour, to floor int64 epoch timestamps to the hour
+HOUR_NS = 3600 * 10**9
+
+
+def hourly_grid(datetimes: List[pd.Series]) -> Tuple[int, int]:
+    '''
+    Returns the hourly UTC grid spanning datetimes, as its first hour (epoch nanoseconds) and its number of hours.
+    '''
+    epochs = [pd.DatetimeIndex(column).as_unit('ns').asi8 for column in datetimes if len(column)]
+    if not epochs:
+        return 0, 0
+    start = min(column.min() for column in epochs) // HOUR_NS * HOUR_NS
+    end = max(column.max() for column in epochs)
+    return start, int((end - start) // HOUR_NS + 1)
+
+
+def grid_positions(datetimes: pd.Series, grid_start: int, grid_hours: int, name: str) -> np.ndarray:
+    '''
+    Returns the position of every datetime on the hourly grid, or -1 for the datetimes outside the grid and those not
+    on the hour, which are reported.
+    '''
+    epochs = pd.DatetimeIndex(datetimes).as_unit('ns').asi8
+    positions = (epochs - grid_start) // HOUR_NS
+    off_hour = (epochs - grid_start) % HOUR_NS != 0
+    if off_hour.any():
+        print(f'{name}: {int(off_hour.sum())} rows are not on the hour and are left out.')
+    positions[off_hour | (positions < 0) | (positions >= grid_hours)] = -1
+    return positions
+
+
+def _rows_on_grid(positions: np.ndarray, grid_hours: int) -> np.ndarray:
+    '''
+    Returns, for every hour of the grid, the row with that position (from grid_positions), or -1.
+    '''
+    rows = np.full(grid_hours, -1, dtype='int64')
+    on_grid = positions >= 0
+    rows[positions[on_grid]] = np.flatnonzero(on_grid)
+    return rows
+
+
+def rows_of_hours(hours: pd.Series, datetimes: pd.Series, name: str) -> np.ndarray:
+    '''
+    Returns, for every datetime, the row of the distinct hours holding it, or -1, by the positions of both on the
+    hourly grid instead of a hash join on the timestamps.
+    '''
+    grid_start, grid_hours = hourly_grid([hours, datetimes])
+    grid_rows = _rows_on_grid(grid_positions(hours, grid_start, grid_hours, 'hours'), grid_hours)
+    positions = grid_positions(datetimes, grid_start, grid_hours, name)
+    return np.where(positions >= 0, grid_rows[positions], -1)
+
+
+class HourlyZoneDataset:
+    '''
+    Hourly features of the bidding zones as one dense array of (hour, variable, zone), over sorted distinct UTC hours,
+    with the flows as rows of (hour, border) on top. The array is stored variable-major, so the pivoted model matrix
+    (a column per variable and zone, in the column order of the pivoted frames), the features of a zone and the
+    features of a run of variables are views of it, without copying.
+    '''
+
+    def __init__(
+        self,
+        datetimes: pd.DatetimeIndex,
+        variables: Sequence[str],
+        zones: Sequence[str],
+        values: np.ndarray,
+        present: Optional[np.ndarray] = None
+    ):
+        self.datetimes = datetimes
+        self.variables = list(variables)
+        self.zones = list(zones)
+        # (hour, variable, zone)
+        self._values = values
+        # (variable, zone) columns with at least one value, the columns of the pivoted frames
+        self.present = np.ones(values.shape[1:], dtype=bool) if present is None else present
+        # flow rows: the flow frame, and the hour (row of the array) and border (index in borders) of every row
+        self.flows: Optional[pd.DataFrame] = None
+        self.flow_hours = np.array([], dtype='int64')
+        self.flow_borders = np.array([], dtype='int64')
+        self.borders: List[Tuple[str, str]] = []
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, columns: list) -> 'HourlyZoneDataset':
+        '''
+        Builds the dataset from a long frame with a row per (datetime, country_code), like pivot_table: the variables
+        are the sorted value columns, the zones the sorted country codes, and the datetimes and columns without any
+        value are left out. Duplicated (datetime, country_code) pairs (e.g. a repeated hour around a DST change) are
+        reported and averaged.
+        '''
+        keys = ["datetime", "country_code"]
+        variables = sorted(column for column in columns if column not in keys)
+        # like pivot_table: skip the rows without a key
+        df_keys = df.dropna(subset=keys) if df[keys].isna().any(axis=None) else df
+        datetime_codes, datetimes = pd.factorize(df_keys["datetime"], sort=True)
+        zone_codes, zones = pd.factorize(df_keys["country_code"], sort=True)
+        long_values = df_keys[variables].to_numpy()
+        if long_values.dtype.kind != 'f':
+            long_values = long_values.astype('float64')
+
+        values = np.full((len(datetimes), len(variables), len(zones)), np.nan, dtype=long_values.dtype)
+        cells = datetime_codes * len(zones) + zone_codes
+        counts = np.bincount(cells, minlength=len(datetimes) * len(zones))
+        if counts.max(initial=0) > 1:
+            duplicated = df_keys.duplicated(subset=keys, keep=False)
+            print(f'{int(duplicated.sum())} rows share a (datetime, country_code) pair, averaging them:')
+            print(df_keys.loc[duplicated, keys].value_counts().head(10).to_string())
+            # the mean of the values of every pair, without the missing values (like pivot_table)
+            for variable, column in enumerate(long_values.T):
+                valid = ~np.isnan(column)
+                sums = np.bincount(cells[valid], weights=column[valid], minlength=len(counts))
+                with np.errstate(invalid='ignore'):
+                    means = sums / np.bincount(cells[valid], minlength=len(counts))
+                values[:, variable, :] = means.reshape(len(datetimes), len(zones))
+        else:
+            values.transpose(0, 2, 1)[datetime_codes, zone_codes] = long_values
+
+        # like pivot_table: leave out the datetimes and the columns without any value
+        has_value = ~np.isnan(values)
+        rows = has_value.any(axis=(1, 2))
+        if not rows.all():
+            values, datetimes = values[rows], datetimes[rows]
+        return cls(pd.DatetimeIndex(datetimes), variables, [str(zone) for zone in zones], values, has_value.any(axis=0))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, zones: Sequence[str]) -> 'HourlyZoneDataset':
+        '''
+        Builds the dataset from a pivoted frame with a row per hour, like to_frame without flows returns it (e.g. the
+        hourly_features feature group): 'datetime' and a '<variable>_<zone>' column per variable and zone, where zones
+        are the zone names in the columns. Missing (variable, zone) columns are not present.
+        '''
+        if not df['datetime'].is_monotonic_increasing:
+            df = df.sort_values('datetime')
+        # the longest zone a column ends with, so e.g. 'de_lu' is not taken for a zone 'lu'
+        zones = sorted(zones, key=len, reverse=True)
+        cells = {}
+        for column in df.columns.drop('datetime'):
+            zone = next((zone for zone in zones if column.endswith(f'_{zone}')), None)
+            if zone is None:
+                raise ValueError(f'Column {column} does not end with one of the zones {sorted(zones)}.')
+            cells[column] = (column[:-len(zone) - 1], zone)
+        variables = list(dict.fromkeys(variable for variable, _ in cells.values()))
+        zones = sorted({zone for _, zone in cells.values()})
+        column_values = df[list(cells)].to_numpy()
+        if column_values.dtype.kind != 'f':
+            column_values = column_values.astype('float64')
+
+        variable_indexes = np.array([variables.index(variable) for variable, _ in cells.values()], dtype='int64')
+        zone_indexes = np.array([zones.index(zone) for _, zone in cells.values()], dtype='int64')
+        present = np.zeros((len(variables), len(zones)), dtype=bool)
+        present[variable_indexes, zone_indexes] = True
+        if np.array_equal(variable_indexes * len(zones) + zone_indexes, np.arange(present.size)):
+            # the columns are the whole model matrix in its order: one copy into the array
+            values = np.array(column_values, order='C').reshape(len(df), len(variables), len(zones))
+        else:
+            values = np.full((len(df), len(variables), len(zones)), np.nan, dtype=column_values.dtype)
+            values[:, variable_indexes, zone_indexes] = column_values
+        return cls(pd.DatetimeIndex(df['datetime']), variables, zones, values, present)
+
+    @property
+    def values(self) -> np.ndarray:
+        '''
+        The (hour, zone, variable) array, as a view.
+        '''
+        return self._values.transpose(0, 2, 1)
+
+    @property
+    def columns(self) -> List[str]:
+        '''
+        The '<variable>_<zone>' names of the present columns of the model matrix.
+        '''
+        return [f"{var}_{zone}" for var, zone_present in zip(self.variables, self.present) for zone, present in zip(self.zones, zone_present) if present]
+
+    def model_matrix(self, variables: Optional[List[str]] = None) -> np.ndarray:
+        '''
+        Returns the (hour, variable x zone) model matrix of all (or the given) variables, with the columns in the order
+        of the pivoted frames. It is a view of the array when the variables are a run of the variable axis (like all of
+        them), else a copy. Columns that are not present are included (all missing).
+        '''
+        block = self._values
+        if variables is not None:
+            indexes = [self.variables.index(variable) for variable in variables]
+            if indexes == list(range(indexes[0], indexes[0] + len(indexes))):
+                block = block[:, indexes[0]:indexes[-1] + 1]
+            else:
+                block = block[:, indexes]
+        return block.reshape(len(self.datetimes), -1)
+
+    def zone(self, zone: str) -> np.ndarray:
+        '''
+        Returns the (hour, variable) features of a zone, as a view.
+        '''
+        return self._values[:, :, self.zones.index(zone)]
+
+    def border(self, country_from: str, country_to: str) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Returns the hours (rows of the array) and the energy_sent of the flow rows of a border.
+        '''
+        rows = np.flatnonzero(self.flow_borders == self.borders.index((country_from, country_to)))
+        return self.flow_hours[rows], self.flows['energy_sent'].to_numpy()[rows]
+
+    def missing_hours(self) -> int:
+        '''
+        Returns the number of hours without data between the first and the last hour.
+        '''
+        if not len(self.datetimes):
+            return 0
+        epochs = self.datetimes.as_unit('ns').asi8
+        return int((epochs[-1] - epochs[0]) // HOUR_NS + 1 - len(epochs))
+
+    def fillna(self, value: float) -> 'HourlyZoneDataset':
+        '''
+        Fills the missing values in place, and returns the dataset.
+        '''
+        self._values[np.isnan(self._values)] = value
+        return self
+
+    def join(self, other: 'HourlyZoneDataset', name: str = 'dataset', other_name: str = 'other') -> 'HourlyZoneDataset':
+        '''
+        Joins the variables of another dataset for the hours of both (an inner join), by the positions of the hours on
+        a shared hourly grid. Zones of only one of them get missing values, and are not present, for the other.
+        '''
+        grid_start, grid_hours = hourly_grid([self.datetimes, other.datetimes])
+        positions = grid_positions(self.datetimes, grid_start, grid_hours, name)
+        other_rows = _rows_on_grid(grid_positions(other.datetimes, grid_start, grid_hours, other_name), grid_hours)
+        other_rows = np.where(positions >= 0, other_rows[positions], -1)
+        rows = np.flatnonzero(other_rows >= 0)
+        zones = sorted(set(self.zones) | set(other.zones))
+
+        # both arrays are taken into the joined array, variables of self first
+        variables = self.variables + other.variables
+        dtype = np.result_type(self._values.dtype, other._values.dtype)
+        values = np.full((len(rows), len(variables), len(zones)), np.nan, dtype=dtype)
+        present = np.zeros((len(variables), len(zones)), dtype=bool)
+        offset = 0
+        for dataset, hour_rows in ((self, rows), (other, other_rows[rows])):
+            block = values[:, offset:offset + len(dataset.variables)]
+            zone_indexes = [zones.index(zone) for zone in dataset.zones]
+            if dataset.zones == zones:
+                np.take(dataset._values, hour_rows, axis=0, out=block, mode='clip')
+            else:
+                block[:, :, zone_indexes] = dataset._values[hour_rows]
+            present[offset:offset + len(dataset.variables), zone_indexes] = dataset.present
+            offset += len(dataset.variables)
+        return HourlyZoneDataset(self.datetimes[rows], variables, zones, values, present)
+
+    def dropna(self) -> 'HourlyZoneDataset':
+        '''
+        Returns the dataset without the hours with a missing value in a present column.
+        '''
+        complete = ~(np.isnan(self._values) & self.present).any(axis=(1, 2))
+        if complete.all():
+            return self
+        return HourlyZoneDataset(self.datetimes[complete], self.variables, self.zones, self._values[complete], self.present)
+
+    def with_flows(self, df_flow: pd.DataFrame) -> 'HourlyZoneDataset':
+        '''
+        Returns the dataset (sharing the array) with the flow rows of its hours without missing values, in datetime
+        order. The rows keep the order of df_flow within an hour.
+        '''
+        hours = rows_of_hours(self.datetimes, df_flow['datetime'], 'flow')
+        rows = np.flatnonzero((hours >= 0) & df_flow.notna().all(axis=1).to_numpy())
+        if np.any(hours[rows][1:] < hours[rows][:-1]):
+            rows = rows[np.argsort(hours[rows], kind='stable')]
+
+        dataset = HourlyZoneDataset(self.datetimes, self.variables, self.zones, self._values, self.present)
+        dataset.flows = df_flow.take(rows).reset_index(drop=True)
+        dataset.flow_hours = hours[rows]
+        # the borders in order of appearance, from the codes of the (country_from, country_to) pairs
+        from_codes, countries_from = pd.factorize(dataset.flows['country_from'])
+        to_codes, countries_to = pd.factorize(dataset.flows['country_to'])
+        dataset.flow_borders, pairs = pd.factorize(from_codes.astype('int64') * len(countries_to) + to_codes)
+        dataset.borders = [(str(countries_from[pair // len(countries_to)]), str(countries_to[pair % len(countries_to)])) for pair in pairs]
+        return dataset
+
+    def to_frame(self) -> pd.DataFrame:
+        '''
+        Returns the pivoted frame: 'datetime' and the present columns of the model matrix, or with flows the flow rows
+        (datetime, country_from, country_to, energy_sent) followed by the model matrix row of their hour.
+        '''
+        matrix = self.model_matrix()
+        if not self.present.all():
+            matrix = matrix[:, self.present.ravel()]
+        if self.flows is None:
+            df = pd.DataFrame(matrix, columns=self.columns, copy=False)
+            df.insert(0, 'datetime', self.datetimes)
+            return df
+        return pd.concat([self.flows, pd.DataFrame(matrix[self.flow_hours], columns=self.columns, copy=False)], axis=1)
@@ -0,0 +1,259 @@
+import io
+import numpy as np
+import pandas as pd
+import xml.etree.ElementTree as ET
+from entsoe import EntsoePandasClient, EntsoeRawClient
+from entsoe import parsers as entsoe_parsers
+from entsoe.exceptions import NoMatchingDataError
+from entsoe.mappings import PSRTYPE_MAPPINGS, lookup_area
+from entsoe.misc import year_blocks
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+
+# ENTSO-E resolutions of the price, generation and flow documents, as the step in nanoseconds and the pandas frequency
+RESOLUTIONS = {
+    'PT15M': (15 * 60 * 10**9, '15min'),
+    'PT30M': (30 * 60 * 10**9, '30min'),
+    'PT60M': (60 * 60 * 10**9, '60min'),
+}
+# Elements holding the value of a point in the supported document types
+VALUE_ELEMENTS = ('quantity', 'price.amount')
+
+
+def _local_name(tag: str) -> str:
+    '''
+    Strips the XML namespace from an element tag.
+    '''
+    return tag.rpartition('}')[2]
+
+
+def _iter_timeseries(xml_text: Union[str, bytes]) -> Iterator[Tuple[dict, List[Tuple[int, int, np.ndarray]]]]:
+    '''
+    Streams the TimeSeries of an ENTSO-E document with iterparse. Yields the metadata of every TimeSeries (psrType,
+    whether it is consumption) and its periods as (start in ns since epoch UTC, step in ns, values). The values of a
+    period are written straight into a preallocated array, positions without a point stay NaN (or repeat the previous
+    point for A03 curves). Points with a position outside their period are skipped and reported. A resolution that is
+    not in RESOLUTIONS raises a ValueError.
+    '''
+    if not xml_text:
+        return
+    if isinstance(xml_text, str):
+        xml_text = xml_text.encode('utf-8')
+
+    meta, periods = {}, []
+    start = end = step = None
+    values = position = None
+    skipped = 0
+    for _, elem in ET.iterparse(io.BytesIO(xml_text), events=('end',)):
+        name = _local_name(elem.tag)
+        if name == 'position':
+            position = int(elem.text)
+        elif name in VALUE_ELEMENTS:
+            if 0 < position <= len(values):
+                values[position - 1] = float(elem.text)
+            else:
+                skipped += 1
+        elif name == 'start':
+            start = pd.Timestamp(elem.text).value
+        elif name == 'end':
+            end = pd.Timestamp(elem.text).value
+        elif name == 'resolution':
+            if elem.text not in RESOLUTIONS:
+                raise ValueError(f'Resolution {elem.text} is not supported by the fast ENTSO-E parser.')
+            step = RESOLUTIONS[elem.text][0]
+            values = np.full((end - start) // step, np.nan)
+        elif name == 'Period':
+            if meta.get('curveType') == 'A03':
+                # A03 curves only hold a point where the value changes
+                filled = np.where(~np.isnan(values), np.arange(len(values)), 0)
+                values = values[np.maximum.accumulate(filled)]
+            periods.append((start, step, values))
+            values = None
+            elem.clear()
+        elif name in ('psrType', 'curveType'):
+            meta[name] = elem.text
+        elif name == 'outBiddingZone_Domain.mRID':
+            meta['consumption'] = True
+        elif name == 'TimeSeries':
+            yield meta, periods
+            meta, periods = {}, []
+            elem.clear()
+    if skipped:
+        print(f'Skipped {skipped} ENTSO-E points with a position outside their period.')
+
+
+def _period_index(start: int, step: int, length: int) -> np.ndarray:
+    '''
+    Returns the timestamps of a period in ns since epoch UTC.
+    '''
+    return start + step * np.arange(length, dtype='int64')
+
+
+def _to_series(periods: List[Tuple[int, int, np.ndarray]], drop_duplicates: bool = True) -> pd.Series:
+    '''
+    Combines periods into one series with a sorted UTC index, keeping the first value of duplicated timestamps.
+    '''
+    index = np.concatenate([_period_index(start, step, len(values)) for start, step, values in periods])
+    values = np.concatenate([values for _, _, values in periods])
+    order = np.argsort(index, kind='stable')
+    index, values = index[order], values[order]
+    if drop_duplicates and len(index):
+        keep = np.empty(len(index), dtype=bool)
+        keep[0] = True
+        np.not_equal(index[1:], index[:-1], out=keep[1:])
+        index, values = index[keep], values[keep]
+    return pd.Series(values, index=pd.DatetimeIndex(index.astype('datetime64[ns]')).tz_localize('UTC'))
+
+
+def parse_prices(xml_text: Union[str, bytes]) -> Dict[str, pd.Series]:
+    '''
+    Parses a day-ahead price document (A44) into one series per resolution ('15min', '30min' or '60min'). Other
+    resolutions raise a ValueError, as entsoe-py does not parse them either.
+    '''
+    periods = {frequency: [] for _, frequency in RESOLUTIONS.values()}
+    frequencies = {step: frequency for step, frequency in RESOLUTIONS.values()}
+    for _, timeseries_periods in _iter_timeseries(xml_text):
+        for period in timeseries_periods:
+            periods[frequencies[period[1]]].append(period)
+    return {frequency: _to_series(frequency_periods) for frequency, frequency_periods in periods.items() if frequency_periods}
+
+
+def parse_generation(xml_text: Union[str, bytes]) -> Union[pd.DataFrame, pd.Series]:
+    '''
+    Parses an actual (A75) or forecasted (A71) generation document into the same layout as entsoe-py: one column per
+    (production type, 'Actual Aggregated'/'Actual Consumption'), with the metric level dropped when there is only one,
+    and a series when there is only a single column. Documents in other resolutions are parsed by entsoe-py.
+    '''
+    periods = {}
+    try:
+        for meta, timeseries_periods in _iter_timeseries(xml_text):
+            metric = 'Actual Consumption' if meta.get('consumption') else 'Actual Aggregated'
+            name = (PSRTYPE_MAPPINGS[meta['psrType']], metric) if 'psrType' in meta else metric
+            periods.setdefault(name, []).extend(timeseries_periods)
+    except ValueError:
+        return entsoe_parsers.parse_generation(xml_text)
+
+    df = pd.DataFrame({name: _to_series(name_periods) for name, name_periods in periods.items()})
+    df.sort_index(inplace=True)
+    if isinstance(df.columns, pd.MultiIndex):
+        if len(df.columns.levels[-1]) == 1:
+            df = df.droplevel(axis=1, level=-1)
+    elif len(df.columns) == 1:
+        df = df.squeeze(axis=1)
+    return df
+
+
+def parse_crossborder_flows(xml_text: Union[str, bytes]) -> pd.Series:
+    '''
+    Parses a physical flow document (A11) into one series of the flows over the border. Documents in other resolutions
+    are parsed by entsoe-py.
+    '''
+    try:
+        periods = [period for _, timeseries_periods in _iter_timeseries(xml_text) for period in timeseries_periods]
+    except ValueError:
+        return entsoe_parsers.parse_crossborder_flows(xml_text)
+    if not periods:
+        raise NoMatchingDataError
+    return _to_series(periods, drop_duplicates=False)
+
+
+def _year_limited(query: Callable, start: pd.Timestamp, end: pd.Timestamp):
+    '''
+    Runs a query per block of at most a year and concatenates the results, like the entsoe-py year_limited decorator.
+    '''
+    frames = []
+    for block_start, block_end in year_blocks(start, end):
+        try:
+            frames.append(query(block_start, block_end))
+        except NoMatchingDataError:
+            continue
+    if not frames:
+        raise NoMatchingDataError
+    df = pd.concat(frames, sort=True)
+    return df.loc[~df.index.duplicated(keep='first')]
+
+
+def query_day_ahead_prices(client: EntsoePandasClient, country_code: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+    '''
+    Same as EntsoePandasClient.query_day_ahead_prices (hourly resolution), parsed with the streaming parser.
+    '''
+    area = lookup_area(country_code)
+
+    def query(start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+        # one extra day on both sides, as entsoe-py does for documents that start at local midnight
+        text = EntsoeRawClient.query_day_ahead_prices(client, area, start=start - pd.Timedelta(days=1), end=end + pd.Timedelta(days=1))
+        series = parse_prices(text).get('60min')
+        if series is None:
+            raise NoMatchingDataError
+        series = series.tz_convert(area.tz).truncate(before=start, after=end)
+        if len(series) == 0:
+            raise NoMatchingDataError
+        return series
+
+    return _year_limited(query, start, end)
+
+
+def query_generation(
+    client: EntsoePandasClient,
+    country_code: str,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    forecast: bool = False
+) -> Union[pd.DataFrame, pd.Series]:
+    '''
+    Same as EntsoePandasClient.query_generation (or query_generation_forecast), parsed with the streaming parser.
+    '''
+    area = lookup_area(country_code)
+
+    def query(start: pd.Timestamp, end: pd.Timestamp) -> Union[pd.DataFrame, pd.Series]:
+        if forecast:
+            text = EntsoeRawClient.query_generation_forecast(client, area, start=start, end=end)
+        else:
+            text = EntsoeRawClient.query_generation(client, area, start=start, end=end, psr_type=None)
+        return parse_generation(text).tz_convert(area.tz).truncate(before=start, after=end)
+
+    return _year_limited(query, start, end)
+
+
+def query_crossborder_flows(
+    client: EntsoePandasClient,
+    country_code_from: str,
+    country_code_to: str,
+    start: pd.Timestamp,
+    end: pd.Timestamp
+) -> pd.Series:
+    '''
+    Same as EntsoePandasClient.query_crossborder_flows, parsed with the streaming parser.
+    '''
+    area_from = lookup_area(country_code_from)
+    area_to = lookup_area(country_code_to)
+
+    def query(start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+        text = EntsoeRawClient.query_crossborder_flows(client, area_from, area_to, start=start, end=end)
+        return parse_crossborder_flows(text).tz_convert(area_from.tz).truncate(before=start, after=end)
+
+    return _year_limited(query, start, end)
+
+
+def combine_border_flows(
+    flows: Dict[str, pd.Series],
+    country_code: str,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    per_hour: bool = False
+) -> pd.DataFrame:
+    '''
+    Combines the flows over the borders of a country (keyed by neighbour, in the order of NEIGHBOURS) into the frame
+    of EntsoePandasClient.query_physical_crossborder_allborders: a column per neighbour, without all-zero borders, and
+    their 'sum'.
+    '''
+    area = lookup_area(country_code)
+    df = pd.concat([flow.rename(neighbour) for neighbour, flow in flows.items()], axis=1)
+    # drop the borders that only hold zeros
+    df = df.loc[:, (df != 0).any(axis=0)]
+    df = df.tz_convert(area.tz)
+    df = df.truncate(before=start, after=end)
+    df['sum'] = df.sum(axis=1)
+    if per_hour:
+        df = df.resample('h').mean()
+    return df
@@ -1,29 +1,197 @@
+import csv
+import io
+import json
+import os
 import pandas as pd
+import openmeteo_requests
+import requests_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from entsoe import EntsoePandasClient
-from typing import Tuple, Optional
-from utils.settings import ENV_VARS
+from entsoe.exceptions import NoMatchingDataError
+from entsoe.mappings import NEIGHBOURS, lookup_area
+from functools import lru_cache
+from retry_requests import retry
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
+from utils.settings import ENV_VARS, HTTP_CACHE_PATH, BACKFILL_CHECKPOINT_DIR
 from utils.utils import get_country_center_coordinates
-import requests
+from feature_pipeline.ETL import entsoe_parser, raw_store
+from feature_pipeline.ETL.replay import RecordingAdapter, ReplayAdapter, read_recording_info, write_recording_info
+from feature_pipeline.ETL.scheduler import RequestScheduler
+from feature_pipeline.ETL.timestamps import parse_utc
+
+
+# Order in which the per-zone frames are returned by the extract_*_data functions
+ZONE_ORDER = ('NL', 'BE', 'DE_LU', 'DK_1', 'GB', 'NO_2')
+# Default number of per-zone API calls that are allowed to run at the same time
+MAX_WORKERS = len(ZONE_ORDER)
+
+# Number of local raw files (CSV or Parquet) read at the same time
+LOAD_MAX_WORKERS = 8
+
+# Parse the ENTSO-E responses with the streaming parser of entsoe_parser instead of the entsoe-py parsers
+FAST_ENTSOE_PARSER = False
+
+# Period covered by the historical backfill
+BACKFILL_START = pd.Timestamp('2019-01-01', tz='UTC').normalize()
+BACKFILL_END = pd.Timestamp('2025-01-05', tz='UTC').normalize()
+# Number of monthly ENTSO-E windows fetched at the same time during a backfill (the ENTSO-E scheduler keeps the rate)
+BACKFILL_MAX_WORKERS = 4
+# Version of the backfill window checkpoints, bump it when the fetched frames change so older checkpoints are not reused
+BACKFILL_CHECKPOINT_VERSION = 1
+# Windows that end less than this before they are fetched can still get publications and are not checkpointed
+BACKFILL_SETTLE_TIME = pd.Timedelta(days=1)
+
+# Open-Meteo endpoints and the hourly variables requested from them
+WEATHER_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/era5"
+WEATHER_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+WEATHER_VARIABLES = [
+    "temperature_2m",
+    "surface_pressure",
+    "cloudcover",
+    "direct_radiation",
+    "diffuse_radiation",
+    "wind_speed_10m",
+    "wind_direction_10m",
+    "wind_speed_100m",
+    "wind_direction_100m",
+    "precipitation",
+    "snow_depth"
+]
+
+# Expiry of the cached API responses per endpoint: ERA5 reanalysis data never changes once published, forecasts
+# and ENTSO-E publications are refreshed during the day
+CACHE_EXPIRY = {
+    'archive-api.open-meteo.com': requests_cache.NEVER_EXPIRE,
+    'api.open-meteo.com': pd.Timedelta(hours=3),
+    'web-api.tp.entsoe.eu': pd.Timedelta(hours=1),
+}
+
+# ENTSO-E allows 400 requests per minute per API key (and blocks the key for 10 minutes beyond that). The bucket refills
+# at 380 per minute with a burst of 20, so no 60 second window can hold more than 400 requests.
+ENTSOE_URL = 'https://web-api.tp.entsoe.eu/'
+
+
+@lru_cache(maxsize=None)
+def get_entsoe_scheduler() -> RequestScheduler:
+    '''
+    Returns the scheduler that rate limits (and retries) the ENTSO-E requests of the shared session.
+    '''
+    return RequestScheduler(requests_per_minute=380, burst=20)
+
+
+@lru_cache(maxsize=None)
+def get_session() -> requests_cache.CachedSession:
+    '''
+    Returns the HTTP session shared by all extractors, created on first use: responses are cached on disk with the
+    expiry of CACHE_EXPIRY and failed requests are retried.
+    '''
+    session = retry(
+        requests_cache.CachedSession(
+            HTTP_CACHE_PATH,
+            backend='sqlite',
+            expire_after=pd.Timedelta(hours=1),
+            urls_expire_after=CACHE_EXPIRY,
+            ignored_parameters=['securityToken'],  # keep the ENTSO-E API key out of the cache
+        ),
+        retries=5,
+        backoff_factor=0.2
+    )
+    # every ENTSO-E request that misses the cache is rate limited (and retried) by the scheduler instead of the retry adapter
+    session.mount(ENTSOE_URL, get_entsoe_scheduler())
+    return session
+
+
+@lru_cache(maxsize=None)
+def get_openmeteo_client() -> openmeteo_requests.Client:
+    '''
+    Returns the Open-Meteo client, which decodes the FlatBuffers responses straight into numpy arrays.
+    '''
+    return openmeteo_requests.Client(session=get_session())
+
+
+# Day the daily extractions run for, None is the current day (set to the day of the recording when replaying fixtures)
+TODAY: Optional[pd.Timestamp] = None
+
+
+def today() -> pd.Timestamp:
+    '''
+    Returns the (UTC midnight of the) day the daily extractions run for.
+    '''
+    return TODAY if TODAY is not None else pd.Timestamp.today(tz='UTC').normalize()
+
+
+def record_responses(fixture_dir: str) -> None:
+    '''
+    Saves the raw response of every API request as a compressed fixture in fixture_dir, to be served again by
+    replay_responses. The HTTP cache is bypassed while recording, so that every response ends up in a fixture.
+    '''
+    session = get_session()
+    session.settings.disabled = True
+    session.mount('https://', RecordingAdapter(session.get_adapter('https://'), fixture_dir))
+    session.mount(ENTSOE_URL, RecordingAdapter(get_entsoe_scheduler(), fixture_dir))
+    write_recording_info(fixture_dir, today().strftime('%Y-%m-%d'))
+    print(f'Recording the API responses to {fixture_dir}.')
+
+
+def replay_responses(fixture_dir: str, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0) -> None:
+    '''
+    Serves every API request from the fixtures recorded by record_responses instead of the network, with latency
+    (plus up to jitter) seconds per response. A share error_rate of the ENTSO-E requests fails, to exercise the retries
+    of the ENTSO-E scheduler, which keeps rate limiting the replayed requests. The daily extractions ask for the recorded day.
+    The HTTP cache is bypassed while replaying, so that the replayed (and failed) responses never end up in it.
+    '''
+    global TODAY
+    recorded_day = read_recording_info(fixture_dir)
+    if recorded_day is not None:
+        TODAY = pd.Timestamp(recorded_day, tz='UTC')
+    # the fixtures are keyed without the API key, so any key will do
+    ENV_VARS.setdefault('EntsoePandasClient', 'replay')
+    session = get_session()
+    session.settings.disabled = True
+    session.mount('https://', ReplayAdapter(fixture_dir, latency=latency, jitter=jitter))
+    scheduler = get_entsoe_scheduler()
+    scheduler.transport = ReplayAdapter(fixture_dir, latency=latency, jitter=jitter, error_rate=error_rate)
+    session.mount(ENTSOE_URL, scheduler)
+    print(f'Replaying the API responses from {fixture_dir} (recorded on {recorded_day}).')
+
+
+@lru_cache(maxsize=None)
+def get_entsoe_client() -> EntsoePandasClient:
+    '''
+    Returns the ENTSO-E client shared by all extractors, which sends its requests through the cached session.
+    '''
+    return EntsoePandasClient(api_key=ENV_VARS['EntsoePandasClient'], session=get_session())
+
+
+def _use_fast_parser(fast_parser: Optional[bool]) -> bool:
+    '''
+    Resolves the fast_parser argument of the ENTSO-E extractors, where None falls back to FAST_ENTSOE_PARSER.
+    '''
+    return FAST_ENTSOE_PARSER if fast_parser is None else fast_parser
 
 
 def extract_day_ahead_price(
     country_code: str,
-    start_time: pd.Timestamp = pd.Timestamp('2019-01-01', tz='UTC').normalize(), 
-    end_time: pd.Timestamp = pd.Timestamp('2025-01-05', tz='UTC').normalize(),
-    to_CSV: bool = True
+    start_time: pd.Timestamp = BACKFILL_START, 
+    end_time: pd.Timestamp = BACKFILL_END,
+    to_CSV: bool = True,
+    fast_parser: Optional[bool] = None
 ) -> Optional[pd.DataFrame]:
     '''
     Extracts day-ahead electricity prices from ENTSO-E API for a given country code.
     '''
-    client = EntsoePandasClient(api_key=ENV_VARS['EntsoePandasClient'])
-    day_ahead_prices = client.query_day_ahead_prices('NL', start=start_time, end=end_time)
+    client = get_entsoe_client()
+    if _use_fast_parser(fast_parser):
+        day_ahead_prices = entsoe_parser.query_day_ahead_prices(client, 'NL', start=start_time, end=end_time)
+    else:
+        day_ahead_prices = client.query_day_ahead_prices('NL', start=start_time, end=end_time)
     
     # convert the series to a DataFrame
     day_ahead_prices_df = day_ahead_prices.reset_index()
     day_ahead_prices_df.columns = ['Timestamp', 'Price']
     
     if to_CSV:
-        day_ahead_prices_df.to_csv(f'./feature_pipeline/data/{country_code}_day_ahead_prices.csv')
+        save_local(day_ahead_prices_df, 'day_ahead_prices', country_code)
         print(f'Day ahead prices successfully saved for {country_code}.')
         return 
     
@@ -32,20 +200,53 @@ def extract_day_ahead_price(
 
 def extract_physical_flows(
     country_code: str = 'NL', 
-    start_time: pd.Timestamp = pd.Timestamp('2019-01-01', tz='UTC').normalize(), 
-    end_time: pd.Timestamp = pd.Timestamp('2025-01-05', tz='UTC').normalize(),
-    to_CSV: bool = True
+    start_time: pd.Timestamp = BACKFILL_START, 
+    end_time: pd.Timestamp = BACKFILL_END,
+    to_CSV: bool = True,
+    fast_parser: Optional[bool] = None,
+    max_workers: int = MAX_WORKERS
 ) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
     '''
-    Extracts physical electricity flows from ENTSO-E API for a given country code
+    Extracts physical electricity flows from ENTSO-E API for a given country code. The flows over every border, in both
+    directions, are requested concurrently on at most max_workers threads and combined into the import and export
+    frames of EntsoePandasClient.query_physical_crossborder_allborders (a column per neighbour and their 'sum', per hour).
     '''
-    client = EntsoePandasClient(api_key=ENV_VARS['EntsoePandasClient'])
-    import_data = client.query_physical_crossborder_allborders(country_code, start_time, end_time, export=False, per_hour=True)
-    export_data = client.query_physical_crossborder_allborders(country_code, start_time, end_time, export=True, per_hour=True)
+    client = get_entsoe_client()
+    neighbours = NEIGHBOURS[lookup_area(country_code).name]
+
+    def query_border(country_code_from: str, country_code_to: str) -> pd.Series:
+        if _use_fast_parser(fast_parser):
+            return entsoe_parser.query_crossborder_flows(client, country_code_from, country_code_to, start=start_time, end=end_time)
+        return client.query_crossborder_flows(country_code_from, country_code_to, start=start_time, end=end_time)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            (export, neighbour): executor.submit(query_border, *((country_code, neighbour) if export else (neighbour, country_code)))
+            for export in (False, True) for neighbour in neighbours
+        }
+
+    flows = {False: {}, True: {}}
+    for (export, neighbour), future in futures.items():
+        try:
+            flows[export][neighbour] = future.result()
+        except NoMatchingDataError:
+            continue  # no flows published over this border
+    if not flows[False] and not flows[True]:
+        # raised like a single query without data, so a backfill window records it as empty and skips it
+        raise NoMatchingDataError(f'No physical flows for {country_code} between {start_time} and {end_time}.')
+    combined = {
+        export: entsoe_parser.combine_border_flows(border_flows, country_code, start_time, end_time, per_hour=True)
+        for export, border_flows in flows.items() if border_flows
+    }
+    # a direction without any border flows only gets its (zero) sum, on the hours of the other direction
+    for export in (False, True):
+        if export not in combined:
+            combined[export] = pd.DataFrame({'sum': 0.0}, index=combined[not export].index)
+    import_data, export_data = combined[False], combined[True]
     
     if to_CSV:
-        import_data.to_csv(f'./feature_pipeline/data/{country_code}_import_flow.csv')
-        export_data.to_csv(f'./feature_pipeline/data/{country_code}_export_flow.csv')
+        save_local(import_data, 'import_flow', country_code)
+        save_local(export_data, 'export_flow', country_code)
         print(f'Import and export physcial flows successfully saved for {country_code}.')
         return 
     
@@ -54,22 +255,27 @@ def extract_physical_flows(
 
 def extract_energy_generation(
     country_code: str, 
-    start_time: pd.Timestamp = pd.Timestamp('2019-01-01', tz='UTC').normalize(), 
-    end_time: pd.Timestamp = pd.Timestamp('2025-01-05', tz='UTC').normalize(),
+    start_time: pd.Timestamp = BACKFILL_START, 
+    end_time: pd.Timestamp = BACKFILL_END,
     to_CSV: bool = True,
-    forecast: bool = False
+    forecast: bool = False,
+    fast_parser: Optional[bool] = None
 ) -> Optional[pd.DataFrame]:
     '''
     Extracts energy generation data from ENTSO-E API for a given country code
     '''
-    client = EntsoePandasClient(api_key=ENV_VARS['EntsoePandasClient'])
-    if forecast:
+    client = get_entsoe_client()
+    if _use_fast_parser(fast_parser):
+        generation_data = entsoe_parser.query_generation(client, country_code, start=start_time, end=end_time, forecast=forecast)
+        if forecast:
+            generation_data = generation_data.to_frame()
+    elif forecast:
         generation_data = client.query_generation_forecast(country_code, start=start_time, end=end_time).to_frame()
     else: 
         generation_data = client.query_generation(country_code, start=start_time, end=end_time, psr_type=None)
 
     if to_CSV:
-        generation_data.to_csv(f'./feature_pipeline/data/{country_code}_energy_generation.csv')
+        save_local(generation_data, 'energy_generation', country_code)
         print(f'Energy generation successfully saved for {country_code}.')
         return 
     return generation_data
@@ -77,8 +283,8 @@ def extract_energy_generation(
 
 def extract_historical_weather_data(
     country_code: str,
-    start_time: pd.Timestamp = pd.Timestamp('2019-01-01', tz='UTC').normalize(), 
-    end_time: pd.Timestamp = pd.Timestamp('2025-01-05', tz='UTC').normalize(),
+    start_time: pd.Timestamp = BACKFILL_START, 
+    end_time: pd.Timestamp = BACKFILL_END,
     to_CSV: bool = True
 ) -> pd.DataFrame:
     """
@@ -93,48 +299,27 @@ def extract_historical_weather_data(
     end_date_str = end_time.strftime('%Y-%m-%d')
     latitude, longitude = get_country_center_coordinates(country_code)
 
-    base_url = "https://archive-api.open-meteo.com/v1/era5"
+    base_url = WEATHER_ARCHIVE_URL
     params = {
         "latitude": latitude,
         "longitude": longitude,
         "start_date": start_date_str,
         "end_date": end_date_str,
-        "hourly": [
-            "temperature_2m",
-            "surface_pressure",
-            "cloudcover",
-            "direct_radiation",
-            "diffuse_radiation",
-            "wind_speed_10m",
-            "wind_direction_10m",
-            "wind_speed_100m",
-            "wind_direction_100m",
-            "precipitation",
-            "snow_depth"
-        ],
+        "hourly": WEATHER_VARIABLES,
         "timezone": "Europe/Amsterdam"
     }
 
-    response = requests.get(base_url, params=params)
-    response.raise_for_status()  # will raise an error if the request failed
-    data = response.json()
-    hourly_data = data.get("hourly", {})
-    if not hourly_data:
+    # will raise an error if the request failed
+    response = get_openmeteo_client().weather_api(base_url, params=params)[0]
+    df = _weather_response_to_df(response)
+    if df is None:
         print("No weather data returned for the specified parameters.")
         return None
 
-    # Convert to DataFrame
-    df = pd.DataFrame(hourly_data)
-    
-    # 'time' is given as an ISO string, so convert to datetime
-    df['time'] = pd.to_datetime(df['time'])
-    df.set_index('time', inplace=True)
-
     # Optionally save to CSV
     if to_CSV:
-        csv_path = f"./feature_pipeline/data/{country_code}_weather_data.csv"
-        df.to_csv(csv_path)
-        print(f"Weather data successfully saved to {csv_path}")
+        save_local(df, 'weather_data', country_code)
+        print(f"Weather data successfully saved for {country_code}.")
         return None
 
     return df
@@ -157,81 +342,154 @@ def extract_weather_forecast(
     end_date_str = end_time.strftime('%Y-%m-%d')
     
     latitude, longitude = get_country_center_coordinates(country_code)
-    base_url = "https://api.open-meteo.com/v1/forecast"
+    base_url = WEATHER_FORECAST_URL
     params = {
         "latitude": latitude,
         "longitude": longitude,
         "start_date": start_date_str,      
         "end_date": end_date_str,          
-        "hourly": [
-            "temperature_2m",
-            "surface_pressure",
-            "cloudcover",
-            "direct_radiation",
-            "diffuse_radiation",
-            "wind_speed_10m",
-            "wind_direction_10m",
-            "wind_speed_100m",
-            "wind_direction_100m",
-            "precipitation",
-            "snow_depth"
-        ],
+        "hourly": WEATHER_VARIABLES,
         "timezone": "Europe/Amsterdam"
     }
 
-    response = requests.get(base_url, params=params)
-    response.raise_for_status()
-    data = response.json()
-
-    # Parse the 'hourly' forecast data
-    hourly_data = data.get("hourly", {})
-    if not hourly_data:
+    response = get_openmeteo_client().weather_api(base_url, params=params)[0]
+    df = _weather_response_to_df(response)
+    if df is None:
         print("No forecast data returned for the specified parameters/timeframe.")
         return None
 
-    # Convert to a DataFrame
-    df = pd.DataFrame(hourly_data)
+    return df
 
-    # 'time' is given as an ISO string, so convert to datetime
-    df['time'] = pd.to_datetime(df['time'])
-    df.set_index('time', inplace=True)
 
-    return df
+def _weather_response_to_df(response) -> Optional[pd.DataFrame]:
+    """
+    Converts the hourly block of an Open-Meteo FlatBuffers response into a DataFrame indexed by 'time' with one column
+    per variable of WEATHER_VARIABLES, the same layout as the JSON API used to give. The values are the numpy arrays of
+    the response, and 'time' is the local wall-clock time of the requested timezone as a regular hourly grid.
+    """
+    hourly = response.Hourly()
+    if hourly is None or hourly.VariablesLength() == 0:
+        return None
+
+    utc_offset = response.UtcOffsetSeconds()
+    time = pd.date_range(
+        start=pd.to_datetime(hourly.Time() + utc_offset, unit='s'),
+        end=pd.to_datetime(hourly.TimeEnd() + utc_offset, unit='s'),
+        freq=pd.Timedelta(seconds=hourly.Interval()),
+        inclusive='left',
+        name='time'
+    )
+    data = {variable: hourly.Variables(i).ValuesAsNumpy() for i, variable in enumerate(WEATHER_VARIABLES)}
+    return pd.DataFrame(data, index=time, copy=False)
+
+
+def _yearly_windows(start_time: pd.Timestamp, end_time: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    '''
+    Splits the days from start_time up to and including end_time (the Open-Meteo date range) into calendar years.
+    '''
+    year_starts = list(pd.date_range(start_time, end_time, freq='YS', inclusive='right'))
+    starts = [start_time] + year_starts
+    ends = [year_start - pd.Timedelta(days=1) for year_start in year_starts] + [end_time]
+    return list(zip(starts, ends))
+
+
+def _request_weather_batch(
+    url: str,
+    coordinates: List[Tuple[float, float]],
+    start_time: pd.Timestamp,
+    end_time: pd.Timestamp
+) -> List[Optional[pd.DataFrame]]:
+    '''
+    Requests the hourly weather at several coordinates in one Open-Meteo request, returning one frame per coordinate.
+    '''
+    params = {
+        "latitude": ",".join(str(latitude) for latitude, _ in coordinates),
+        "longitude": ",".join(str(longitude) for _, longitude in coordinates),
+        "start_date": start_time.strftime('%Y-%m-%d'),
+        "end_date": end_time.strftime('%Y-%m-%d'),
+        "hourly": WEATHER_VARIABLES,
+        "timezone": "Europe/Amsterdam"
+    }
+
+    responses = get_openmeteo_client().weather_api(url, params=params)
+    if len(responses) != len(coordinates):
+        raise ValueError(f'Expected weather data for {len(coordinates)} zones, got {len(responses)}.')
+    return [_weather_response_to_df(response) for response in responses]
+
+
+def extract_weather_batch(
+    zones: Tuple[str, ...] = ZONE_ORDER,
+    start_time: pd.Timestamp = pd.Timestamp.today(tz='UTC').normalize() - pd.Timedelta(days=1),
+    end_time: pd.Timestamp = pd.Timestamp.today(tz='UTC').normalize() - pd.Timedelta(days=1),
+    historical: bool = False,
+    to_CSV: bool = False
+) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Extracts the hourly weather of several zones with batched Open-Meteo requests, either from the ERA5 archive (historical)
+    or from the forecast endpoint. Open-Meteo accepts comma-separated coordinate lists and answers with one payload per
+    location, in the same order, which is split into the same per-zone frames as extract_historical_weather_data and
+    extract_weather_forecast return. Archive requests are made per calendar year, so a long backfill is not one huge
+    request, and a failed year can be rerun while the years already fetched come from the HTTP cache.
+    """
+    coordinates = [get_country_center_coordinates(zone) for zone in zones]
+    if historical:
+        year_frames = [
+            _request_weather_batch(WEATHER_ARCHIVE_URL, coordinates, window_start, window_end)
+            for window_start, window_end in _yearly_windows(start_time, end_time)
+        ]
+    else:
+        year_frames = [_request_weather_batch(WEATHER_FORECAST_URL, coordinates, start_time, end_time)]
+
+    frames = {}
+    for i, zone in enumerate(zones):
+        zone_frames = [window_frames[i] for window_frames in year_frames if window_frames[i] is not None]
+        frames[zone] = pd.concat(zone_frames) if len(zone_frames) > 1 else next(iter(zone_frames), None)
+        if frames[zone] is None:
+            print(f"No weather data returned for {zone} for the specified parameters/timeframe.")
+
+    if to_CSV:
+        for zone, df in frames.items():
+            if df is not None:
+                save_local(df, 'weather_data', zone)
+                print(f"Weather data successfully saved for {zone}.")
+        return None
+
+    return frames
 
 
-def extract_weather_data(load_locally: bool = True, daily: bool = False, forecast: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:     
+def extract_weather_data(load_locally: bool = True, daily: bool = False, forecast: bool = False, max_workers: int = MAX_WORKERS, batched: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:     
     """
     Extracts weather data for multiple countries, supporting both historical data and recent daily forecasts.
+    By default all zones are fetched in one batched Open-Meteo request, otherwise with one request per zone.
     """
     if load_locally and not daily: 
         return pre_load_df('weather_data')
     if daily: 
         if forecast: 
             # today's data: 24 hours ahead 
-            start_time = pd.Timestamp.today(tz='UTC').normalize()
-            end_time = pd.Timestamp.today(tz='UTC').normalize() 
+            start_time = today()
+            end_time = today() 
         else:
             # yesterday's data 
-            start_time = pd.Timestamp.today(tz='UTC').normalize() - pd.Timedelta(days=1)
-            end_time = pd.Timestamp.today(tz='UTC').normalize() - pd.Timedelta(days=1)
-        df_NL = extract_weather_forecast('NL', start_time=start_time, end_time=end_time)
-        df_BE = extract_weather_forecast('BE', start_time=start_time, end_time=end_time)
-        df_DE_LU = extract_weather_forecast('DE_LU', start_time=start_time, end_time=end_time)
-        df_DK_1 = extract_weather_forecast('DK_1', start_time=start_time, end_time=end_time)
-        df_GB = extract_weather_forecast('GB', start_time=start_time, end_time=end_time)
-        df_NO_2 = extract_weather_forecast('NO_2', start_time=start_time, end_time=end_time)
-        return df_NL, df_BE, df_DE_LU, df_DK_1, df_GB, df_NO_2
+            start_time = today() - pd.Timedelta(days=1)
+            end_time = today() - pd.Timedelta(days=1)
+        if batched:
+            frames = extract_weather_batch(start_time=start_time, end_time=end_time)
+        else:
+            frames = _extract_per_zone(extract_weather_forecast, max_workers=max_workers, start_time=start_time, end_time=end_time)
+    elif batched:
+        # saved like the per-zone backfill does, but the frames are returned as well
+        frames = extract_weather_batch(start_time=BACKFILL_START, end_time=BACKFILL_END, historical=True)
+        for zone, df in frames.items():
+            if df is not None:
+                save_local(df, 'weather_data', zone)
+                print(f"Weather data successfully saved for {zone}.")
     else:
-        df_NL = extract_historical_weather_data('NL')
-        df_BE = extract_historical_weather_data('BE')
-        df_DE_LU = extract_historical_weather_data('DE_LU')
-        df_DK_1 = extract_historical_weather_data('DK_1')
-        df_GB = extract_historical_weather_data('GB')
-        df_NO_2 = extract_historical_weather_data('NO_2')
-        return df_NL, df_BE, df_DE_LU, df_DK_1, df_GB, df_NO_2
+        frames = _extract_per_zone(extract_historical_weather_data, max_workers=max_workers)
+    return tuple(frames[zone] for zone in ZONE_ORDER)
 
 
-def extract_price_data(load_locally: bool = True, daily: bool= False, forecast: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: 
+def extract_price_data(load_locally: bool = True, daily: bool= False, forecast: bool = False, max_workers: int = MAX_WORKERS) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: 
     """
     Retrieves day-ahead electricity prices for multiple countries, either from saved local data or API queries.
     """
@@ -239,27 +497,22 @@ def extract_price_data(load_locally: bool = True, daily: bool= False, forecast:
         return pre_load_df('day_ahead_prices')
     if daily:
         if forecast: 
-            start_time = pd.Timestamp.today(tz='UTC').normalize()
-            end_time = pd.Timestamp.today(tz='UTC').normalize() + pd.Timedelta(days=1)
+            start_time = today()
+            end_time = today() + pd.Timedelta(days=1)
         else: 
-            start_time = pd.Timestamp.today(tz='UTC').normalize() - pd.Timedelta(days=1)
-            end_time = pd.Timestamp.today(tz='UTC').normalize()
-        to_CSV = False
-    else: 
-        start_time = pd.Timestamp('2019-01-01', tz='UTC').normalize()
-        end_time = pd.Timestamp('2025-01-05', tz='UTC').normalize()
-        to_CSV = True
+            start_time = today() - pd.Timedelta(days=1)
+            end_time = today()
+    else:
+        # historical backfill in resumable monthly windows, saved to CSV
+        for zone in ZONE_ORDER:
+            extract_entsoe_backfill('day_ahead_prices', zone)
+        return (None,) * len(ZONE_ORDER)
 
-    df_NL = extract_day_ahead_price('NL', start_time=start_time, end_time=end_time,to_CSV=to_CSV)
-    df_BE = extract_day_ahead_price('BE', start_time=start_time, end_time=end_time, to_CSV=to_CSV)
-    df_DE_LU = extract_day_ahead_price('DE_LU', start_time=start_time, end_time=end_time, to_CSV=to_CSV)
-    df_DK_1 = extract_day_ahead_price('DK_1', start_time=start_time, end_time=end_time, to_CSV=to_CSV)
-    df_GB = extract_day_ahead_price('GB', start_time=start_time, end_time=end_time, to_CSV=to_CSV)
-    df_NO_2 = extract_day_ahead_price('NO_2', start_time=start_time, end_time=end_time, to_CSV=to_CSV)
-    return df_NL, df_BE, df_DE_LU, df_DK_1, df_GB, df_NO_2
+    frames = _extract_per_zone(extract_day_ahead_price, max_workers=max_workers, start_time=start_time, end_time=end_time, to_CSV=False)
+    return tuple(frames[zone] for zone in ZONE_ORDER)
 
 
-def extract_energy_generation_data(load_locally: bool = True, daily: bool = False, forecast: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: 
+def extract_energy_generation_data(load_locally: bool = True, daily: bool = False, forecast: bool = False, max_workers: int = MAX_WORKERS) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: 
     """
     Collects historical energy generation data for multiple countries, with options for daily updates or local file loading.
     """
@@ -267,94 +520,554 @@ def extract_energy_generation_data(load_locally: bool = True, daily: bool = Fals
         return pre_load_df('energy_generation')
     if daily: 
         if forecast: 
-            start_time = pd.Timestamp.today(tz='UTC').normalize() 
-            end_time = pd.Timestamp.today(tz='UTC').normalize() + pd.Timedelta(days=1)
+            start_time = today() 
+            end_time = today() + pd.Timedelta(days=1)
         else: 
-            start_time = pd.Timestamp.today(tz='UTC').normalize() - pd.Timedelta(days=1)
-            end_time = pd.Timestamp.today(tz='UTC').normalize()
-        to_CSV = False
-    else: 
-        start_time = pd.Timestamp('2019-01-01', tz='UTC').normalize()
-        end_time = pd.Timestamp('2025-01-05', tz='UTC').normalize()
-        to_CSV = True
-
-    df_NL = extract_energy_generation('NL', start_time=start_time, end_time=end_time, to_CSV=to_CSV, forecast=forecast)
-    df_BE = extract_energy_generation('BE', start_time=start_time, end_time=end_time, to_CSV=to_CSV, forecast=forecast)
-    df_DE_LU = extract_energy_generation('DE_LU', start_time=start_time, end_time=end_time, to_CSV=to_CSV, forecast=forecast)
-    df_DK_1 = extract_energy_generation('DK_1', start_time=start_time, end_time=end_time, to_CSV=to_CSV, forecast=forecast)
-    df_NO_2 = extract_energy_generation('NO_2', start_time=start_time, end_time=end_time, to_CSV=to_CSV, forecast=forecast)
-    # UK data is not always available in the ENTSO-E API, so we'll fill it with zeros for now
-    try:
-        df_GB = extract_energy_generation('UK', start_time=start_time, end_time=end_time, to_CSV=to_CSV) if not forecast else None
-    except Exception as e:
+            start_time = today() - pd.Timedelta(days=1)
+            end_time = today()
+    else:
+        # historical backfill in resumable monthly windows, saved to CSV
+        for zone in ZONE_ORDER:
+            try:
+                # UK data is not always available in the ENTSO-E API
+                extract_entsoe_backfill('energy_generation', 'UK' if zone == 'GB' else zone)
+            except (RuntimeError, NoMatchingDataError) as e:
+                if zone != 'GB':
+                    raise
+                print(f'Error in fetching UK energy generation data: {e}')
+        return (None,) * len(ZONE_ORDER)
+
+    return _extract_generation_per_zone(start_time, end_time, forecast=forecast, max_workers=max_workers)
+
+
+def _extract_generation_per_zone(
+    start_time: pd.Timestamp,
+    end_time: pd.Timestamp,
+    forecast: bool = False,
+    max_workers: int = MAX_WORKERS
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    '''
+    Extracts the (forecasted) energy generation of every zone from the ENTSO-E API between start_time and end_time.
+    '''
+    # UK data is not always available in the ENTSO-E API (and has no forecast), so GB is queried as 'UK' and handled below
+    zones = [zone for zone in ZONE_ORDER if zone != 'GB']
+    if not forecast:
+        zones.append('UK')
+    frames = _extract_per_zone(
+        extract_energy_generation, zones=zones, max_workers=max_workers, return_exceptions=True,
+        start_time=start_time, end_time=end_time, to_CSV=False, forecast=forecast
+    )
+    for zone, frame in frames.items():
+        if isinstance(frame, Exception) and zone != 'UK':
+            raise frame
+
+    df_GB = frames.pop('UK', None)
+    if isinstance(df_GB, Exception):
         print(f'Error in fetching UK energy generation data, filling with zeros instead.')
-        df_GB = df_NO_2.copy()
-        df_GB = df_GB.map(lambda x: 0 if isinstance(x, float) else x)
+        df_GB = frames['NO_2'].map(lambda x: 0 if isinstance(x, float) else x)
+    frames['GB'] = df_GB
+
+    return tuple(frames[zone] for zone in ZONE_ORDER)
+
+
+def _extract_per_zone(
+    extract_fn: Callable,
+    zones: Tuple[str, ...] = ZONE_ORDER,
+    max_workers: int = MAX_WORKERS,
+    return_exceptions: bool = False,
+    **kwargs
+) -> Dict[str, Optional[pd.DataFrame]]:
+    '''
+    Runs a per-zone extractor for every zone on a bounded thread pool and returns the results keyed by zone.
+    With max_workers=1 the zones are extracted one after another. If return_exceptions is set, a failing zone
+    maps to its exception instead of aborting the whole extraction.
+    '''
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {zone: executor.submit(extract_fn, zone, **kwargs) for zone in zones}
 
-    return df_NL, df_BE, df_DE_LU, df_DK_1, df_GB, df_NO_2
+    frames = {}
+    for zone, future in futures.items():
+        exception = future.exception()
+        if exception is not None and not return_exceptions:
+            raise exception
+        frames[zone] = exception if exception is not None else future.result()
+    return frames
 
 
-def extract_flow_data(load_locally: bool = True, country_code: str = 'NL', daily: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def extract_flow_data(load_locally: bool = True, country_code: str = 'NL', daily: bool = False, max_workers: int = MAX_WORKERS) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Extracts physical electricity flow data (import/export) for a specific country, supporting daily updates or historical backfills.
     """
     if load_locally and not daily:
-        return pd.read_csv(f'./feature_pipeline/data/{country_code}_import_flow.csv'), pd.read_csv(f'./feature_pipeline/data/{country_code}_export_flow.csv')
-    if daily: 
-        start_time = pd.Timestamp.today(tz='UTC').normalize() - pd.Timedelta(days=1)
-        end_time = pd.Timestamp.today(tz='UTC').normalize()
-        to_CSV = False
-    else: 
-        start_time = pd.Timestamp('2019-01-01', tz='UTC').normalize()
-        end_time = pd.Timestamp('2025-01-05', tz='UTC').normalize()
-        to_CSV = True
+        return load_local('import_flow', country_code), load_local('export_flow', country_code)
+    if not daily:
+        # historical backfill in resumable monthly windows, saved to CSV
+        extract_entsoe_backfill('physical_flows', country_code)
+        return None
 
-    return extract_physical_flows(country_code=country_code, start_time=start_time, end_time=end_time, to_CSV=to_CSV)
+    start_time = today() - pd.Timedelta(days=1)
+    end_time = today()
+    return extract_physical_flows(country_code=country_code, start_time=start_time, end_time=end_time, to_CSV=False, max_workers=max_workers)
 
 
-def pre_load_df(path_specific: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def _fetch_entsoe_window(source: str, country_code: str, start_time: pd.Timestamp, end_time: pd.Timestamp) -> Tuple[pd.DataFrame, ...]:
+    '''
+    Fetches a single backfill window of an ENTSO-E source, as a tuple of frames (import and export for physical flows).
+    '''
+    if source == 'day_ahead_prices':
+        return (extract_day_ahead_price(country_code, start_time=start_time, end_time=end_time, to_CSV=False),)
+    if source == 'energy_generation':
+        return (extract_energy_generation(country_code, start_time=start_time, end_time=end_time, to_CSV=False),)
+    if source == 'physical_flows':
+        return extract_physical_flows(country_code, start_time=start_time, end_time=end_time, to_CSV=False)
+    raise ValueError(f'Unknown ENTSO-E source: {source}')
+
+
+def _monthly_windows(start_time: pd.Timestamp, end_time: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    '''
+    Splits [start_time, end_time) into consecutive windows that end at month boundaries.
+    '''
+    boundaries = [start_time] + list(pd.date_range(start_time, end_time, freq='MS', inclusive='neither')) + [end_time]
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _concat_windows(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    '''
+    Concatenates the frames of consecutive windows, dropping the timestamps that appear in two neighbouring windows.
+    '''
+    combined = pd.concat(frames)
+    if 'Timestamp' in combined.columns:
+        combined = combined[~combined['Timestamp'].duplicated(keep='first')].reset_index(drop=True)
+    else:
+        combined = combined[~combined.index.duplicated(keep='first')]
+    return combined
+
+
+def extract_entsoe_backfill(
+    source: str,
+    country_code: str,
+    start_time: pd.Timestamp = BACKFILL_START,
+    end_time: pd.Timestamp = BACKFILL_END,
+    max_workers: int = BACKFILL_MAX_WORKERS,
+    to_CSV: bool = True
+) -> Optional[Tuple[pd.DataFrame, ...]]:
+    '''
+    Backfills an ENTSO-E source ('day_ahead_prices', 'energy_generation' or 'physical_flows') for a country code in
+    monthly windows, fetched concurrently by at most max_workers threads. Every completed window is stored next to a
+    checkpoint manifest in BACKFILL_CHECKPOINT_DIR, so a restarted backfill only fetches the windows that are missing.
+    Once all windows are present they are combined and saved to the usual CSV files (or returned).
+
+    The checkpoints are kept per parser and BACKFILL_CHECKPOINT_VERSION and do not expire otherwise: delete
+    BACKFILL_CHECKPOINT_DIR (or the directory of one source and country code in it) to fetch the windows again.
+    Windows without any published data, and windows that end less than BACKFILL_SETTLE_TIME before they are fetched,
+    are not checkpointed and are fetched again by the next backfill.
+    '''
+    parser = 'fast' if _use_fast_parser(None) else 'entsoe-py'
+    checkpoint_dir = os.path.join(
+        BACKFILL_CHECKPOINT_DIR, f'{country_code}_{source}_{parser}_v{BACKFILL_CHECKPOINT_VERSION}'
+    )
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    windows = _monthly_windows(start_time, end_time)
+    window_files = {window: f"{window[0].strftime('%Y%m%d%H')}_{window[1].strftime('%Y%m%d%H')}.pkl" for window in windows}
+    missing = [
+        window for window in windows
+        if window_files[window] not in manifest.get('windows', [])
+        or not os.path.exists(os.path.join(checkpoint_dir, window_files[window]))
+    ]
+    print(f'Backfilling {source} for {country_code}: {len(windows) - len(missing)} of {len(windows)} windows already fetched.')
+
+    settled_before = pd.Timestamp.now(tz='UTC') - BACKFILL_SETTLE_TIME
+    fetched = {}
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(_fetch_entsoe_window, source, country_code, *window): window for window in missing}
+        for future in as_completed(futures):
+            window = futures[future]
+            try:
+                fetched[window] = future.result()
+            except NoMatchingDataError:
+                fetched[window] = None  # no data published (yet) for this window
+                continue
+            except Exception as e:
+                print(f'Error in fetching {source} for {country_code} from {window[0]} to {window[1]}: {e}')
+                failed.append(window)
+                continue
+            if window[1] > settled_before:
+                continue
+            pd.to_pickle(fetched[window], os.path.join(checkpoint_dir, window_files[window]))
+            # the manifest is only written from this thread, after the window is safely on disk
+            manifest['windows'] = sorted(set(manifest.get('windows', [])) | {window_files[window]})
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+    if failed:
+        raise RuntimeError(f'{len(failed)} windows of {source} for {country_code} could not be fetched, run the backfill again to resume.')
+
+    window_frames = [
+        fetched[window] if window in fetched else pd.read_pickle(os.path.join(checkpoint_dir, window_files[window]))
+        for window in windows
+    ]
+    window_frames = [frames for frames in window_frames if frames is not None]
+    if not window_frames:
+        raise NoMatchingDataError(f'No {source} data for {country_code} between {start_time} and {end_time}.')
+    combined = tuple(_concat_windows(list(frames)) for frames in zip(*window_frames))
+
+    if to_CSV:
+        if source == 'physical_flows':
+            save_local(combined[0], 'import_flow', country_code)
+            save_local(combined[1], 'export_flow', country_code)
+        else:
+            save_local(combined[0], source, country_code)
+        print(f'Backfill of {source} successfully saved for {country_code}.')
+        return None
+
+    return combined
+
+
+def pre_load_df(
+    path_specific: str,
+    columns: Optional[List] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
-    Loads pre-existing data from CSV files for multiple countries, supporting both energy generation and general data pipelines.
+    Loads pre-existing data for multiple countries, supporting both energy generation and general data pipelines.
+    The data is read from the Parquet raw store when it has been converted, otherwise from the CSV files, all zones at once.
     """
-    if path_specific == 'energy_generation':
-        df_NL = pd.read_csv(f'./feature_pipeline/data/NL_{path_specific}.csv', header=[0, 1])
-        df_BE = pd.read_csv(f'./feature_pipeline/data/BE_{path_specific}.csv', header=[0, 1])
-        df_DE_LU = pd.read_csv(f'./feature_pipeline/data/DE_LU_{path_specific}.csv', header=[0, 1])
+    return tuple(load_local_files([(path_specific, zone) for zone in ZONE_ORDER], columns, start_year, end_year))
+
+
+def load_local_files(
+    raw_files: List[Tuple[str, str]],
+    columns: Optional[List] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    max_workers: int = LOAD_MAX_WORKERS
+) -> List[pd.DataFrame]:
+    '''
+    Loads the local data of several (source, zone) pairs at the same time on a thread pool, in the order given.
+    Both the pyarrow CSV reader and the Parquet reader release the GIL, so the files are parsed in parallel.
+    '''
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(lambda raw_file: load_local(*raw_file, columns, start_year, end_year), raw_files))
+
+
+def load_local(
+    path_specific: str,
+    country_code: str,
+    columns: Optional[List] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None
+) -> pd.DataFrame:
+    '''
+    Loads the local data of a source for a zone (or country code for the flows). From the raw store only the requested
+    columns and years are read, the CSV files are read completely (except for the columns no transform uses), from the
+    cache of parsed CSV files while they are unchanged.
+    '''
+    if raw_store.has_raw(path_specific, country_code):
+        return raw_store.read_raw(path_specific, country_code, columns=columns, start_year=start_year, end_year=end_year)
+    return raw_store.read_raw_csv_cached(path_specific, country_code)
+
+
+def save_local(df: pd.DataFrame, path_specific: str, country_code: str) -> None:
+    '''
+    Saves raw data of a source for a zone to its CSV file and, once the raw store has been converted, adds the rows that
+    are newer than it holds to the raw store.
+    '''
+    df.to_csv(_local_csv_path(path_specific, country_code))
+    if raw_store.has_raw(path_specific, country_code):
+        # round trip through the CSV file, so the raw store gets exactly what pre_load_df would read from it
+        raw_store.append_raw(raw_store.read_raw_csv(path_specific, country_code), path_specific, country_code)
+
+
+def _local_csv_path(path_specific: str, country_code: str) -> str:
+    '''
+    Returns the path of the raw CSV file of a source for a zone (or country code for the flows).
+    '''
+    return f'./feature_pipeline/data/{country_code}_{path_specific}.csv'
+
+
+def _csv_layout(path_specific: str, country_code: str) -> Tuple[int, int]:
+    '''
+    Returns the number of header rows and the position of the timestamp column of a raw CSV file. The timestamp is
+    the 'time' (weather) or 'Timestamp' (prices) column, or else the first column, which is the saved index.
+    '''
+    path = _local_csv_path(path_specific, country_code)
+    header_rows = raw_store.csv_header_rows(path)
+    with open(path, newline='') as f:
+        columns = next(csv.reader(f))
+    timestamp_column = next((i for i, column in enumerate(columns) if column in ('time', 'Timestamp')), 0)
+    return header_rows, timestamp_column
+
+
+def latest_local_timestamp(path_specific: str, country_code: str) -> Optional[pd.Timestamp]:
+    '''
+    Returns the newest timestamp (in UTC) with data in the raw CSV file of a source, by only reading the end of the file.
+    Trailing rows without any values (e.g. ERA5 hours that were not published yet) are skipped.
+    '''
+    path = _local_csv_path(path_specific, country_code)
+    if not os.path.exists(path):
+        return None
+    _, timestamp_column = _csv_layout(path_specific, country_code)
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - (1 << 16)))
+        lines = [line for line in f.read().split(b'\n')[1:] if line.strip()]
+    for line in reversed(lines):
+        fields = line.decode().split(',')
+        if any(field.strip() for field in fields[timestamp_column + 1:]):
+            return pd.to_datetime(fields[timestamp_column], utc=True)
+    return None
+
+
+def _read_csv_after(path_specific: str, country_code: str, after: Optional[pd.Timestamp], until: pd.Timestamp) -> pd.DataFrame:
+    '''
+    Reads the rows of a raw CSV file with a timestamp in (after, until], in the same format as pre_load_df. The file is
+    sorted by time, so only its end is read, block by block from the back, until a row at or before 'after' is found.
+    '''
+    path = _local_csv_path(path_specific, country_code)
+    header_rows, timestamp_column = _csv_layout(path_specific, country_code)
+    header = [0, 1] if header_rows == 2 else 0
+    if after is None:
+        df = pd.read_csv(path, header=header)
     else:
-        df_NL = pd.read_csv(f'./feature_pipeline/data/NL_{path_specific}.csv')
-        df_BE = pd.read_csv(f'./feature_pipeline/data/BE_{path_specific}.csv')
-        df_DE_LU = pd.read_csv(f'./feature_pipeline/data/DE_LU_{path_specific}.csv')
-    df_DK_1 = pd.read_csv(f'./feature_pipeline/data/DK_1_{path_specific}.csv')
-    df_GB = pd.read_csv(f'./feature_pipeline/data/GB_{path_specific}.csv')
-    df_NO_2 = pd.read_csv(f'./feature_pipeline/data/NO_2_{path_specific}.csv')
-    return df_NL, df_BE, df_DE_LU, df_DK_1, df_GB, df_NO_2
+        with open(path, 'rb') as f:
+            header_text = b''.join(f.readline() for _ in range(header_rows))
+            data_start = f.tell()
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            tail = b''
+            lines = []
+            while position > data_start:
+                step = min(1 << 20, position - data_start)
+                position -= step
+                f.seek(position)
+                tail = f.read(step) + tail
+                # the first line of the block may be cut off, unless the block starts at the first data row
+                lines = tail.split(b'\n') if position == data_start else tail.split(b'\n', 1)[-1].split(b'\n')
+                first_line = next((line for line in lines if line.strip()), None)
+                if first_line is not None and pd.to_datetime(first_line.decode().split(',')[timestamp_column], utc=True) <= after:
+                    break
+        df = pd.read_csv(io.BytesIO(header_text + b'\n'.join(lines)), header=header)
+
+    timestamps = parse_utc(df.iloc[:, timestamp_column])
+    mask = timestamps <= until
+    if after is not None:
+        mask &= timestamps > after
+    return df[mask].reset_index(drop=True)
+
+
+def _source_after(latest: Dict[str, pd.Timestamp], zones: Tuple[str, ...] = ZONE_ORDER) -> Optional[pd.Timestamp]:
+    '''
+    Returns the newest timestamp that every zone of a source has already stored, or None if a zone has nothing stored.
+    '''
+    if any(latest.get(zone) is None for zone in zones):
+        return None
+    return min(latest[zone] for zone in zones)
+
+
+def _earliest(*timestamps: Optional[pd.Timestamp]) -> Optional[pd.Timestamp]:
+    '''
+    Returns the earliest of the timestamps, where None (nothing stored yet) is the earliest of all.
+    '''
+    return None if any(timestamp is None for timestamp in timestamps) else min(timestamps)
+
+
+def _api_rows_after(df: Optional[pd.DataFrame], until: pd.Timestamp) -> Optional[pd.DataFrame]:
+    '''
+    Drops the rows of an API frame at or before until, the hours already read from the local files (the APIs answer in
+    whole days, the weather also starts a day early). The timestamps are read as the transforms read them: the
+    'Timestamp' column of the prices, else the index, with naive times taken as UTC.
+    '''
+    if df is None:
+        return None
+    times = parse_utc(df['Timestamp'] if 'Timestamp' in df.columns else df.index)
+    return df[times > until]
+
+
+def extract_incremental_data(
+    latest_weather: Dict[str, pd.Timestamp],
+    latest_prices_generation: Dict[str, pd.Timestamp],
+    latest_flow: Optional[pd.Timestamp],
+    latest_hourly_features: Optional[pd.Timestamp] = None,
+    country_code: str = 'NL',
+    max_workers: int = MAX_WORKERS
+) -> Tuple[tuple, tuple]:
+    '''
+    Extracts the hours that are newer than the latest timestamps already stored in the feature groups, per source. With
+    latest_hourly_features, the weather, prices and generation start at the earliest of their own cutoff and that one,
+    so that the hourly features after it can be rebuilt from them. Hours that are already in the local CSV files are read from the end of
+    those files, only the hours after them are requested from the APIs (up to yesterday). Returns two tuples in the
+    order of extract_daily_data: the frames read locally and the frames from the APIs, where every frame of a source
+    without new hours is None.
+    '''
+    end_time = today()
+    weather_after, prices_generation_after = _source_after(latest_weather), _source_after(latest_prices_generation)
+    if latest_hourly_features is not None:
+        weather_after = _earliest(weather_after, latest_hourly_features)
+        prices_generation_after = _earliest(prices_generation_after, latest_hourly_features)
+    sources = [
+        ('weather_data', [('weather_data', zone) for zone in ZONE_ORDER], weather_after),
+        ('day_ahead_prices', [('day_ahead_prices', zone) for zone in ZONE_ORDER], prices_generation_after),
+        ('energy_generation', [('energy_generation', zone) for zone in ZONE_ORDER], prices_generation_after),
+        ('physical_flows', [('import_flow', country_code), ('export_flow', country_code)], latest_flow),
+    ]
+
+    local_frames, api_frames = [], []
+    for source, files, after in sources:
+        # the local files can only be used up to the hour that all of them reach
+        local_latest = [latest_local_timestamp(path_specific, code) for path_specific, code in files]
+        local_until = None if any(latest is None for latest in local_latest) else min(local_latest)
+        if local_until is not None and (after is None or local_until > after):
+            print(f'Reading {source} after {after} from the local files.')
+            local_frames.extend(_read_csv_after(path_specific, code, after, local_until) for path_specific, code in files)
+        else:
+            local_frames.extend([None] * len(files))
+            local_until = after
 
+        api_start = BACKFILL_START if local_until is None else (local_until + pd.Timedelta(hours=1)).floor('h')
+        if api_start >= end_time:
+            api_frames.extend([None] * len(files))
+            continue
+        print(f'Extracting {source} from {api_start} to {end_time} from the API.')
+        if source == 'weather_data':
+            # the forecast endpoint serves about the last three months, older hours come from the ERA5 archive
+            historical = api_start < end_time - pd.Timedelta(days=90)
+            frames = extract_weather_batch(start_time=api_start, end_time=end_time - pd.Timedelta(days=1), historical=historical)
+            frames = [frames[zone] for zone in ZONE_ORDER]
+        elif source == 'day_ahead_prices':
+            frames = _extract_per_zone(extract_day_ahead_price, max_workers=max_workers, start_time=api_start, end_time=end_time, to_CSV=False)
+            frames = [frames[zone] for zone in ZONE_ORDER]
+        elif source == 'energy_generation':
+            frames = _extract_generation_per_zone(api_start, end_time, max_workers=max_workers)
+        else:
+            frames = extract_physical_flows(country_code=country_code, start_time=api_start, end_time=end_time, to_CSV=False, max_workers=max_workers)
+        if local_until is not None:
+            frames = [_api_rows_after(df, local_until) for df in frames]
+        api_frames.extend(frames)
+
+    return tuple(local_frames), tuple(api_frames)
 
-def extract_backfill_data():
+
+def extract_backfill_data(max_workers: int = LOAD_MAX_WORKERS):
     """
     Collects all necessary historical data (weather, prices, generation, flows) for multiple countries to backfill a feature pipeline.
+    All 20 local raw files are read at the same time on at most max_workers threads.
     """
-    weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2 =  extract_weather_data()
-    energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2 = extract_price_data()
-    generation_NL, generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2 = extract_energy_generation_data()
-    import_flow, export_flow = extract_flow_data()
-    return weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2, energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2, generation_NL,\
-          generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2, import_flow, export_flow
+    raw_files = [(path_specific, zone) for path_specific in ('weather_data', 'day_ahead_prices', 'energy_generation') for zone in ZONE_ORDER]
+    raw_files += [('import_flow', 'NL'), ('export_flow', 'NL')]
+    return tuple(load_local_files(raw_files, max_workers=max_workers))
+
+
+# Chunks of the streaming backfill per year: the source, the zone (or country code for the flows) and the raw data the
+# chunk is built from
+BACKFILL_CHUNKS = (
+    [('weather', zone, [('weather_data', zone)]) for zone in ZONE_ORDER]
+    + [('prices_generation', zone, [('day_ahead_prices', zone), ('energy_generation', zone)]) for zone in ZONE_ORDER]
+    + [('physical_flow', 'NL', [('import_flow', 'NL'), ('export_flow', 'NL')])]
+)
+
+
+def local_columns(path_specific: str, country_code: str) -> pd.Index:
+    '''
+    Returns the column labels of the local data of a source for a zone, as load_local reads it, without reading its rows.
+    '''
+    if raw_store.has_raw(path_specific, country_code):
+        return raw_store.raw_columns(path_specific, country_code)
+    return raw_store.raw_csv_columns(path_specific, country_code)
+
+
+def _iter_local_years(path_specific: str, country_code: str) -> Iterator[Tuple[int, pd.DataFrame]]:
+    '''
+    Streams the local data of a source for a zone one UTC year at a time, as (year, frame): from the yearly partitions
+    of the raw store when it has been converted, otherwise from the CSV file, read in chunks.
+    '''
+    if raw_store.has_raw(path_specific, country_code):
+        for year in raw_store.raw_years(path_specific, country_code):
+            yield year, raw_store.read_raw(path_specific, country_code, start_year=year, end_year=year)
+    else:
+        yield from raw_store.iter_raw_csv_years(path_specific, country_code)
+
+
+def iter_backfill_chunks(years: Optional[List[int]] = None) -> Iterator[Tuple[int, str, str, tuple]]:
+    """
+    Streams the historical data one year of one source for one zone at a time, as (year, source, zone, frames), where
+    frames are the raw frames of BACKFILL_CHUNKS for that year (prices then generation for 'prices_generation', import
+    then export for 'physical_flow'). The chunks come year after year, and every raw file is read one year ahead at
+    most, so the memory used is bounded by a year of the raw files. Chunks without any rows are skipped.
+    """
+    raw_files = [raw_file for _, _, chunk_files in BACKFILL_CHUNKS for raw_file in chunk_files]
+    readers = {raw_file: _iter_local_years(*raw_file) for raw_file in raw_files}
+    pending = {raw_file: next(reader, None) for raw_file, reader in readers.items()}
+    # frames without rows, for a raw file without data in a year
+    empty = {raw_file: item[1].iloc[:0] for raw_file, item in pending.items() if item is not None}
+    read_before = set()
+
+    while any(item is not None for item in pending.values()):
+        year = min(item[0] for item in pending.values() if item is not None)
+        year_frames = {}
+        for raw_file, item in pending.items():
+            if item is not None and item[0] == year:
+                year_frames[raw_file] = item[1]
+                pending[raw_file] = next(readers[raw_file], None)
+
+        if years is None or year in years:
+            for source, zone, chunk_files in BACKFILL_CHUNKS:
+                if not any(raw_file in year_frames for raw_file in chunk_files) or not all(raw_file in empty for raw_file in chunk_files):
+                    continue
+                frames = []
+                for raw_file in chunk_files:
+                    df = year_frames.get(raw_file, empty[raw_file])
+                    if raw_file[0] == 'energy_generation':
+                        df = _pad_year_chunk(df, year, pad_start=raw_file in read_before, pad_end=pending[raw_file] is not None)
+                    frames.append(df)
+                if any(len(df) for df in frames):
+                    yield year, source, zone, tuple(frames)
+        read_before.update(year_frames)
+        del year_frames
+
+
+def _pad_year_chunk(df: pd.DataFrame, year: int, pad_start: bool, pad_end: bool) -> pd.DataFrame:
+    '''
+    Adds empty rows at the first and/or last hour of the year to a yearly chunk of raw generation data. The hourly
+    resample of transform_generation_data fills the missing hours between the first and last timestamp with zeros,
+    so the padding makes it fill up to the chunk edges as well, like it does when the whole period is transformed.
+    A year without rows is only padded (as a whole year of zeros) between years with rows.
+    '''
+    if df.empty and not (pad_start and pad_end):
+        return df
+    hours = []
+    if pad_start:
+        hours.append(pd.Timestamp(year=year, month=1, day=1, tz='UTC'))
+    if pad_end:
+        hours.append(pd.Timestamp(year=year, month=12, day=31, hour=23, tz='UTC'))
+    if not hours:
+        return df
+    padding = pd.DataFrame(float('nan'), index=range(len(hours)), columns=df.columns)
+    padding[df.columns[0]] = hours
+    return pd.concat([padding, df], ignore_index=True)
 
 
-def extract_daily_data(forecast: bool = False):
+def extract_daily_data(forecast: bool = False, max_workers: int = MAX_WORKERS):
     """
     Fetches daily updates for weather, electricity prices, generation, and flow data, integrating them into a daily feature pipeline.
+    The per-zone API calls of each source run concurrently on at most max_workers threads.
     """
-    weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2 = extract_weather_data(load_locally=False, daily=True, forecast=forecast)
-    energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2 = extract_price_data(load_locally=False, daily=True, forecast=forecast)
-    generation_NL, generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2 = extract_energy_generation_data(load_locally=False, daily=True, forecast=forecast)
+    weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2 = extract_weather_data(load_locally=False, daily=True, forecast=forecast, max_workers=max_workers)
+    energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2 = extract_price_data(load_locally=False, daily=True, forecast=forecast, max_workers=max_workers)
+    generation_NL, generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2 = extract_energy_generation_data(load_locally=False, daily=True, forecast=forecast, max_workers=max_workers)
     
     if forecast:
         return weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2, energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2, generation_NL,\
             generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2
 
-    import_flow, export_flow = extract_flow_data(daily=True) # target, so not possible to forecast 
+    import_flow, export_flow = extract_flow_data(daily=True, max_workers=max_workers) # target, so not possible to forecast 
     return weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2, energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2, generation_NL,\
           generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2, import_flow, export_flow
 
@@ -1,7 +1,9 @@
 import hopsworks
 import pandas as pd
+from typing import Optional
 from great_expectations.core import ExpectationSuite
 from great_expectations.core.expectation_configuration import ExpectationConfiguration
+from feature_pipeline.ETL import schema
 from hsfs.feature_group import FeatureGroup
 from utils.settings import ENV_VARS
 import great_expectations as ge
@@ -502,6 +504,46 @@ def retrieve_feature_group(name: str, version: int):
     return feature_group
 
 
+def latest_feature_group_timestamps(fg: FeatureGroup, zone_column: str = 'country_code') -> dict:
+    '''
+    Returns the newest 'datetime' stored in a Feature Group for each value of zone_column.
+    '''
+    df = fg.select(['datetime', zone_column]).read()
+    if df.empty:
+        return {}
+    df['datetime'] = pd.to_datetime(df['datetime'], utc=True)
+    return df.groupby(zone_column)['datetime'].max().to_dict()
+
+
+def get_or_create_hourly_features_fg(feature_group_version: int) -> FeatureGroup:
+    '''
+    Retrieves the hourly_features Feature Group (the pivoted model features once per hour), or creates it. A created
+    Feature Group is only stored in the Feature Store by its first insert.
+    '''
+    feature_store = get_feature_store()
+    return feature_store.get_or_create_feature_group(
+        name="hourly_features",
+        version=feature_group_version,
+        description=(
+            'Pivoted multi-country weather, generation, and energy price features for each timestamp, once per hour. Training joins the cross-border flows (physical_flow) to them by datetime.'
+        ),
+        primary_key=["datetime"],
+        event_time="datetime"
+    )
+
+
+def latest_feature_group_datetime(fg: FeatureGroup) -> Optional[pd.Timestamp]:
+    '''
+    Returns the newest 'datetime' stored in a Feature Group with a row per hour, or None if it is empty or not stored yet.
+    '''
+    if fg.id is None:
+        return None
+    df = fg.select(['datetime']).read()
+    if df.empty:
+        return None
+    return pd.to_datetime(df['datetime'], utc=True).max()
+
+
 def get_feature_store(): 
     '''
     Connects to the Hopsworks Feature Store.
@@ -513,6 +555,6 @@ def get_feature_store():
 
 def insert_data_to_fg(data, fg):
     '''
-    Inserts data into a Feature Group.
+    Inserts data into a Feature Group, converted to the types the Feature Group stores.
     '''
-    fg.insert(data, write_options={"wait_for_job": True})
\ No newline at end of file
+    fg.insert(schema.for_feature_group(data, fg), write_options={"wait_for_job": True})
\ No newline at end of file
@@ -0,0 +1,373 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+from feature_pipeline.ETL import timestamps
+from typing import Iterator, List, Optional, Tuple
+from utils.settings import CSV_CACHE_DIR
+
+
+# Root of the Parquet raw store, partitioned as source=<source>/zone=<zone>/year=<year>
+RAW_STORE_DIR = './feature_pipeline/data/raw'
+# Read and write the raw store once it has been converted, off always uses the raw CSV files
+RAW_STORE = True
+# Raw sources and the zones (or country codes for the flows) they are stored for
+RAW_SOURCES = {
+    'weather_data': ('NL', 'BE', 'DE_LU', 'DK_1', 'GB', 'NO_2'),
+    'day_ahead_prices': ('NL', 'BE', 'DE_LU', 'DK_1', 'GB', 'NO_2'),
+    'energy_generation': ('NL', 'BE', 'DE_LU', 'DK_1', 'GB', 'NO_2'),
+    'import_flow': ('NL',),
+    'export_flow': ('NL',),
+}
+# Joins the levels of MultiIndex columns into a single Parquet column name
+MULTIINDEX_SEPARATOR = ' | '
+# Read the raw CSV files through the cache of parsed frames in CSV_CACHE_DIR, off parses every CSV file on every read
+CSV_CACHE = True
+# Version of the layout of the cached frames, a cache written with another version is parsed again
+CSV_CACHE_VERSION = 2
+# Rows of a raw CSV file parsed at a time when it is streamed one year at a time (iter_raw_csv_years)
+CSV_CHUNK_ROWS = 10000
+
+
+def _partition_dir(source: str, zone: str) -> str:
+    '''
+    Returns the directory holding the yearly partitions of a source for a zone.
+    '''
+    return os.path.join(RAW_STORE_DIR, f'source={source}', f'zone={zone}')
+
+
+def has_raw(source: str, zone: str) -> bool:
+    '''
+    Checks whether the raw store holds data of a source for a zone (never without RAW_STORE).
+    '''
+    return RAW_STORE and os.path.isdir(_partition_dir(source, zone))
+
+
+def raw_years(source: str, zone: str) -> List[int]:
+    '''
+    Returns the years with a partition in the raw store for a source and zone.
+    '''
+    if not has_raw(source, zone):
+        return []
+    names = os.listdir(_partition_dir(source, zone))
+    return sorted(int(name.split('=', 1)[1]) for name in names if name.startswith('year='))
+
+
+def _timestamp_column(df: pd.DataFrame):
+    '''
+    Returns the timestamp column of a raw frame: 'time' (weather), 'Timestamp' (prices) or else the saved index,
+    which is the first column.
+    '''
+    for column in ('time', 'Timestamp'):
+        if column in df.columns:
+            return column
+    return df.columns[0]
+
+
+def _flatten_columns(columns: pd.Index) -> List[str]:
+    '''
+    Converts (MultiIndex) column labels to the string names stored in Parquet.
+    '''
+    if isinstance(columns, pd.MultiIndex):
+        return [MULTIINDEX_SEPARATOR.join(map(str, column)) for column in columns]
+    return [str(column) for column in columns]
+
+
+def _restore_columns(names: List[str]) -> pd.Index:
+    '''
+    Converts stored Parquet column names back to the (MultiIndex) column labels of the raw CSV files.
+    '''
+    if names and all(MULTIINDEX_SEPARATOR in name for name in names):
+        return pd.MultiIndex.from_tuples([tuple(name.split(MULTIINDEX_SEPARATOR)) for name in names])
+    return pd.Index(names)
+
+
+def to_raw_frame(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Converts a frame as read from a raw CSV file into the typed layout of the raw store: the timestamp column as UTC
+    datetimes, every other column as float64, the saved row numbers dropped and the column labels flattened. Rows
+    without a timestamp are dropped.
+    '''
+    timestamp_column = _timestamp_column(df)
+    value_columns = [
+        column for column in df.columns
+        if column != timestamp_column and not (isinstance(column, str) and column.startswith('Unnamed'))
+    ]
+    names = _flatten_columns(pd.Index([timestamp_column] + value_columns, tupleize_cols=True))
+    values = [timestamps.parse_utc(df[timestamp_column])]
+    values += [pd.to_numeric(df[column], errors='coerce').astype('float64') for column in value_columns]
+    raw = pd.DataFrame(dict(zip(names, values)))
+    return raw[raw[names[0]].notna()].reset_index(drop=True)
+
+
+def write_raw(df: pd.DataFrame, source: str, zone: str) -> None:
+    '''
+    Writes a raw frame (as read from its CSV file) into the raw store, replacing what was stored for the source and zone.
+    '''
+    _write_partitions(to_raw_frame(df), source, zone)
+
+
+def append_raw(df: pd.DataFrame, source: str, zone: str) -> None:
+    '''
+    Adds the rows of a raw frame (as read from its CSV file) that are newer than the raw store holds for the source and
+    zone. Only the yearly partitions of the new rows are rewritten, so older rows that changed are not updated (write_raw
+    or convert_csv_store replace everything).
+    '''
+    raw = to_raw_frame(df)
+    years = raw_years(source, zone)
+    if years:
+        last_partition = os.path.join(_partition_dir(source, zone), f'year={years[-1]}')
+        stored = ds.dataset(last_partition, format='parquet').to_table().to_pandas()
+        if len(stored):
+            raw = raw[raw[raw.columns[0]] > stored[stored.columns[0]].max()]
+            if raw.empty:
+                return
+            if raw[raw.columns[0]].dt.year.min() == years[-1]:
+                # the partition is replaced as a whole, so it gets the stored rows as well
+                raw = pd.concat([stored, raw], ignore_index=True)
+    _write_partitions(raw, source, zone)
+
+
+def _write_partitions(raw: pd.DataFrame, source: str, zone: str) -> None:
+    '''
+    Writes a frame in the layout of the raw store, replacing the yearly partitions its rows fall in.
+    '''
+    raw = raw.assign(year=raw[raw.columns[0]].dt.year.astype('int32'))
+    ds.write_dataset(
+        pa.Table.from_pandas(raw, preserve_index=False),
+        _partition_dir(source, zone),
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([('year', pa.int32())]), flavor='hive'),
+        existing_data_behavior='delete_matching'
+    )
+
+
+def read_raw(
+    source: str,
+    zone: str,
+    columns: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None
+) -> pd.DataFrame:
+    '''
+    Reads a source for a zone from the raw store in the column layout of its raw CSV file. Only the requested
+    columns (plus the timestamp) are read, and only the yearly partitions between start_year and end_year.
+    '''
+    dataset = ds.dataset(_partition_dir(source, zone), format='parquet', partitioning='hive')
+    year = ds.field('year')
+    year_filter = None
+    if start_year is not None:
+        year_filter = year >= start_year
+    if end_year is not None:
+        year_filter = year <= end_year if year_filter is None else year_filter & (year <= end_year)
+
+    names = [name for name in dataset.schema.names if name != 'year']
+    if columns is not None:
+        requested = set(_flatten_columns(pd.Index(columns, tupleize_cols=True)))
+        names = [names[0]] + [name for name in names[1:] if name in requested]
+
+    df = dataset.to_table(columns=names, filter=year_filter).to_pandas()
+    if not df[names[0]].is_monotonic_increasing:
+        df = df.sort_values(by=names[0], kind='stable').reset_index(drop=True)
+    df.columns = _restore_columns(names)
+    return df
+
+
+def read_raw_csv(source: str, zone: str) -> pd.DataFrame:
+    '''
+    Reads a raw CSV file from feature_pipeline/data.
+    '''
+    path = f'./feature_pipeline/data/{zone}_{source}.csv'
+    return pd.read_csv(path, header=[0, 1] if csv_header_rows(path) == 2 else 0)
+
+
+def csv_header_rows(path: str) -> int:
+    '''
+    Returns the number of header rows of a raw CSV file: two when the second line holds the 'Actual Aggregated' /
+    'Actual Consumption' level of the generation columns, else one.
+    '''
+    with open(path, newline='') as f:
+        next(f)
+        second = next(csv.reader(f), [])
+    return 2 if len(second) > 1 and second[0] == '' and second[1].startswith('Actual') else 1
+
+
+def _csv_options(path: str) -> Tuple[pd.Index, pa_csv.ReadOptions, pa_csv.ConvertOptions]:
+    '''
+    Returns the column labels of the columns the transforms use from a raw CSV file, and the pyarrow options that parse
+    only those columns: the timestamp as strings and every value column as float64. The saved row numbers and the
+    'Actual Consumption' columns are skipped.
+    '''
+    header_rows = csv_header_rows(path)
+    columns = pd.read_csv(path, header=[0, 1] if header_rows == 2 else 0, nrows=0).columns
+    timestamp_column = _timestamp_column(pd.DataFrame(columns=columns))
+
+    names = [f'column_{i}' for i in range(len(columns))]
+    used = []
+    for name, column in zip(names, columns):
+        # the metric level of a two-row header, else the single label (like "('Biomass', 'Actual Consumption')")
+        label = column[-1] if isinstance(column, tuple) else column
+        if column == timestamp_column:
+            used.append((name, pa.string()))
+        elif not (label.startswith('Unnamed') or 'Consumption' in label):
+            used.append((name, pa.float64()))
+
+    labels = columns[[names.index(name) for name, _ in used]]
+    read_options = pa_csv.ReadOptions(skip_rows=header_rows, column_names=names)
+    convert_options = pa_csv.ConvertOptions(include_columns=[name for name, _ in used], column_types=dict(used))
+    return labels, read_options, convert_options
+
+
+def read_raw_csv_fast(source: str, zone: str) -> pd.DataFrame:
+    '''
+    Reads a raw CSV file with the multi-threaded pyarrow CSV engine into the frame the transforms expect from
+    read_raw_csv: the same column labels, the timestamp as strings and every value column as float64. Only the
+    columns the transforms use are parsed.
+    '''
+    path = f'./feature_pipeline/data/{zone}_{source}.csv'
+    labels, read_options, convert_options = _csv_options(path)
+    df = pa_csv.read_csv(path, read_options=read_options, convert_options=convert_options).to_pandas()
+    df.columns = labels
+    return df
+
+
+def raw_csv_columns(source: str, zone: str) -> pd.Index:
+    '''
+    Returns the column labels of the frames read from a raw CSV file by read_raw_csv_cached, without reading its rows.
+    '''
+    labels, _, _ = _csv_options(f'./feature_pipeline/data/{zone}_{source}.csv')
+    return _restore_columns(list(to_raw_frame(pd.DataFrame(columns=labels)).columns))
+
+
+def raw_columns(source: str, zone: str) -> pd.Index:
+    '''
+    Returns the column labels of the frames read from the raw store by read_raw, without reading its rows.
+    '''
+    dataset = ds.dataset(_partition_dir(source, zone), format='parquet', partitioning='hive')
+    return _restore_columns([name for name in dataset.schema.names if name != 'year'])
+
+
+def iter_raw_csv_years(source: str, zone: str) -> Iterator[Tuple[int, pd.DataFrame]]:
+    '''
+    Streams a raw CSV file in chunks of CSV_CHUNK_ROWS rows and yields (year, frame) per UTC year, in the layout of
+    read_raw_csv_cached. The file is sorted by time, so only the rows of one year and a chunk are in memory at a time.
+    The pandas reader is used, as an open pyarrow streaming reader holds several blocks of the file.
+    '''
+    path = f'./feature_pipeline/data/{zone}_{source}.csv'
+    labels, _, _ = _csv_options(path)
+    reader = pd.read_csv(path, header=[0, 1] if csv_header_rows(path) == 2 else 0, chunksize=CSV_CHUNK_ROWS)
+    year, parts = None, []
+    for df in reader:
+        raw = to_raw_frame(df[labels])
+        row_years = raw[raw.columns[0]].dt.year
+        for row_year in row_years.unique():
+            if year is not None and row_year < year:
+                raise ValueError(f'{zone}_{source}.csv is not sorted by time.')
+            if year is not None and row_year != year:
+                yield year, _year_frame(parts)
+                parts = []
+            year = int(row_year)
+            parts.append(raw[row_years == row_year])
+    if year is not None:
+        yield year, _year_frame(parts)
+
+
+def _year_frame(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    '''
+    Concatenates the parts of a year read by iter_raw_csv_years, with the column labels of the raw CSV file.
+    '''
+    df = pd.concat(parts, ignore_index=True)
+    df.columns = _restore_columns(list(df.columns))
+    return df
+
+
+def _file_hash(path: str) -> str:
+    '''
+    Returns the SHA-1 of the content of a file, read in blocks.
+    '''
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _cache_is_valid(csv_path: str, fingerprint_path: str) -> bool:
+    '''
+    Checks the fingerprint of a cached CSV file. An unchanged size and mtime is a hit without reading the file; when
+    only the mtime changed (e.g. a fresh checkout) the content hash decides, and the new mtime is saved on a hit.
+    '''
+    if not os.path.exists(fingerprint_path):
+        return False
+    with open(fingerprint_path) as f:
+        fingerprint = json.load(f)
+    if fingerprint.get('version') != CSV_CACHE_VERSION:
+        return False
+    stat = os.stat(csv_path)
+    if fingerprint['size'] != stat.st_size:
+        return False
+    if fingerprint['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if fingerprint['sha1'] != _file_hash(csv_path):
+        return False
+    _write_fingerprint(csv_path, fingerprint_path, fingerprint['sha1'])
+    return True
+
+
+def _write_fingerprint(csv_path: str, fingerprint_path: str, sha1: str) -> None:
+    stat = os.stat(csv_path)
+    with open(fingerprint_path + '.tmp', 'w') as f:
+        json.dump({'version': CSV_CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': sha1}, f)
+    os.replace(fingerprint_path + '.tmp', fingerprint_path)
+
+
+def read_raw_csv_cached(source: str, zone: str) -> pd.DataFrame:
+    '''
+    Reads a raw CSV file through a cache of parsed frames in CSV_CACHE_DIR, stored as uncompressed Feather (Arrow IPC)
+    files in the layout of the raw store, so the timestamps are already parsed as UTC datetimes. The CSV file is only
+    parsed again (with read_raw_csv_fast) when its size, mtime and content hash no longer match the fingerprint saved
+    next to the cache. Without CSV_CACHE the CSV file is parsed on every read.
+    '''
+    if not CSV_CACHE:
+        df = to_raw_frame(read_raw_csv_fast(source, zone))
+        df.columns = _restore_columns(list(df.columns))
+        return df
+    csv_path = f'./feature_pipeline/data/{zone}_{source}.csv'
+    cache_path = os.path.join(CSV_CACHE_DIR, f'{zone}_{source}.arrow')
+    fingerprint_path = os.path.join(CSV_CACHE_DIR, f'{zone}_{source}.json')
+
+    if not (os.path.exists(cache_path) and _cache_is_valid(csv_path, fingerprint_path)):
+        os.makedirs(CSV_CACHE_DIR, exist_ok=True)
+        # hash before parsing, so a CSV file rewritten while it is parsed gets parsed again next time
+        sha1 = _file_hash(csv_path)
+        raw = to_raw_frame(read_raw_csv_fast(source, zone))
+        feather.write_feather(raw, cache_path + '.tmp', compression='uncompressed')
+        os.replace(cache_path + '.tmp', cache_path)
+        _write_fingerprint(csv_path, fingerprint_path, sha1)
+
+    # the conversion to pandas copies the columns, so memory-mapping the file would not save memory
+    df = feather.read_feather(cache_path)
+    df.columns = _restore_columns(list(df.columns))
+    return df
+
+
+def convert_csv_store() -> None:
+    '''
+    One-off conversion of the raw CSV files in feature_pipeline/data into the Parquet raw store.
+    '''
+    for source, zones in RAW_SOURCES.items():
+        for zone in zones:
+            write_raw(read_raw_csv(source, zone), source, zone)
+            print(f'Converted {zone}_{source}.csv into the raw store.')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Converts the raw CSV files into the partitioned Parquet raw store.')
+    parser.parse_args()
+    convert_csv_store()
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+# Query parameters left out of the fixture keys (and never written to the fixtures): the API keys
+IGNORED_PARAMETERS = ('securityToken', 'apikey')
+# Response headers saved in the fixtures
+SAVED_HEADERS = ('Content-Type', 'Content-Disposition', 'Retry-After')
+
+
+def fixture_key(request: requests.PreparedRequest) -> str:
+    '''
+    Returns the fixture name of a request: a hash of its method, host, path and sorted query parameters without the API keys.
+    '''
+    url = urlsplit(request.url)
+    query = sorted((name, value) for name, value in parse_qsl(url.query) if name not in IGNORED_PARAMETERS)
+    text = f'{request.method} {url.netloc}{url.path}?{urlencode(query)}'
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _fixture_path(fixture_dir: str, request: requests.PreparedRequest) -> str:
+    return os.path.join(fixture_dir, f'{fixture_key(request)}.gz')
+
+
+class RecordingAdapter(BaseAdapter):
+    '''
+    Transport adapter that sends requests through another adapter and saves every successful (or 'no data') response
+    as a gzip compressed fixture: a JSON line with the status and headers, followed by the raw body.
+    '''
+
+    def __init__(self, adapter: BaseAdapter, fixture_dir: str):
+        super().__init__()
+        self.adapter = adapter
+        self.fixture_dir = fixture_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    def send(self, request, **kwargs):
+        response = self.adapter.send(request, **kwargs)
+        if response.status_code < 500 and response.status_code != 429:
+            meta = {
+                'status': response.status_code,
+                'headers': {name: response.headers[name] for name in SAVED_HEADERS if name in response.headers},
+            }
+            path = _fixture_path(self.fixture_dir, request)
+            with gzip.open(path + '.tmp', 'wb') as f:
+                f.write(json.dumps(meta).encode() + b'\n')
+                f.write(response.content)
+            os.replace(path + '.tmp', path)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    '''
+    Transport adapter that serves recorded fixtures instead of sending requests. Every response is delayed by latency
+    seconds (plus up to jitter seconds), and a share error_rate of the requests fails with error_status instead, to
+    exercise the retries. A request without a fixture raises a RequestException.
+    '''
+
+    def __init__(self, fixture_dir: str, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(0)
+        self._random_lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        with self._random_lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay)
+
+        if failed:
+            return self._build_response(request, self.error_status, {'Content-Type': 'text/plain'}, b'Injected error')
+        path = _fixture_path(self.fixture_dir, request)
+        if not os.path.exists(path):
+            raise requests.RequestException(f'No recorded fixture for {request.url}', request=request)
+        with gzip.open(path, 'rb') as f:
+            meta = json.loads(f.readline())
+            body = f.read()
+        return self._build_response(request, meta['status'], meta['headers'], body)
+
+    @staticmethod
+    def _build_response(request: requests.PreparedRequest, status: int, headers: dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = 'Replayed'
+        return response
+
+    def close(self):
+        pass
+
+
+def write_recording_info(fixture_dir: str, today: str) -> None:
+    '''
+    Saves the day a recording was made, so the daily extractions can ask for the same days when replaying it.
+    '''
+    os.makedirs(fixture_dir, exist_ok=True)
+    with open(os.path.join(fixture_dir, 'recording.json'), 'w') as f:
+        json.dump({'today': today}, f)
+
+
+def read_recording_info(fixture_dir: str) -> Optional[str]:
+    '''
+    Returns the day a recording was made, or None if it is unknown.
+    '''
+    path = os.path.join(fixture_dir, 'recording.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get('today')
@@ -0,0 +1,141 @@
+import random
+import threading
+import time
+import requests
+from email.utils import parsedate_to_datetime
+from requests.adapters import BaseAdapter, HTTPAdapter
+from typing import Dict, Optional, Tuple
+
+
+# Status codes of throttled or temporarily failing requests, which are retried
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    '''
+    Thread-safe token bucket: tokens are added at a fixed rate up to a capacity, and every request takes one.
+    '''
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        '''
+        Takes a token, waiting until one is available. Returns the number of seconds waited.
+        '''
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        '''
+        Hands out no tokens for the next seconds (e.g. after the server throttled a request) and empties the bucket.
+        '''
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class RequestScheduler(HTTPAdapter):
+    '''
+    Transport adapter that sends every request through a shared token bucket. Throttled (429) and temporarily failing
+    requests are retried with exponential backoff and full jitter, where a 429 (or its Retry-After) pauses the whole
+    bucket so the other threads back off as well. The jitter is capped at max_backoff, but a Retry-After is honoured up
+    to max_retry_after, since ENTSO-E blocks a key for 10 minutes once it exceeds its rate limit. Requests without a timeout get the default one. Only requests that
+    reach the network pass the adapter, so responses served from the HTTP cache do not use the rate budget. The requests
+    are sent over HTTP, or through transport when it is set (e.g. a replay.ReplayAdapter).
+    '''
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: int,
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60.0,
+        max_retry_after: float = 600.0,
+        timeout: Tuple[float, float] = (10.0, 120.0),
+        transport: Optional[BaseAdapter] = None
+    ):
+        super().__init__(max_retries=0)
+        self.bucket = TokenBucket(rate=requests_per_minute / 60, capacity=burst)
+        self.retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+        self.transport = transport
+        self._counters = {'requests': 0, 'retries': 0, 'throttled': 0, 'waits': 0, 'wait_seconds': 0.0, 'backoff_seconds': 0.0}
+        self._counters_lock = threading.Lock()
+
+    def _count(self, **increments) -> None:
+        with self._counters_lock:
+            for name, increment in increments.items():
+                self._counters[name] += increment
+
+    def stats(self) -> Dict[str, float]:
+        '''
+        Returns the number of requests sent, retries, throttled (429) responses, waits for a token and time spent
+        waiting for tokens and backing off.
+        '''
+        with self._counters_lock:
+            return dict(self._counters)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        '''
+        Returns the seconds to wait before a retry: full jitter over an exponentially growing window of at most
+        max_backoff, but at least the Retry-After of the response, up to max_retry_after.
+        '''
+        delay = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.max_retry_after))
+            except ValueError:
+                # Neither seconds nor a valid HTTP date: keep the jitter delay
+                try:
+                    seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    delay = max(delay, min(seconds, self.max_retry_after))
+                except (TypeError, ValueError):
+                    pass
+        return delay
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        timeout = self.timeout if timeout is None else timeout
+        send = super().send if self.transport is None else self.transport.send
+        for attempt in range(self.retries + 1):
+            waited = self.bucket.acquire()
+            self._count(requests=1, waits=int(waited > 0), wait_seconds=waited)
+            try:
+                response = send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                response = None
+            else:
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    return response
+
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                if response.status_code == 429:
+                    self.bucket.pause(delay)
+                    self._count(throttled=1)
+                # Release the connection of the response that is retried
+                response.close()
+            self._count(retries=1, backoff_seconds=delay)
+            time.sleep(delay)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Sequence, Union
+
+
+# Convert the pipeline frames to the compact dtypes below (turned off to compare the memory with the float64 frames)
+COMPACT_DTYPES = True
+
+# Bidding zones, sorted so the one-hot columns of the categorical zone columns keep the order of the string columns
+ZONE_CODES = ('BE', 'DE_LU', 'DK_1', 'GB', 'NL', 'NO_2')
+ZONE_DTYPE = pd.CategoricalDtype(categories=ZONE_CODES)
+# Former bidding zones, as the zone that replaced them (DE_AT_LU was split into DE_LU and AT in October 2018), which
+# entsoe-py still lists as neighbours
+ZONE_ALIASES = {'DE_AT_LU': 'DE_LU'}
+# Columns holding a bidding zone
+ZONE_COLUMNS = ('country_code', 'country_from', 'country_to')
+# Columns holding an hour, as int64 nanoseconds since epoch in UTC
+TIMESTAMP_COLUMNS = ('datetime',)
+TIMESTAMP_DTYPE = 'datetime64[ns, UTC]'
+# Every other numeric column is a measurement (weather, price, generation or flow)
+MEASUREMENT_DTYPE = 'float32'
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Converts a pipeline frame to the compact dtypes: categorical zone columns, UTC nanosecond timestamps and float32
+    measurements. Columns that already have their dtype are not copied.
+    '''
+    if not COMPACT_DTYPES:
+        return df
+    dtypes = {}
+    for column, dtype in df.dtypes.items():
+        if column in ZONE_COLUMNS:
+            target = ZONE_DTYPE
+        elif column in TIMESTAMP_COLUMNS:
+            target = TIMESTAMP_DTYPE
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            target = MEASUREMENT_DTYPE
+        else:
+            continue
+        if dtype != target:
+            dtypes[column] = target
+    return df.astype(dtypes) if dtypes else df
+
+
+def zone_codes(zones: Sequence[str]) -> np.ndarray:
+    '''
+    Returns the positions of zones in ZONE_CODES, to build zone columns from codes with zone_column. Categorical zones
+    are mapped by their categories, without converting every value. Former zones get the code of the zone that replaced
+    them (ZONE_ALIASES).
+    '''
+    if isinstance(getattr(zones, 'dtype', None), pd.CategoricalDtype):
+        categorical = pd.Categorical(zones)
+        if (categorical.codes < 0).any():
+            raise ValueError('Missing zones')
+        return zone_codes(categorical.categories)[categorical.codes]
+    codes = ZONE_DTYPE.categories.get_indexer(zones)
+    if (codes < 0).any():
+        zones = pd.Index(zones).map(lambda zone: ZONE_ALIASES.get(zone, zone))
+        codes = ZONE_DTYPE.categories.get_indexer(zones)
+    if (codes < 0).any():
+        raise ValueError(f'Unknown zones: {sorted(set(np.asarray(zones)[codes < 0]))}')
+    return codes.astype('int8')
+
+
+def zone_column(codes: np.ndarray) -> Union[pd.Categorical, np.ndarray]:
+    '''
+    Returns a zone column from zone_codes: categorical without building an array of strings, or strings when
+    COMPACT_DTYPES is off.
+    '''
+    if COMPACT_DTYPES:
+        return pd.Categorical.from_codes(codes, dtype=ZONE_DTYPE)
+    return np.array(ZONE_CODES, dtype=object)[codes]
+
+
+def for_feature_group(df: pd.DataFrame, fg) -> pd.DataFrame:
+    '''
+    Converts a frame to the types of a feature group before it is inserted. The zone columns become strings, because
+    the feature store has no categorical type. Measurements go back to float64 when the feature group already stores
+    them as double (it was created before the compact schema). New feature groups get float measurements.
+    '''
+    feature_types = {feature.name: feature.type for feature in getattr(fg, 'features', None) or []}
+    dtypes = {}
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtypes[column] = object
+        elif dtype == np.float32 and feature_types.get(column) == 'double':
+            dtypes[column] = 'float64'
+    return df.astype(dtypes) if dtypes else df
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    '''
+    Returns the memory used by a frame in MB, including the strings of object columns.
+    '''
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def print_memory_report(before: Dict[str, float], after: Dict[str, float]) -> None:
+    '''
+    Prints the memory in MB (memory_mb) of frames before and after applying the schema, keyed by name.
+    '''
+    for name, mb_before in before.items():
+        mb_after = after[name]
+        print(f'{name:<24} {mb_before:9.1f} MB -> {mb_after:9.1f} MB ({mb_after / mb_before:.0%})')
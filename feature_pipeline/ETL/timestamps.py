@@ -0,0 +1,198 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+# Width of the longest known timestamp layout: 'YYYY-MM-DD HH:MM:SS+HH:MM' (ENTSO-E, with the UTC offset)
+TIMESTAMP_WIDTH = 25
+# Positions of the digits of 'YYYY-MM-DD HH:MM:SS' and of the separators between them ('T' is accepted for ' ')
+DIGIT_POSITIONS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+SEPARATORS = {4: b'-', 7: b'-', 13: b':', 16: b':'}
+# Number of parsed timestamp columns kept, so the columns shared by several files are parsed once
+CACHE_SIZE = 32
+
+_cache = OrderedDict()
+
+
+def parse_utc(values) -> pd.DatetimeIndex:
+    '''
+    Parses timestamps into a UTC DatetimeIndex, like pd.to_datetime(values, utc=True).
+    '''
+    # datetimes are only converted
+    if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+        return pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+    # strings in the known layouts ('YYYY-MM-DD HH:MM:SS' with a '+HH:MM' offset, 'Z' or none) are parsed on their
+    # characters in one vectorized pass; naive ones are labelled UTC as they are, like pd.to_datetime(utc=True)
+    strings = np.asarray(values, dtype=object)
+    # missing values become NaT, like in pd.to_datetime
+    missing = pd.isna(strings)
+    try:
+        chars = np.asarray(strings[~missing] if missing.any() else strings, dtype=f'S{TIMESTAMP_WIDTH + 1}')
+    except (UnicodeEncodeError, ValueError):
+        chars = None
+    epochs = None if chars is None else _cached_epochs(chars)
+    # anything else falls back to pd.to_datetime
+    if epochs is None:
+        return pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+    if missing.any():
+        epochs, parsed = np.full(len(strings), np.iinfo('int64').min), epochs
+        epochs[~missing] = parsed
+    return pd.DatetimeIndex(epochs.view('datetime64[ns]'), name=getattr(values, 'name', None)).tz_localize('UTC')
+
+
+def _cached_epochs(chars: np.ndarray) -> Optional[np.ndarray]:
+    '''
+    Returns the epoch nanoseconds of a column of timestamp strings from the cache, or parses and caches them.
+    '''
+    key = hashlib.sha1(chars).hexdigest() + str(chars.shape)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    epochs = _parse_epochs(chars)
+    if epochs is not None:
+        epochs.flags.writeable = False
+        _cache[key] = epochs
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return epochs
+
+
+def _parse_epochs(chars: np.ndarray) -> Optional[np.ndarray]:
+    '''
+    Parses fixed-width timestamp strings into int64 epoch nanoseconds, or returns None when a string is not in one of
+    the known layouts (or is not a valid time). In a column sorted by time, like a regular hourly grid, only the first
+    string of every date (and UTC offset) is parsed in full and the others only for their time of day. Otherwise every
+    distinct string is parsed once.
+    '''
+    if not len(chars):
+        return np.array([], dtype='int64')
+    bytes_ = chars.view('uint8').reshape(len(chars), -1)
+    if bytes_.shape[1] > TIMESTAMP_WIDTH and bytes_[:, TIMESTAMP_WIDTH].any():
+        return None
+    if bytes_.shape[1] < TIMESTAMP_WIDTH:
+        bytes_ = np.pad(bytes_, ((0, 0), (0, TIMESTAMP_WIDTH - bytes_.shape[1])))
+
+    starts = _run_starts(bytes_)
+    if 2 * len(starts) <= len(chars):
+        return _parse_runs(bytes_, starts)
+    # the dates change from row to row, so the column is not sorted and repeated strings can be anywhere
+    codes, first = _distinct(chars, bytes_)
+    if len(first) == len(chars):
+        return _parse_bytes(bytes_)
+    epochs = _parse_epochs(chars[first])
+    return None if epochs is None else epochs[codes]
+
+
+def _field(bytes_: np.ndarray, start: int, dtype: str) -> np.ndarray:
+    '''
+    Returns the bytes of every row of a byte matrix from start on as one integer column (a view, without copying).
+    '''
+    return np.ndarray((len(bytes_),), dtype=dtype, buffer=bytes_, offset=start, strides=(bytes_.strides[0],))
+
+
+def _run_starts(bytes_: np.ndarray) -> np.ndarray:
+    '''
+    Returns the rows whose date or UTC offset differs from the row before (and the first row).
+    '''
+    changes = np.zeros(len(bytes_), dtype=bool)
+    changes[0] = True
+    for start, dtype in ((0, '<u8'), (8, '<u2'), (19, '<u4'), (23, '<u2')):
+        field = _field(bytes_, start, dtype)
+        changes[1:] |= field[1:] != field[:-1]
+    return np.flatnonzero(changes)
+
+
+def _parse_runs(bytes_: np.ndarray, starts: np.ndarray) -> Optional[np.ndarray]:
+    '''
+    Parses the rows of a byte matrix of fixed-width timestamps where the rows from every start on share its date and
+    UTC offset: the starts are parsed in full, the other rows by the difference of their time of day.
+    '''
+    parsed = _parse_bytes(bytes_[starts])
+    if parsed is None:
+        return None
+    separator = _field(bytes_, 10, 'u1')
+    if ((separator != ord(' ')) & (separator != ord('T'))).any():
+        return None
+    if ((_field(bytes_, 13, 'u1') != ord(':')) | (_field(bytes_, 16, 'u1') != ord(':'))).any():
+        return None
+    seconds = np.zeros(len(bytes_), dtype='int64')
+    for start, unit, limit in ((11, 3600, 23), (14, 60, 59), (17, 1, 59)):
+        pair = _field(bytes_, start, '<u2')
+        tens, units = (pair & 0xff).astype('int64') - ord('0'), (pair >> 8).astype('int64') - ord('0')
+        value = tens * 10 + units
+        if ((tens < 0) | (tens > 9) | (units < 0) | (units > 9) | (value > limit)).any():
+            return None
+        seconds += value * unit
+
+    lengths = np.diff(np.append(starts, len(bytes_)))
+    return np.repeat(parsed - seconds[starts] * 10**9, lengths) + seconds * 10**9
+
+
+def _distinct(chars: np.ndarray, bytes_: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Returns for every string the number of its distinct string, and the row of the first occurrence of every distinct
+    string. The strings are factorized on a hash of their bytes as integers, and compared afterwards to rule out
+    collisions (which fall back to sorting the strings).
+    '''
+    key = _field(bytes_, 0, '<u8') * np.uint64(0x9E3779B97F4A7C15)
+    key = (key ^ _field(bytes_, 8, '<u8')) * np.uint64(0xBF58476D1CE4E5B9)
+    key = (key ^ _field(bytes_, 16, '<u8')) * np.uint64(0x94D049BB133111EB) ^ _field(bytes_, 24, 'u1')
+    codes, distinct = pd.factorize(key)
+    first = np.empty(len(distinct), dtype='int64')
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    if (chars[first][codes] != chars).any():
+        _, first, codes = np.unique(chars, return_index=True, return_inverse=True)
+    return codes, first
+
+
+def _parse_offsets(bytes_: np.ndarray) -> Optional[np.ndarray]:
+    '''
+    Returns the UTC offsets in seconds of fixed-width timestamps: none, 'Z' or '+HH:MM'/'-HH:MM', or None when one of
+    them is anything else.
+    '''
+    sign = bytes_[:, 19]
+    no_offset = (sign == 0) | ((sign == ord('Z')) & (bytes_[:, 20] == 0))
+    with_offset = ((sign == ord('+')) | (sign == ord('-'))) & (bytes_[:, 22] == ord(':'))
+    offset_digits = bytes_[:, [20, 21, 23, 24]].astype('int64') - ord('0')
+    if not (no_offset | (with_offset & ((offset_digits >= 0) & (offset_digits <= 9)).all(axis=1))).all():
+        return None
+    if (bytes_[no_offset, 20:] != 0).any():
+        return None
+    offsets = np.where(no_offset, 0, (offset_digits[:, 0] * 10 + offset_digits[:, 1]) * 3600 + (offset_digits[:, 2] * 10 + offset_digits[:, 3]) * 60)
+    return np.where(sign == ord('-'), -offsets, offsets)
+
+
+def _parse_bytes(bytes_: np.ndarray) -> Optional[np.ndarray]:
+    '''
+    Parses the rows of a byte matrix of fixed-width timestamps into int64 epoch nanoseconds, or returns None when
+    a row is not in one of the known layouts (or is not a valid time).
+    '''
+    digits = bytes_[:, DIGIT_POSITIONS].astype('int64') - ord('0')
+    if ((digits < 0) | (digits > 9)).any():
+        return None
+    if any((bytes_[:, position] != ord(separator)).any() for position, separator in SEPARATORS.items()):
+        return None
+    if ((bytes_[:, 10] != ord(' ')) & (bytes_[:, 10] != ord('T'))).any():
+        return None
+    offsets = _parse_offsets(bytes_)
+    if offsets is None:
+        return None
+
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    hour = digits[:, 8] * 10 + digits[:, 9]
+    minute = digits[:, 10] * 10 + digits[:, 11]
+    second = digits[:, 12] * 10 + digits[:, 13]
+    if ((month < 1) | (month > 12) | (hour > 23) | (minute > 59) | (second > 59)).any():
+        return None
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    month_starts = months.astype('datetime64[D]').astype('int64')
+    month_lengths = (months + 1).astype('datetime64[D]').astype('int64') - month_starts
+    if ((day < 1) | (day > month_lengths)).any():
+        return None
+
+    seconds = (month_starts + day - 1) * 86400 + hour * 3600 + minute * 60 + second - offsets
+    return seconds * 10**9
@@ -1,63 +1,71 @@
+import numpy as np
 import pandas as pd
 import hsfs
-from typing import Optional
+from feature_pipeline.ETL import schema, timestamps
+from feature_pipeline.ETL.dataset import HOUR_NS, HourlyZoneDataset
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 def merge_export_import(export_data: pd.DataFrame, import_data: pd.DataFrame, from_api: bool = False) -> pd.DataFrame:
     '''
-    Merges the export and import dataframes into a single dataframe from raw data.
+    Merges the export and import dataframes into a single long dataframe (datetime, country_from, country_to,
+    energy_sent) from raw data. The long columns are built straight from the wide value arrays with repeat/ravel (the
+    zones as codes), one row per datetime and border with the export borders of a datetime before its import borders,
+    so the rows are already in datetime order.
     '''
-    export_data = transform_flow(export_data, export=True, from_api=from_api)
-    import_data = transform_flow(import_data, export=False, from_api=from_api)
-    combined_data = pd.concat([export_data, import_data], ignore_index=True)
-    combined_data = combined_data.sort_values(by='datetime')
-    combined_data = combined_data.reset_index(drop=True)
-    return combined_data
-
-
-def transform_flow(df: pd.DataFrame, export: bool = True, from_api: bool = False) -> pd.DataFrame:
-    '''
-    Transforms the flow data into a clean dataframe format.
-    '''
-    df_cleaned = df.copy()
-
-    df_cleaned = _clean_flow_columns(df_cleaned, from_api=from_api)
-    if export:
-        df_cleaned = df_cleaned.melt(
-            id_vars=['datetime'],  # Keep 'datetime' as is
-            var_name='country_to',  # New column for countries
-            value_name='energy_sent'  # New column for energy values
-            )
-        df_cleaned['country_from'] = 'NL'
+    export_datetimes, export_zones, export_values = _flow_arrays(export_data, from_api=from_api)
+    import_datetimes, import_zones, import_values = _flow_arrays(import_data, from_api=from_api)
+    nl = schema.zone_codes(['NL'])
+    export_zones, import_zones = schema.zone_codes(export_zones), schema.zone_codes(import_zones)
+
+    if export_datetimes.equals(import_datetimes):
+        # the same hours in both files: every wide row becomes the export and import rows of its datetime
+        datetimes = export_datetimes.repeat(len(export_zones) + len(import_zones))
+        countries_from = np.tile(np.concatenate([nl.repeat(len(export_zones)), import_zones]), len(export_datetimes))
+        countries_to = np.tile(np.concatenate([export_zones, nl.repeat(len(import_zones))]), len(export_datetimes))
+        values = np.hstack([export_values, import_values]).ravel()
     else:
-        df_cleaned = df_cleaned.melt(
-            id_vars=['datetime'],  # Keep 'datetime' as is
-            var_name='country_from',  # New column for countries
-            value_name='energy_sent'  # New column for energy values
-            )
-        df_cleaned['country_to'] = 'NL'
-    
-    df_cleaned = df_cleaned[['datetime', 'country_from', 'country_to', 'energy_sent']]
-    df_cleaned.reset_index(drop=True, inplace=True)
-    return df_cleaned
-
-
-def _clean_flow_columns(df: pd.DataFrame, from_api: bool = False) -> pd.DataFrame:
+        # both long blocks one after another, merged into datetime order by a stable sort
+        datetimes = export_datetimes.repeat(len(export_zones)).append(import_datetimes.repeat(len(import_zones)))
+        countries_from = np.concatenate([nl.repeat(export_values.size), np.tile(import_zones, len(import_datetimes))])
+        countries_to = np.concatenate([np.tile(export_zones, len(export_datetimes)), nl.repeat(import_values.size)])
+        values = np.concatenate([export_values.ravel(), import_values.ravel()])
+        order = np.argsort(datetimes.asi8, kind='stable')
+        datetimes, countries_from, countries_to, values = datetimes[order], countries_from[order], countries_to[order], values[order]
+
+    combined_data = pd.DataFrame({
+        'datetime': datetimes,
+        'country_from': schema.zone_column(countries_from),
+        'country_to': schema.zone_column(countries_to),
+        'energy_sent': values,
+    }, copy=False)
+    return schema.apply_schema(combined_data)
+
+
+def _flow_arrays(df: pd.DataFrame, from_api: bool = False) -> Tuple[pd.DatetimeIndex, pd.Index, np.ndarray]:
     '''
-    Cleans the flow data columns.
+    Returns the datetimes (UTC, sorted), the neighbouring zones and the (datetime x zone) values of a wide flow
+    dataframe, without its 'sum' column and with missing values as 0. The column of a former zone is added to the
+    column of the zone that replaced it (schema.ZONE_ALIASES), as the flows over the same border.
     '''
-    df_cleaned = df.copy()
-
     if from_api:
-        df_cleaned = df_cleaned.reset_index()
-        df_cleaned = df_cleaned.rename(columns={'index': 'datetime'})
+        datetimes = df.index
+        zones = df.columns.drop('sum')
     else:
-        df_cleaned = df_cleaned.rename(columns={'Unnamed: 0': 'datetime'})
-    df_cleaned = df_cleaned.drop(columns=['sum'])
-    df_cleaned['datetime'] = pd.to_datetime(df_cleaned['datetime'], utc=True)
-    df_cleaned = df_cleaned.infer_objects(copy=False)
-    df_cleaned = df_cleaned.fillna(0)
-    return df_cleaned
+        datetimes = df['Unnamed: 0']
+        zones = df.columns.drop(['Unnamed: 0', 'sum'])
+    datetimes = timestamps.parse_utc(datetimes)
+    values = df[zones].to_numpy(dtype='float64')
+    values = np.where(np.isnan(values), 0, values)
+    zones = zones.map(lambda zone: schema.ZONE_ALIASES.get(zone, zone))
+    if zones.has_duplicates:
+        codes, zones = pd.factorize(zones)
+        values = np.stack([values[:, codes == code].sum(axis=1) for code in range(len(zones))], axis=1)
+    if not datetimes.is_monotonic_increasing:
+        order = np.argsort(datetimes.asi8, kind='stable')
+        datetimes, values = datetimes[order], values[order]
+    return datetimes, zones, values
 
 
 def transform_weather_data(
@@ -72,15 +80,23 @@ def transform_weather_data(
     '''
     Transforms the weather data into a clean dataframe format.
     '''
-    # Dictionary to map DataFrames to their country codes
+    # Dictionary to map DataFrames to their country codes (not copied, every step below returns a new frame)
     dfs = {
-        "NL": df_NL.copy(),
-        "BE": df_BE.copy(),
-        "DE_LU": df_DE_LU.copy(),
-        "DK_1": df_DK_1.copy(),
-        "GB": df_GB.copy(),
-        "NO_2": df_NO_2.copy(),
+        "NL": df_NL,
+        "BE": df_BE,
+        "DE_LU": df_DE_LU,
+        "DK_1": df_DK_1,
+        "GB": df_GB,
+        "NO_2": df_NO_2,
     }
+    return _transform_weather_zones(dfs, from_api=from_api)
+
+
+def _transform_weather_zones(dfs: Dict[str, pd.DataFrame], from_api: bool = False) -> pd.DataFrame:
+    '''
+    Transforms the weather data of the zones in dfs (keyed by country code) into a clean dataframe format.
+    '''
+    dfs = dict(dfs)
     if from_api:
         for country_code, df in dfs.items():
             df = df.reset_index()
@@ -89,9 +105,9 @@ def transform_weather_data(
     for country_code, df in dfs.items():
         # 1. Drop the first unnamed column if it exists
         if df.columns[0].startswith('Unnamed'):
-            df.drop(df.columns[0], axis=1, inplace=True)
+            df = df.drop(columns=df.columns[0])
         # 2. Add country code to each dataframe 
-        df['country_code'] = country_code
+        dfs[country_code] = df.assign(country_code=country_code)
     
     # 3. Concatenate the dataframes 
     df_combined = pd.concat(dfs.values(), axis=0, ignore_index=True)
@@ -100,7 +116,7 @@ def transform_weather_data(
     df_combined = df_combined.rename(columns={'time': 'datetime'})
     
     # 5. Cast columns: 'datetime' column to UTC and all other columns to float64
-    df_combined['datetime'] = pd.to_datetime(df_combined['datetime'], utc=True)
+    df_combined['datetime'] = timestamps.parse_utc(df_combined['datetime'])
     for col in df_combined.columns:
         if col not in ['datetime', 'country_code']:
             df_combined[col] = df_combined[col].astype('float64')
@@ -108,7 +124,7 @@ def transform_weather_data(
     # 6. Drop rows with any NaN values
     df_combined.dropna(axis=0, how='any', inplace=True)
     
-    return df_combined
+    return schema.apply_schema(df_combined)
 
 
 def transform_day_ahead_prices(
@@ -122,40 +138,43 @@ def transform_day_ahead_prices(
     '''
     Transforms the day-ahead prices data into a clean dataframe format.
     '''
-    # Dictionary that maps the DataFrames to their country codes
+    # Dictionary that maps the DataFrames to their country codes (not copied, every step below returns a new frame)
     dfs = {
-        "NL": df_NL.copy(),
-        "BE": df_BE.copy(),
-        "DE_LU": df_DE_LU.copy(),
-        "DK_1": df_DK_1.copy(),
-        "GB": df_GB.copy(),
-        "NO_2": df_NO_2.copy(),
+        "NL": df_NL,
+        "BE": df_BE,
+        "DE_LU": df_DE_LU,
+        "DK_1": df_DK_1,
+        "GB": df_GB,
+        "NO_2": df_NO_2,
     }
+    return _transform_day_ahead_prices_zones(dfs)
 
-    # Step 1: Drop the first unnamed column if it exists
-    for country_code, df in dfs.items():
-        if df.columns[0].startswith("Unnamed"):
-            df.drop(df.columns[0], axis=1, inplace=True)
 
-    # Step 2: Rename 'Timestamp' -> 'datetime' and 'Price' -> 'energy_price'
-    for country_code, df in dfs.items():
-        df.rename(columns={"Timestamp": "datetime", "Price": "energy_price"}, inplace=True)
-
-    # Step 3: Add 'country_code' column
+def _transform_day_ahead_prices_zones(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    '''
+    Transforms the day-ahead prices data of the zones in dfs (keyed by country code) into a clean dataframe format.
+    '''
+    dfs = dict(dfs)
     for country_code, df in dfs.items():
-        df["country_code"] = country_code
+        # Step 1: Drop the first unnamed column if it exists
+        if df.columns[0].startswith("Unnamed"):
+            df = df.drop(columns=df.columns[0])
+        # Step 2: Rename 'Timestamp' -> 'datetime' and 'Price' -> 'energy_price'
+        df = df.rename(columns={"Timestamp": "datetime", "Price": "energy_price"})
+        # Step 3: Add 'country_code' column
+        dfs[country_code] = df.assign(country_code=country_code)
 
     # Step 4: Concatenate all dataframes
     df_combined = pd.concat(dfs.values(), axis=0, ignore_index=True)
 
     # Step 5: Convert 'datetime' to UTC and 'energy_price' to float64
-    df_combined["datetime"] = pd.to_datetime(df_combined["datetime"], utc=True)
+    df_combined["datetime"] = timestamps.parse_utc(df_combined["datetime"])
     df_combined["energy_price"] = df_combined["energy_price"].astype("float64")
 
     # Step 6: Drop rows with NaN values
     df_combined.dropna(axis=0, how="any", inplace=True)
 
-    return df_combined
+    return schema.apply_schema(df_combined)
 
 
 def transform_generation_data(
@@ -172,38 +191,37 @@ def transform_generation_data(
     '''
     # Dictionary that maps the DataFrames to their country codes
     dfs = {
-        "NL": df_NL.copy(),
-        "BE": df_BE.copy(),
-        "DE_LU": df_DE_LU.copy(),
-        "DK_1": df_DK_1.copy(),
-        "GB": df_GB.copy(),
-        "NO_2": df_NO_2.copy(),
+        "NL": df_NL,
+        "BE": df_BE,
+        "DE_LU": df_DE_LU,
+        "DK_1": df_DK_1,
+        "GB": df_GB,
+        "NO_2": df_NO_2,
     }
-    
-    for country_code, df in dfs.items():
-        df = _clean_generation_columns(df, from_api=from_api)    
-        # Resample the data to hourly frequency
-        df =  df.resample('h').sum()
-        df['total_generation'] = df.sum(axis=1).astype('float64')
-        df['country_code'] = country_code
-        df.reset_index(inplace=True)
-        
-        # 3. Cast columns: convert 'datetime' to UTC
-        df['datetime'] = pd.to_datetime(df['datetime'], utc=True)
-        df.dropna(axis=0, how="any", inplace=True)
-        dfs[country_code] = df
+    return _transform_generation_zones(dfs, from_api=from_api)
 
-    # Step 4: Concatenate all dataframes
-    df_combined = pd.concat(dfs.values(), axis=0, ignore_index=True)
-    
-    # Step 5: Convert 'datetime' to UTC and 'energy_price' to float64
+
+def _transform_generation_zones(dfs: Dict[str, pd.DataFrame], from_api: bool = False) -> pd.DataFrame:
+    '''
+    Transforms the generation data of the zones in dfs (keyed by country code) into a clean dataframe format.
+    '''
+    # Dictionary that maps the cleaned DataFrames to their country codes
+    dfs = {country_code: _clean_generation_columns(df, from_api=from_api) for country_code, df in dfs.items()}
+
+    # Resample all zones to hourly frequency at once
+    df_combined = _resample_hourly_by_zone(dfs, total_column='total_generation')
+    # Same column order as concatenating the zones one by one
+    columns = [['datetime', *df.columns, 'total_generation', 'country_code'] for df in dfs.values()]
+    df_combined = df_combined[list(dict.fromkeys(column for zone_columns in columns for column in zone_columns))]
+
+    # Step 5: Sort by datetime
     df_combined = df_combined.sort_values(by='datetime')
 
     # Step 6: Drop rows with NaN values
     df_combined = df_combined.infer_objects(copy=False)
     df_combined = df_combined.fillna(0)
     df_combined = df_combined.reset_index(drop=True)
-    return df_combined
+    return schema.apply_schema(df_combined)
 
 
 def transform_generation_forecast_data(
@@ -218,82 +236,142 @@ def transform_generation_forecast_data(
     '''
     # Dictionary that maps the DataFrames to their country codes
     dfs = {
-        "NL": df_NL.copy(),
-        "BE": df_BE.copy(),
-        "DE_LU": df_DE_LU.copy(),
-        "DK_1": df_DK_1.copy(),
-        "NO_2": df_NO_2.copy(),
+        "NL": df_NL,
+        "BE": df_BE,
+        "DE_LU": df_DE_LU,
+        "DK_1": df_DK_1,
+        "NO_2": df_NO_2,
     }
-    
-    for country_code, df in dfs.items():
-        # Resample the data to hourly frequency
-        df =  df.resample('h').sum()
-        df.reset_index(inplace=True)
-        df['total_generation'] = df['Actual Aggregated'].astype('float64')
-        df['datetime'] = pd.to_datetime(df['index'], utc=True)
-        df['country_code'] = country_code
-        df = df.drop(columns=['index', 'Actual Aggregated'])
-        df.dropna(axis=0, how="any", inplace=True)
-        dfs[country_code] = df
 
-    # Step 4: Concatenate all dataframes
-    df_combined = pd.concat(dfs.values(), axis=0, ignore_index=True)
-    
-    # Step 5: Convert 'datetime' to UTC
+    # Resample all zones to hourly frequency at once
+    df_combined = _resample_hourly_by_zone(dfs)
+    df_combined['total_generation'] = df_combined['Actual Aggregated'].astype('float64')
+    # Same column order as concatenating the zones one by one
+    columns = [[*df.columns.drop('Actual Aggregated'), 'total_generation', 'datetime', 'country_code'] for df in dfs.values()]
+    df_combined = df_combined[list(dict.fromkeys(column for zone_columns in columns for column in zone_columns))]
+
+    # Step 5: Sort by datetime
     df_combined = df_combined.sort_values(by='datetime')
 
     # Step 6: Drop rows with NaN values
     df_combined = df_combined.infer_objects(copy=False)
     df_combined = df_combined.fillna(0)
     df_combined = df_combined.reset_index(drop=True)
-    return df_combined
+    return schema.apply_schema(df_combined)
+
+
+def _resample_hourly_by_zone(dfs: Dict[str, pd.DataFrame], total_column: Optional[str] = None) -> pd.DataFrame:
+    '''
+    Resamples the data of every zone to hourly sums, with the zones one after another.
+    '''
+    # every zone gets all hours between its first and last one, filled with 0 like resample('h').sum(), and a
+    # column per column of any zone (0 where the zone does not have it)
+    columns = list(dict.fromkeys(column for df in dfs.values() for column in df.columns))
+    positions = {column: position for position, column in enumerate(columns)}
+    hours = [pd.DatetimeIndex(df.index).tz_convert('UTC').asi8 // HOUR_NS for df in dfs.values()]
+    first_hours = np.array([zone_hours.min() if len(zone_hours) else 0 for zone_hours in hours], dtype='int64')
+    hour_counts = np.array([zone_hours.max() - zone_hours.min() + 1 if len(zone_hours) else 0 for zone_hours in hours], dtype='int64')
+    offsets = np.concatenate([[0], np.cumsum(hour_counts)[:-1]]).astype('int64')
+
+    # one preallocated (column, hour) array: each zone's hours are floored on the int64 epochs and summed straight into
+    # its range, so the zones are never concatenated at their original frequency
+    hourly = np.zeros((len(columns), hour_counts.sum()))
+    for df, zone_hours, first_hour, offset in zip(dfs.values(), hours, first_hours, offsets):
+        if not len(zone_hours):
+            continue
+        # column-major values of the zone (a new array, since the frame's array is read-only under Copy-on-Write)
+        values = df.to_numpy(dtype='float64').T
+        values = np.where(np.isnan(values), 0, values)
+        # position of the hour in the hourly range of the zone
+        keys = zone_hours - first_hour
+        if np.any(keys[1:] < keys[:-1]):
+            order = np.argsort(keys, kind='stable')
+            keys, values = keys[order], values[:, order]
+        # the keys are sorted, so every hour is a run of rows that is summed at once
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        hourly[np.ix_([positions[column] for column in df.columns], offset + keys[starts])] = np.add.reduceat(values, starts, axis=1)
+
+    zone_codes = np.repeat(np.arange(len(dfs)), hour_counts)
+    hourly_ns = (np.arange(hour_counts.sum()) - offsets[zone_codes] + first_hours[zone_codes]) * HOUR_NS
+    df_hourly = pd.DataFrame(hourly.T, columns=columns, copy=False)
+    if total_column is not None:
+        # the sum of the zone's own columns, added column after column in the column order of every zone
+        df_hourly[total_column] = np.concatenate([
+            hourly[[positions[column] for column in df.columns], offset:offset + hour_count].sum(axis=0)
+            for df, offset, hour_count in zip(dfs.values(), offsets, hour_counts)
+        ])
+    df_hourly.insert(0, 'datetime', pd.DatetimeIndex(hourly_ns.astype('datetime64[ns]')).tz_localize('UTC'))
+    df_hourly['country_code'] = np.array(list(dfs), dtype=object)[zone_codes]
+    return df_hourly
+
+
+def _clean_generation_name(label: str) -> str:
+    '''
+    Cleans a production type name: lower case words joined by '_', with '-' (or else '/') replaced by '_'.
+    '''
+    name = '_'.join(str(label).lower().split())
+    return name.replace('-', '_') if '-' in name else name.replace('/', '_')
+
+
+@lru_cache(maxsize=64)
+def _compile_generation_columns(columns: tuple) -> Tuple[int, List[str], List[int], List[int]]:
+    '''
+    Resolves the raw generation headers once into the position of the timestamp column, the cleaned production types
+    and the positions of their 'Actual Aggregated' columns, grouped per production type (as a list of positions and
+    the offset of every group in it). The headers are either (production type, metric) tuples (NL, BE, DE_LU, GB), kept
+    in file order, or single labels (DK_1, NO_2): the production type, a stringified tuple like
+    "('Fossil Gas', 'Actual Aggregated')" or 'Unnamed: 0' for the timestamp, sorted by production type and summed
+    when a production type has several columns.
+    '''
+    if all(isinstance(column, tuple) for column in columns):
+        timestamp = next(i for i, (_, metric) in enumerate(columns) if metric == 'Unnamed: 0_level_1')
+        groups = {}
+        for i, (production_type, metric) in enumerate(columns):
+            if metric == 'Actual Aggregated':
+                groups.setdefault(production_type, []).append(i)
+    else:
+        timestamp = columns.index('Unnamed: 0')
+        groups = {}
+        for i, column in enumerate(columns):
+            column = str(column)
+            if i == timestamp or 'Consumption' in column:
+                continue
+            production_type = column.split(',')[0].strip("()'") if 'Actual Aggregated' in column else column
+            groups.setdefault(production_type, []).append(i)
+        groups = dict(sorted(groups.items()))
+
+    names = [_clean_generation_name(production_type) for production_type in groups]
+    positions = [i for group in groups.values() for i in group]
+    offsets = list(np.cumsum([0] + [len(group) for group in groups.values()])[:-1])
+    return timestamp, names, positions, offsets
 
 
 def _clean_generation_columns(df: pd.DataFrame, from_api: bool = False) -> pd.DataFrame:
     '''
     Cleans the generation data columns.
     '''
-    df_cleaned = df.copy()
-
     if from_api:
+        df_cleaned = df
         try:
             df_cleaned = df_cleaned.xs(key='Actual Aggregated', axis=1, level=1)
         except Exception:
             pass
-        
-        df_cleaned = df_cleaned.rename(columns=lambda x: '_'.join(str(x).lower().split()))
-        df_cleaned = df_cleaned.rename(columns=lambda x: x.replace('-', '_') if '-' in x else x.replace('/', '_'))
-        df_cleaned.reset_index(inplace=True)
+
+        df_cleaned = df_cleaned.rename(columns=_clean_generation_name)
+        df_cleaned = df_cleaned.reset_index()
         df_cleaned = df_cleaned.rename(columns={'index': 'datetime'})
-        df_cleaned['datetime'] = pd.to_datetime(df_cleaned['datetime'], utc=True)
-        df_cleaned.set_index('datetime', inplace=True)
-    else:
-        try:
-            datetimes = df.xs(key='Unnamed: 0_level_1', axis=1, level=1)
-            actual_aggregated = df_cleaned.xs(key='Actual Aggregated', axis=1, level=1)
-            df_cleaned = pd.merge(datetimes, actual_aggregated, left_index=True, right_index=True)
-            # Ensure the timestamp column is in datetime format
-            df_cleaned['datetime'] = pd.to_datetime(df_cleaned['Unnamed: 0_level_0'], utc=True)  # Replace 'Unnamed: 0' with the actual column name
-            # Set the timestamp column as the index
-            df_cleaned.set_index('datetime', inplace=True)
-            # Drop the 'Unnamed: 0' column
-            df_cleaned.drop(columns='Unnamed: 0_level_0', inplace=True)
-            # reformat columns
-            df_cleaned = df_cleaned.rename(columns=lambda x: '_'.join(str(x).lower().split()))
-            df_cleaned = df_cleaned.rename(columns=lambda x: x.replace('-', '_') if '-' in x else x.replace('/', '_'))
-        except Exception:  # DK_1, GB, NO_2
-            # Drop columns containing "Consumption"
-            df_cleaned = df_cleaned.drop(columns=[col for col in df_cleaned.columns if "Consumption" in str(col)])
-            # Rename columns like "('Fossil Gas', 'Actual Aggregated')" to "Fossil Gas"
-            df_cleaned = df_cleaned.rename(columns=lambda x: x.split(",")[0].strip("()'") if "Actual Aggregated" in str(x) else x)
-
-            df_cleaned = df_cleaned.T.groupby(df_cleaned.columns).sum()
-            df_cleaned = df_cleaned.T.rename(columns={'Unnamed: 0': 'datetime'})
-            df_cleaned = df_cleaned.rename(columns=lambda x: '_'.join(str(x).lower().split()))
-            df_cleaned = df_cleaned.rename(columns=lambda x: x.replace('-', '_') if '-' in x else x.replace('/', '_'))
-            df_cleaned['datetime'] = pd.to_datetime(df_cleaned['datetime'], utc=True)
-            df_cleaned.set_index('datetime', inplace=True)
-    return df_cleaned
+        df_cleaned['datetime'] = timestamps.parse_utc(df_cleaned['datetime'])
+        df_cleaned = df_cleaned.set_index('datetime')
+        return df_cleaned
+
+    timestamp, names, positions, offsets = _compile_generation_columns(tuple(df.columns))
+    # sum the columns of every production type at once (missing values count as 0, as the hourly resample does)
+    values = df.iloc[:, positions].to_numpy(dtype='float64')
+    # a new array, since the frame's array is read-only under Copy-on-Write
+    values = np.where(np.isnan(values), 0, values)
+    values = np.add.reduceat(values, offsets, axis=1) if len(positions) else values
+    datetimes = timestamps.parse_utc(df.iloc[:, timestamp]).rename('datetime')
+    return pd.DataFrame(values, index=datetimes, columns=names, copy=False)
 
 
 def transform_prices_generation(df_prices: pd.DataFrame, df_generation: pd.DataFrame) -> pd.DataFrame:
@@ -306,38 +384,82 @@ def transform_prices_generation(df_prices: pd.DataFrame, df_generation: pd.DataF
         on=["datetime", "country_code"], 
         how="inner"
     )
-    return df_merged
+    return schema.apply_schema(df_merged)
+
+
+def generation_columns(headers: Iterable[pd.Index]) -> List[str]:
+    '''
+    Returns the columns transform_generation_data gives for the raw generation headers of all zones.
+    '''
+    columns = [['datetime', *_compile_generation_columns(tuple(header))[1], 'total_generation', 'country_code'] for header in headers]
+    return list(dict.fromkeys(column for zone_columns in columns for column in zone_columns))
 
 
-def transform_data_for_feature_view(
+def transform_backfill_chunks(
+    chunks: Iterable[Tuple[int, str, str, tuple]],
+    df_generation_columns: List[str]
+) -> Iterator[Tuple[int, str, Optional[str], pd.DataFrame]]:
+    '''
+    Transforms the chunks of extract.iter_backfill_chunks one at a time, yielding (year, source, zone, transformed
+    dataframe) without the chunks that have no rows left. The prices_generation chunks get every column of
+    df_generation_columns (generation_columns), so that every chunk has the columns of the whole backfill. Once all
+    chunks of a year are transformed, the hourly features of that year follow as (year, 'hourly_features', None, df).
+    '''
+    prices_generation_columns = ['datetime', 'energy_price', 'country_code']
+    prices_generation_columns += [column for column in df_generation_columns if column not in prices_generation_columns]
+    year_frames = {'weather': [], 'prices_generation': []}
+    current_year = None
+    for year, source, zone, frames in chunks:
+        if current_year is not None and year != current_year:
+            yield from _hourly_features_chunk(current_year, year_frames)
+        current_year = year
+
+        if source == 'weather':
+            df = _transform_weather_zones({zone: frames[0]})
+        elif source == 'prices_generation':
+            df_prices = _transform_day_ahead_prices_zones({zone: frames[0]})
+            df_generation = _transform_generation_zones({zone: frames[1]})
+            df = transform_prices_generation(df_prices, df_generation)
+            df = schema.apply_schema(df.reindex(columns=prices_generation_columns, fill_value=0))
+        elif source == 'physical_flow':
+            df = merge_export_import(*frames)
+        else:
+            raise ValueError(f'Unknown backfill source: {source}')
+        if df.empty:
+            continue
+        if source in year_frames:
+            year_frames[source].append(df)
+        yield year, source, zone, df
+    if current_year is not None:
+        yield from _hourly_features_chunk(current_year, year_frames)
+
+
+def _hourly_features_chunk(year: int, year_frames: Dict[str, List[pd.DataFrame]]) -> Iterator[Tuple[int, str, None, pd.DataFrame]]:
+    '''
+    Yields the hourly features of a year from its transformed weather and prices_generation chunks, and empties them.
+    '''
+    weather, prices_generation = year_frames['weather'], year_frames['prices_generation']
+    df = None
+    if weather and prices_generation:
+        df = transform_model_data_from_df(pd.concat(weather, ignore_index=True), pd.concat(prices_generation, ignore_index=True))
+    weather.clear()
+    prices_generation.clear()
+    if df is not None and not df.empty:
+        yield year, 'hourly_features', None, df
+
+
+def transform_hourly_features(
     fg_weather: hsfs.feature_group.FeatureGroup, 
-    fg_prices_generation: hsfs.feature_group.FeatureGroup, 
-    fg_flow: hsfs.feature_group.FeatureGroup,
-    fs: hsfs.feature_store.FeatureStore, 
-    version: int = 1
-) -> hsfs.feature_group.FeatureGroup:
+    fg_prices_generation: hsfs.feature_group.FeatureGroup
+) -> pd.DataFrame:
     '''
-    Transforms the data from feature groups into a format suitable for a feature view to a ML model.
+    Transforms the data from the weather and prices_generation feature groups into the hourly features of the model: the
+    pivoted weather, generation and price features once per hour, stored in the hourly_features feature group. Training
+    joins them in memory to the border rows of the physical_flow feature group (data.prepare_factorized_training_data).
     '''
     df_weather = fg_weather.read()
     df_prices_generation = fg_prices_generation.read()
-    df_flow = fg_flow.read()
-
-    df_combined_full =  transform_model_data_from_df(df_weather, df_prices_generation, df_flow)
-
-    # Create the Feature Group
-    model_data_fg = fs.get_or_create_feature_group(
-        name="model_data",
-        version=version,
-        description=(
-            'Cross-border electricity dataset with energy_sent as the target, combining pivoted multi-country weather, generation, and energy price features for each timestamp, along with country_from and country_to.'
-        ),
-        primary_key=["datetime", "country_from", "country_to"],
-        event_time="datetime"
-    )
-
-    model_data_fg.insert(df_combined_full, write_options={"wait_for_job": True})
-    return model_data_fg
+    return transform_model_data_from_df(df_weather, df_prices_generation)
 
 
 def transform_model_data_from_df(
@@ -346,53 +468,40 @@ def transform_model_data_from_df(
     df_flow: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     '''
-    Transforms the data from dataframes into a format suitable for a feature view to a ML model.
+    Transforms the data from dataframes into the model data: the frame of the model dataset (build_model_dataset), with
+    a row per flow, or the hourly features when there are no flows.
     '''
-    weather_columns = list(df_weather.columns)[1:]
-    prices_generation_columns = list(df_prices_generation.columns)[1:]
+    return model_data_frame(build_model_dataset(df_weather, df_prices_generation, df_flow))
 
-    weather_pivot = _pivot_transform(df_weather, weather_columns)
-    prices_generation_pivot = _pivot_transform(df_prices_generation, prices_generation_columns)
-    prices_generation_pivot = prices_generation_pivot.infer_objects(copy=False)
-    prices_generation_pivot = prices_generation_pivot.fillna(0)
 
-    # Combine pivot dfs
-    df_combined_pivot = pd.merge(
-        weather_pivot, 
-        prices_generation_pivot,
-        on="datetime", 
-        how="inner"
-    )
-    
+def build_model_dataset(
+    df_weather: pd.DataFrame,
+    df_prices_generation: pd.DataFrame,
+    df_flow: Optional[pd.DataFrame] = None
+) -> HourlyZoneDataset:
+    '''
+    Builds the (hour, variable, zone) model dataset from the long weather and prices/generation frames, without
+    pivoting them into wide frames. The weather and prices/generation (missing values filled with 0) are joined by
+    their position on a shared hourly UTC grid, and like the inner and right merges followed by dropna of the pivoted
+    frames, only the hours with weather (without missing values) and prices/generation are kept, and only the flow rows
+    of those hours without missing values, in datetime order.
+    '''
+    weather = HourlyZoneDataset.from_long(df_weather, list(df_weather.columns)[1:])
+    prices_generation = HourlyZoneDataset.from_long(df_prices_generation, list(df_prices_generation.columns)[1:]).fillna(0)
+    for name, dataset in (('weather', weather), ('prices_generation', prices_generation)):
+        gaps = dataset.missing_hours()
+        if gaps:
+            print(f'{name}: {gaps} hours without data between its first and last hour.')
+
+    model_dataset = weather.join(prices_generation, 'weather', 'prices_generation').dropna()
     if df_flow is not None:
-        # Make a final df format
-        df_combined_full = pd.merge(
-            df_flow, 
-            df_combined_pivot,
-            on="datetime", 
-            how="right"
-        )
-    else:
-        df_combined_full = df_combined_pivot
-
-    df_combined_full.dropna(axis=0, how='any', inplace=True)
-    df_combined_full = df_combined_full.sort_values(by='datetime', ascending=True)
-    df_combined_full = df_combined_full.rename(columns=lambda x: x.lower())
-    return df_combined_full
+        model_dataset = model_dataset.with_flows(df_flow)
+    return model_dataset
 
 
-def _pivot_transform(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+def model_data_frame(dataset: HourlyZoneDataset) -> pd.DataFrame:
     '''
-    Transforms the DataFrame into a pivot table format.
+    Returns the model data frame of a model dataset, with the lower case feature columns of the feature groups.
     '''
-    df_pivot = df.pivot_table(
-        index="datetime",
-        columns="country_code",
-        values=columns
-    )
-    # df pivot will have a multi-level column index like: ('temperature_2m', 'DK_1'), ('temperature_2m', 'BE'), etc.
-    df_pivot.columns = [f"{var}_{country}" for var, country in df_pivot.columns]
-
-    df_pivot.reset_index(inplace=True)
-    df_pivot = df_pivot.sort_values(by=['datetime'], ascending=True)
-    return df_pivot
+    df_combined_full = dataset.to_frame().rename(columns=lambda x: x.lower())
+    return schema.apply_schema(df_combined_full)
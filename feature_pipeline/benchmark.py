@@ -0,0 +1,485 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from entsoe import parsers as entsoe_parsers
+from feature_pipeline.ETL import entsoe_parser, extract, raw_store, schema, timestamps, transform
+from feature_pipeline.ETL.dataset import HourlyZoneDataset
+from tests.entsoe_documents import generation_document
+from typing import Callable, Dict, List, Tuple
+from utils import data, settings
+
+
+# A traced memory_frames run in a fresh process, with the compact dtypes or float64/object ('compact' or 'float64'), that
+# prints the peak traced memory and the memory of every frame as JSON. The raw store and the caches are bypassed.
+MEMORY_RUN = '''
+import json
+import sys
+import tracemalloc
+from feature_pipeline import benchmark
+from feature_pipeline.ETL import raw_store, schema, timestamps
+
+schema.COMPACT_DTYPES = sys.argv[1] == 'compact'
+raw_store.RAW_STORE = False
+raw_store.CSV_CACHE = False
+timestamps.CACHE_SIZE = 0
+tracemalloc.start()
+frames = benchmark.memory_frames()
+peak = tracemalloc.get_traced_memory()[1] / 2**20
+print(json.dumps({'peak': peak, 'frames': {name: schema.memory_mb(df) for name, df in frames.items()}}))
+'''
+
+# Raw files read by the backfill, as (source, zone) pairs in the order of extract_backfill_data
+BACKFILL_FILES = [
+    (source, zone) for source in ('weather_data', 'day_ahead_prices', 'energy_generation') for zone in extract.ZONE_ORDER
+] + [('import_flow', 'NL'), ('export_flow', 'NL')]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Benchmarks of the feature pipeline.')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Number of timed runs of every variant (the best one is reported).')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    preload = subparsers.add_parser('preload', help='Reading the 20 raw backfill files one by one vs in parallel.')
+    preload.add_argument('--max_workers', '-w', type=int, default=extract.LOAD_MAX_WORKERS, help='Threads of the parallel loader.')
+    borders = subparsers.add_parser('borders', help='Expanding the forecast rows to one row per border (add_country_codes_for_prediction).')
+    borders.add_argument('--timestamps', '-t', type=int, nargs='+', default=[24, 384, 10000], help='Numbers of forecast timestamps.')
+    subparsers.add_parser('pivot', help='Pivoting the backfill weather and prices/generation frames (HourlyZoneDataset.from_long).')
+    subparsers.add_parser('memory', help='Memory of the backfill and training frames with float64/object vs the compact dtypes (schema).')
+    subparsers.add_parser('model_data', help='Joining the backfill frames into the model data (transform_model_data_from_df).')
+    subparsers.add_parser('flows', help='Reshaping the wide backfill flow frames to the long flow frame (merge_export_import).')
+    subparsers.add_parser('timestamps', help='Parsing the timestamp strings of the raw backfill files (timestamps.parse_utc).')
+    dataset = subparsers.add_parser('dataset', help='Building the forecast model input through wide frames vs from the model dataset (prediction_features).')
+    dataset.add_argument('--days', '-d', type=int, default=365, help='Days of backfill data used as the forecast.')
+    subparsers.add_parser('factorized', help='Training input from the model data with the features of every border vs the hourly features and the flows.')
+    entsoe = subparsers.add_parser('entsoe_parser', help='Parsing an A75 document with entsoe-py vs the streaming parser (entsoe_parser).')
+    entsoe.add_argument('--days', '-d', type=int, default=30, help='Days per TimeSeries of the timed generation document.')
+    return parser
+
+
+def time_best(function: Callable, repeat: int) -> float:
+    '''
+    Runs a function repeat times and returns the fastest run in seconds.
+    '''
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def print_timings(timings: List[Tuple[str, float]]) -> None:
+    '''
+    Prints the timings of the variants of a benchmark relative to the first one.
+    '''
+    baseline = timings[0][1]
+    for name, seconds in timings:
+        print(f'{name:<40} {seconds:8.3f}s {baseline / seconds:6.1f}x')
+
+
+def preload_benchmark(repeat: int, max_workers: int) -> None:
+    '''
+    Times reading the raw backfill files with pandas one after another (the original loader) against parsing them with
+    pyarrow on a thread pool and against load_local_files, which reads the raw store or the cache of parsed CSV files.
+    '''
+    from_raw_store = sum(raw_store.has_raw(source, zone) for source, zone in BACKFILL_FILES)
+    print(f'{from_raw_store} of {len(BACKFILL_FILES)} files are read from the raw store, the others from CSV (cached).')
+
+    def parse_parallel():
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda raw_file: raw_store.read_raw_csv_fast(*raw_file), BACKFILL_FILES))
+
+    # fills the cache of parsed CSV files, so only warm reads are timed
+    extract.load_local_files(BACKFILL_FILES, max_workers=max_workers)
+    print_timings([
+        ('sequential pandas read_csv', time_best(lambda: [raw_store.read_raw_csv(*raw_file) for raw_file in BACKFILL_FILES], repeat)),
+        (f'parallel pyarrow read_csv ({max_workers} threads)', time_best(parse_parallel, repeat)),
+        ('sequential load_local', time_best(lambda: extract.load_local_files(BACKFILL_FILES, max_workers=1), repeat)),
+        (f'parallel load_local_files ({max_workers} threads)', time_best(lambda: extract.load_local_files(BACKFILL_FILES, max_workers=max_workers), repeat)),
+    ])
+
+
+def add_country_codes_iterrows(X: pd.DataFrame) -> pd.DataFrame:
+    '''
+    The original row by row implementation of add_country_codes_for_prediction, as the baseline.
+    '''
+    df = X.copy()
+    combinations = [('NL', zone) for zone in data.NEIGHBOUR_ZONES] + [(zone, 'NL') for zone in data.NEIGHBOUR_ZONES]
+    expanded_rows = []
+    for index, row in df.iterrows():
+        for country_from, country_to in combinations:
+            new_row = row.copy()
+            new_row['country_from'] = country_from
+            new_row['country_to'] = country_to
+            expanded_rows.append(new_row)
+    expanded_df = pd.DataFrame(expanded_rows)
+    expanded_df.reset_index(drop=True, inplace=True)
+    return expanded_df
+
+
+def add_country_codes_for_prediction(X: pd.DataFrame) -> pd.DataFrame:
+    '''
+    The vectorized border expansion of the forecast rows, as a cross join of the rows with data.prediction_borders,
+    before data.prediction_frame built the rows from the model dataset. Kept as a baseline.
+    '''
+    combinations = data.prediction_borders()
+    countries_from, countries_to = (np.array(countries, dtype=object) for countries in zip(*combinations))
+    expanded_df = X.iloc[np.repeat(np.arange(len(X)), len(combinations))].reset_index(drop=True)
+    expanded_df['country_from'] = np.tile(countries_from, len(X))
+    expanded_df['country_to'] = np.tile(countries_to, len(X))
+    return schema.apply_schema(expanded_df)
+
+
+def prepare_data_for_training(X_train: pd.DataFrame, X_test: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    '''
+    The former training input of the joined model data (all production columns, one-hot encoded borders), before
+    data.prepare_factorized_training_data. Kept as a baseline.
+    '''
+    results = []
+    for X in (X_train, X_test):
+        X_result = schema.apply_schema(X)[data.COLUMNS_MODEL_TOTAL_PRODUCTION].drop(columns=['datetime'])
+        X_result = data.one_hot_encoding(X_result, 'country_from', prefix='from')
+        results.append(data.one_hot_encoding(X_result, 'country_to', prefix='to'))
+    return tuple(results)
+
+
+def prepare_data_for_predictions(X: pd.DataFrame) -> pd.DataFrame:
+    '''
+    The former model input of the expanded forecast rows, before data.prediction_features. Kept as a baseline.
+    '''
+    X_result = schema.apply_schema(X).drop(columns=['datetime'])
+    X_result = data.one_hot_encoding(X_result, 'country_from', prefix='from')
+    return data.one_hot_encoding(X_result, 'country_to', prefix='to')
+
+
+def forecast_features(timestamps: int) -> pd.DataFrame:
+    '''
+    Returns random forecast features in the layout of transform_model_data_from_df: a datetime column and one column
+    per feature and zone.
+    '''
+    columns = [column for column in data.COLUMNS_MODEL_TOTAL_PRODUCTION if column not in ('datetime', 'country_from', 'country_to')]
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.random((timestamps, len(columns))), columns=columns)
+    df.insert(0, 'datetime', pd.date_range('2025-01-01', periods=timestamps, freq='h', tz='UTC'))
+    return schema.apply_schema(df)
+
+
+def borders_benchmark(repeat: int, timestamps: List[int]) -> None:
+    '''
+    Times the row by row border expansion against the vectorized one (tests/test_data.py checks that the prediction
+    rows equal the row by row expansion).
+    '''
+    for n in timestamps:
+        X = forecast_features(n)
+        print(f'{n} timestamps ({n * 2 * len(data.NEIGHBOUR_ZONES)} rows):')
+        print_timings([
+            ('iterrows', time_best(lambda: add_country_codes_iterrows(X), repeat)),
+            ('vectorized', time_best(lambda: add_country_codes_for_prediction(X), repeat)),
+        ])
+
+
+def backfill_frames() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    '''
+    Returns the transformed backfill weather, prices/generation and flow frames, read from the local raw data.
+    '''
+    frames = extract.extract_backfill_data()
+    df_weather = transform.transform_weather_data(*frames[:6])
+    df_prices = transform.transform_day_ahead_prices(*frames[6:12])
+    df_generation = transform.transform_generation_data(*frames[12:18])
+    df_prices_generation = transform.transform_prices_generation(df_prices, df_generation)
+    df_flow = transform.merge_export_import(*frames[18:])
+    return df_weather, df_prices_generation, df_flow
+
+
+def pivot_table_transform(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    '''
+    The original pivot_table implementation of the pivoted frames, as the baseline.
+    '''
+    df_pivot = df.pivot_table(index="datetime", columns="country_code", values=columns)
+    df_pivot.columns = [f"{var}_{country}" for var, country in df_pivot.columns]
+    df_pivot.reset_index(inplace=True)
+    return df_pivot.sort_values(by=['datetime'], ascending=True)
+
+
+def pivot_benchmark(repeat: int) -> None:
+    '''
+    Times pivot_table against building the (hour, variable, zone) dataset on the backfill frames (tests/test_dataset.py
+    checks that the frame of the dataset is the table of pivot_table).
+    '''
+    df_weather, df_prices_generation, _ = backfill_frames()
+    for name, df in (('weather', df_weather), ('prices/generation', df_prices_generation)):
+        columns = list(df.columns)[1:]
+        print(f'{name} ({len(df)} rows):')
+        print_timings([
+            ('pivot_table', time_best(lambda: pivot_table_transform(df, columns), repeat)),
+            ('HourlyZoneDataset.from_long', time_best(lambda: HourlyZoneDataset.from_long(df, columns), repeat)),
+            ('HourlyZoneDataset.from_long and to_frame', time_best(lambda: HourlyZoneDataset.from_long(df, columns).to_frame(), repeat)),
+        ])
+
+
+def memory_frames() -> Dict[str, pd.DataFrame]:
+    '''
+    Returns the backfill frames, the model data and the training input, keyed by name.
+    '''
+    df_weather, df_prices_generation, df_flow = backfill_frames()
+    df_model = transform.transform_model_data_from_df(df_weather, df_prices_generation, df_flow)
+    X_train, _ = prepare_data_for_training(df_model, df_model.iloc[:0])
+    return {
+        'weather': df_weather,
+        'prices_generation': df_prices_generation,
+        'physical_flow': df_flow,
+        'model_data': df_model,
+        'training input': X_train,
+    }
+
+
+def traced_memory(compact_dtypes: bool) -> Tuple[float, Dict[str, float]]:
+    '''
+    Returns the peak traced memory of memory_frames and the memory of every frame in MB, from a run in a fresh process
+    with or without the compact dtypes, so neither run starts from the caches or the memory of the other one.
+    '''
+    run = subprocess.run(
+        [sys.executable, '-c', MEMORY_RUN, 'compact' if compact_dtypes else 'float64'],
+        capture_output=True, text=True, check=True
+    )
+    result = json.loads(run.stdout.splitlines()[-1])
+    return result['peak'], result['frames']
+
+
+def memory_benchmark() -> None:
+    '''
+    Builds the backfill frames, the model data and the training input once with the float64/object dtypes and once
+    with the compact schema, and prints the memory of every frame and the peak traced memory of both runs
+    (tests/test_data.py checks that the training input only differs by the float32 rounding).
+    '''
+    peak_float64, frames_float64 = traced_memory(compact_dtypes=False)
+    peak_compact, frames_compact = traced_memory(compact_dtypes=True)
+    print('Memory with float64/object dtypes -> compact dtypes:')
+    schema.print_memory_report(frames_float64, frames_compact)
+    print(f'{"peak traced memory":<24} {peak_float64:9.1f} MB -> {peak_compact:9.1f} MB ({peak_compact / peak_float64:.0%})')
+
+
+def merge_model_data_from_df(df_weather: pd.DataFrame, df_prices_generation: pd.DataFrame, df_flow: pd.DataFrame) -> pd.DataFrame:
+    '''
+    The original merge implementation of transform.transform_model_data_from_df, as the baseline.
+    '''
+    weather_pivot = pivot_table_transform(df_weather, list(df_weather.columns)[1:])
+    prices_generation_pivot = pivot_table_transform(df_prices_generation, list(df_prices_generation.columns)[1:]).fillna(0)
+    df_combined_pivot = pd.merge(weather_pivot, prices_generation_pivot, on="datetime", how="inner")
+    df_combined_full = pd.merge(df_flow, df_combined_pivot, on="datetime", how="right")
+    df_combined_full = df_combined_full.dropna(axis=0, how='any')
+    df_combined_full = df_combined_full.sort_values(by='datetime', ascending=True)
+    df_combined_full = df_combined_full.rename(columns=lambda x: x.lower())
+    return schema.apply_schema(df_combined_full)
+
+
+def model_data_benchmark(repeat: int) -> None:
+    '''
+    Times the pivots and merges on 'datetime' against the model dataset (joined on the hourly grid) for the backfill
+    model data (tests/test_transform.py checks the rows of transform_model_data_from_df).
+    '''
+    frames = backfill_frames()
+    print(f'model data of {len(frames[2])} flow rows:')
+    print_timings([
+        ('pivot and merge', time_best(lambda: merge_model_data_from_df(*frames), repeat)),
+        ('model dataset', time_best(lambda: transform.transform_model_data_from_df(*frames), repeat)),
+    ])
+
+
+def melt_flow(df: pd.DataFrame, export: bool) -> pd.DataFrame:
+    '''
+    The original melt of a wide flow frame of transform.merge_export_import, as the baseline.
+    '''
+    df_cleaned = df.rename(columns={'Unnamed: 0': 'datetime'}).drop(columns=['sum'])
+    df_cleaned['datetime'] = pd.to_datetime(df_cleaned['datetime'], utc=True)
+    df_cleaned = df_cleaned.fillna(0)
+    zone_column, nl_column = ('country_to', 'country_from') if export else ('country_from', 'country_to')
+    df_cleaned = df_cleaned.melt(id_vars=['datetime'], var_name=zone_column, value_name='energy_sent')
+    df_cleaned[nl_column] = 'NL'
+    return df_cleaned[['datetime', 'country_from', 'country_to', 'energy_sent']]
+
+
+def melt_merge_export_import(export_data: pd.DataFrame, import_data: pd.DataFrame) -> pd.DataFrame:
+    '''
+    The original melt, concat and sort implementation of transform.merge_export_import, as the baseline.
+    '''
+    combined_data = pd.concat([melt_flow(export_data, export=True), melt_flow(import_data, export=False)], ignore_index=True)
+    combined_data = combined_data.sort_values(by='datetime')
+    return schema.apply_schema(combined_data.reset_index(drop=True))
+
+
+def traced_peak(function: Callable) -> float:
+    '''
+    Returns the peak memory traced while running a function, in MB.
+    '''
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return peak
+
+
+def flows_benchmark(repeat: int) -> None:
+    '''
+    Times melting the backfill flow frames against building the long frame from the wide arrays and prints the peak
+    traced memory of both (tests/test_transform.py checks the rows of merge_export_import).
+    '''
+    frames = extract.extract_backfill_data()[18:]
+    rows = sum(len(df) * (len(df.columns) - 2) for df in frames)
+    print(f'flows ({rows} rows), peak traced memory melt {traced_peak(lambda: melt_merge_export_import(*frames)):.1f} MB, '
+          f'merge_export_import {traced_peak(lambda: transform.merge_export_import(*frames)):.1f} MB:')
+    print_timings([
+        ('melt, concat and sort', time_best(lambda: melt_merge_export_import(*frames), repeat)),
+        ('merge_export_import', time_best(lambda: transform.merge_export_import(*frames), repeat)),
+    ])
+
+
+def parse_utc_uncached(columns: List[pd.Series]) -> None:
+    for column in columns:
+        timestamps._cache.clear()
+        timestamps.parse_utc(column)
+
+
+def parse_utc_cached(columns: List[pd.Series]) -> None:
+    timestamps._cache.clear()
+    for column in columns:
+        timestamps.parse_utc(column)
+
+
+def timestamps_benchmark(repeat: int) -> None:
+    '''
+    Times pd.to_datetime(utc=True) against timestamps.parse_utc on the timestamp strings of the raw backfill files,
+    without and with the cache (which parses the identical columns of several files once), and checks that both give
+    the same timestamps.
+    '''
+    columns = []
+    for source, zone in BACKFILL_FILES:
+        df = raw_store.read_raw_csv_fast(source, zone)
+        columns.append(df[raw_store._timestamp_column(df)])
+    for column in columns:
+        pd.testing.assert_index_equal(pd.DatetimeIndex(pd.to_datetime(column, utc=True)), timestamps.parse_utc(column))
+    print(f'{len(columns)} timestamp columns ({sum(map(len, columns))} strings), identical output:')
+    print_timings([
+        ('pd.to_datetime(utc=True)', time_best(lambda: [pd.to_datetime(column, utc=True) for column in columns], repeat)),
+        ('parse_utc (no cache)', time_best(lambda: parse_utc_uncached(columns), repeat)),
+        ('parse_utc (cache)', time_best(lambda: parse_utc_cached(columns), repeat)),
+    ])
+
+
+def frame_prediction_features(df_weather: pd.DataFrame, df_prices_generation: pd.DataFrame) -> pd.DataFrame:
+    '''
+    The forecast model input through the wide model data frame expanded to the borders, as the baseline.
+    '''
+    df_forecast = transform.transform_model_data_from_df(df_weather, df_prices_generation, None)
+    return prepare_data_for_predictions(add_country_codes_for_prediction(df_forecast))
+
+
+def dataset_prediction_features(df_weather: pd.DataFrame, df_prices_generation: pd.DataFrame) -> pd.DataFrame:
+    return data.prediction_features(transform.build_model_dataset(df_weather, df_prices_generation, None))
+
+
+def dataset_benchmark(repeat: int, days: int) -> None:
+    '''
+    Times and traces building the model input of the inference from the last days of the backfill frames through the
+    wide frames against building it from the model dataset, checks that both give the same input, and checks that the
+    model matrix, the zone features and the (hour, zone, variable) array of the dataset are views.
+    '''
+    df_weather, df_prices_generation, df_flow = backfill_frames()
+    start = df_weather['datetime'].max() - pd.Timedelta(days=days)
+    frames = (df_weather[df_weather['datetime'] > start], df_prices_generation[df_prices_generation['datetime'] > start])
+    pd.testing.assert_frame_equal(frame_prediction_features(*frames), dataset_prediction_features(*frames))
+
+    dataset = transform.build_model_dataset(df_weather, df_prices_generation, df_flow)
+    views = {'model_matrix': dataset.model_matrix(), 'zone': dataset.zone('NL'), 'values': dataset.values}
+    for name, view in views.items():
+        if not np.shares_memory(view, dataset.values):
+            raise SystemExit(f'{name} of the model dataset is a copy.')
+    print(f'model dataset {dataset.values.shape} (hour, zone, variable), {len(dataset.borders)} borders, '
+          f'{len(dataset.flow_hours)} flow rows, views: {", ".join(views)}.')
+
+    print(f'forecast input of {days} days, identical output, peak traced memory through frames '
+          f'{traced_peak(lambda: frame_prediction_features(*frames)):.1f} MB, from the dataset '
+          f'{traced_peak(lambda: dataset_prediction_features(*frames)):.1f} MB:')
+    print_timings([
+        ('model data frame, expanded and encoded', time_best(lambda: frame_prediction_features(*frames), repeat)),
+        ('model dataset, prediction_features', time_best(lambda: dataset_prediction_features(*frames), repeat)),
+    ])
+
+
+def joined_training_data(df_weather: pd.DataFrame, df_prices_generation: pd.DataFrame, df_flow: pd.DataFrame) -> Tuple[pd.DataFrame, ...]:
+    '''
+    The training data through the model data with the features repeated for every border (the former model_data
+    feature group), split on the test start of prepare_factorized_training_data, as the baseline.
+    '''
+    df_model = transform.transform_model_data_from_df(df_weather, df_prices_generation, df_flow)
+    is_test = df_model['datetime'] >= pd.Timestamp('2024-01-01', tz='UTC')
+    X_train, X_test = (df_model[rows].drop(columns=['energy_sent']).reset_index(drop=True) for rows in (~is_test, is_test))
+    y_train, y_test = (df_model.loc[rows, ['energy_sent']].reset_index(drop=True) for rows in (~is_test, is_test))
+    return (*prepare_data_for_training(X_train, X_test), y_train, y_test)
+
+
+def factorized_training_data(df_weather: pd.DataFrame, df_prices_generation: pd.DataFrame, df_flow: pd.DataFrame) -> Tuple[pd.DataFrame, ...]:
+    df_hourly_features = transform.transform_model_data_from_df(df_weather, df_prices_generation)
+    return data.prepare_factorized_training_data(df_hourly_features, df_flow)
+
+
+def factorized_benchmark(repeat: int) -> None:
+    '''
+    Compares the stored size of the model data with the features of every border against the hourly features plus
+    the flows, and times and traces building the training input from both (tests/test_data.py checks that both give
+    the same input).
+    '''
+    frames = backfill_frames()
+    model_data_mb = schema.memory_mb(transform.transform_model_data_from_df(*frames))
+    factorized_mb = schema.memory_mb(transform.transform_model_data_from_df(*frames[:2])) + schema.memory_mb(frames[2])
+    print(f'stored model data {model_data_mb:.1f} MB -> hourly features and flows {factorized_mb:.1f} MB ({factorized_mb / model_data_mb:.0%})')
+    print(f'training input, peak traced memory joined {traced_peak(lambda: joined_training_data(*frames)):.1f} MB, '
+          f'factorized {traced_peak(lambda: factorized_training_data(*frames)):.1f} MB:')
+    print_timings([
+        ('model data, split and encoded', time_best(lambda: joined_training_data(*frames), repeat)),
+        ('hourly features and flows', time_best(lambda: factorized_training_data(*frames), repeat)),
+    ])
+
+
+def entsoe_parser_benchmark(repeat: int, days: int) -> None:
+    '''
+    Times entsoe-py against the streaming parser on a generation document (tests/test_entsoe_parser.py checks that
+    both give the same result).
+    '''
+    local_days = pd.date_range('2024-01-01', periods=days + 1, freq='D', tz='Europe/Amsterdam')
+    generation = generation_document([(local_days, 'PT15M')])
+    print(f'A75 document of {len(generation) / 2**20:.1f} MB:')
+    print_timings([
+        ('entsoe-py (BeautifulSoup)', time_best(lambda: entsoe_parsers.parse_generation(generation), repeat)),
+        ('streaming parser (iterparse)', time_best(lambda: entsoe_parser.parse_generation(generation), repeat)),
+    ])
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    pd.set_option('mode.copy_on_write', settings.COPY_ON_WRITE)
+    if args.benchmark == 'preload':
+        preload_benchmark(args.repeat, args.max_workers)
+    elif args.benchmark == 'borders':
+        borders_benchmark(args.repeat, args.timestamps)
+    elif args.benchmark == 'pivot':
+        pivot_benchmark(args.repeat)
+    elif args.benchmark == 'memory':
+        memory_benchmark()
+    elif args.benchmark == 'model_data':
+        model_data_benchmark(args.repeat)
+    elif args.benchmark == 'flows':
+        flows_benchmark(args.repeat)
+    elif args.benchmark == 'timestamps':
+        timestamps_benchmark(args.repeat)
+    elif args.benchmark == 'dataset':
+        dataset_benchmark(args.repeat, args.days)
+    elif args.benchmark == 'factorized':
+        factorized_benchmark(args.repeat)
+    elif args.benchmark == 'entsoe_parser':
+        entsoe_parser_benchmark(args.repeat, args.days)
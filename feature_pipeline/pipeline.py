@@ -1,25 +1,41 @@
 import argparse
-from feature_pipeline.ETL import extract, load, transform 
+from feature_pipeline.ETL import extract, load, schema, transform 
+from feature_pipeline.ETL.dataset import HourlyZoneDataset
 import pandas as pd
+from typing import Callable, Dict, Optional, Union
+from utils.settings import copy_on_write
 
 
 def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument('--version', '-v', type=int, default=1, help='Version for the feature groups.')
+    parser.add_argument('--max_workers', '-w', type=int, default=extract.MAX_WORKERS, help='Maximum number of per-zone API calls running concurrently.')
+    parser.add_argument('--fast_parser', action='store_true', help='Parse the ENTSO-E responses with the streaming XML parser instead of entsoe-py.')
+    parser.add_argument('--streaming', '-s', action='store_true', help='Run the backfill one year of one source for one zone at a time.')
+    parser.add_argument('--dry_run', action='store_true', help='Skip the load into the feature store (backfill and daily pipelines).')
+    # Record the API responses as fixtures, or replay recorded fixtures to run offline
+    http_mode = parser.add_mutually_exclusive_group()
+    http_mode.add_argument('--record', type=str, metavar='DIR', help='Save every API response as a fixture in DIR.')
+    http_mode.add_argument('--replay', type=str, metavar='DIR', help='Serve every API request from the fixtures in DIR instead of the network.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every replayed response.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra seconds (up to) added to every replayed response.')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='Share of the replayed ENTSO-E requests that fail with a 503.')
     # Mutually exclusive group: backfill (-b) or daily (-d) is required
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--backfill', '-b', action='store_true', help='Run backfill feature pipeline.')
     group.add_argument('--daily', '-d', action='store_true', help='Run daily feature pipeline.')
     group.add_argument('--forecast', '-f', action='store_true', help='Run daily feature forecast pipeline.')
+    group.add_argument('--incremental', '-i', action='store_true', help='Run incremental feature pipeline, loading only the hours missing from the feature groups.')
     return parser
 
 
-def backfill_run(version: int = 1) -> None:
+@copy_on_write
+def backfill_run(version: int = 1, dry_run: bool = False) -> None:
     """
     A ETL pipeline for weather data from multiple countries.
     1) Extracts historical weather data from Open-Meteo for each country.
     2) Transforms/cleans the DataFrames into a single DataFrame.
-    3) Loads the combined DataFrame into the Hopsworks Feature Store.
+    3) Loads the combined DataFrame into the Hopsworks Feature Store (skipped for a dry run).
     """
     print("Starting backfill feature pipeline...")
 
@@ -33,8 +49,13 @@ def backfill_run(version: int = 1) -> None:
     df_generation = transform.transform_generation_data(generation_NL, generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2)
     df_prices_generation = transform.transform_prices_generation(df_prices, df_generation)
     df_flow = transform.merge_export_import(import_flow, export_flow)
+    df_hourly_features = transform.transform_model_data_from_df(df_weather, df_prices_generation)
 
     # -------------------- LOAD --------------------
+    if dry_run:
+        _print_dry_run(weather=df_weather, prices_generation=df_prices_generation, physical_flow=df_flow, hourly_features=df_hourly_features)
+        return
+
     weather_expectation_suite = load.create_weather_validation_suite()
     generation_prices_expectation_suite = load.create_prices_generation_validation_suite()
     flow_expectation_suite = load.create_physical_flow_validation_suite()
@@ -43,16 +64,60 @@ def backfill_run(version: int = 1) -> None:
     load.to_feature_store_weather(df_weather, weather_expectation_suite, version)
     load.to_feature_store_prices_generation(df_prices_generation, generation_prices_expectation_suite, version) 
     load.to_feature_store_physical_flow(df_flow, flow_expectation_suite, version)
+    load.insert_data_to_fg(df_hourly_features, load.get_or_create_hourly_features_fg(version))
 
     print("Backfill feature pipeline run complete.")
 
 
-def daily_run(version: int = 1) -> None:
+@copy_on_write
+def streaming_backfill_run(version: int = 1, dry_run: bool = False) -> None:
+    """
+    The backfill pipeline in chunks of one year of one source for one zone, so only the raw data of a year is in memory:
+    1) Streams the historical data of each year, source and zone from the raw store or the CSV files.
+    2) Transforms each chunk as soon as it is read, and builds the hourly features of a year once its chunks are done.
+    3) Loads each chunk into its feature group (skipped for a dry run), the first chunk creates the feature group.
+    """
+    print("Starting streaming backfill feature pipeline...")
+
+    to_feature_store = {
+        'weather': (load.to_feature_store_weather, load.create_weather_validation_suite),
+        'prices_generation': (load.to_feature_store_prices_generation, load.create_prices_generation_validation_suite),
+        'physical_flow': (load.to_feature_store_physical_flow, load.create_physical_flow_validation_suite),
+    }
+    # every prices_generation chunk gets the production types of all zones, the columns of its feature group
+    df_generation_columns = transform.generation_columns(extract.local_columns('energy_generation', zone) for zone in extract.ZONE_ORDER)
+    feature_groups = {}
+    for year, source, zone, df in transform.transform_backfill_chunks(extract.iter_backfill_chunks(), df_generation_columns):
+        if dry_run:
+            chunk = f'{year} {zone}' if zone else year
+            print(f'Dry run, not inserted into {source} for {chunk}: {len(df)} rows, {df.shape[1]} columns, {schema.memory_mb(df):.1f} MB.')
+        elif source in to_feature_store and source not in feature_groups:
+            to_feature_store_fn, create_suite_fn = to_feature_store[source]
+            feature_groups[source] = to_feature_store_fn(df, create_suite_fn(), version)
+        else:
+            if source not in feature_groups:
+                feature_groups[source] = load.get_or_create_hourly_features_fg(version)
+            load.insert_data_to_fg(df, feature_groups[source])
+        del df
+    print("Streaming backfill feature pipeline run complete.")
+
+
+def _print_dry_run(**dfs: pd.DataFrame) -> None:
+    '''
+    Prints what a dry run would have inserted into each feature group.
+    '''
+    for name, df in dfs.items():
+        print(f'Dry run, not inserted into {name}: {len(df)} rows, {df.shape[1]} columns, {schema.memory_mb(df):.1f} MB.')
+
+
+@copy_on_write
+def daily_run(version: int = 1, max_workers: int = extract.MAX_WORKERS, dry_run: bool = False) -> None:
     """
     A smaller-scale ETL pipeline for daily updates:
     1) Extracts the most recent day's weather, prices, and generation data.
     2) Transforms them into consistent DataFrames.
-    3) Loads/appends them into the same feature store groups as the backfill (same version).
+    3) Loads/appends them into the same feature store groups as the backfill (same version), skipped for a dry run. An
+       empty hourly_features group is filled from the weather and prices_generation groups instead.
     """
     print("Starting daily feature pipeline...")
 
@@ -61,7 +126,7 @@ def daily_run(version: int = 1) -> None:
     weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2, \
         energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2, \
         generation_NL, generation_BE, generation_DE_LU, generation_DK_1, generation_GB, generation_NO_2, \
-        import_flow, export_flow = extract.extract_daily_data()
+        import_flow, export_flow = extract.extract_daily_data(max_workers=max_workers)
 
     # -------------------- TRANSFORM --------------------
     df_weather = transform.transform_weather_data(
@@ -75,30 +140,146 @@ def daily_run(version: int = 1) -> None:
     )
     df_prices_generation = transform.transform_prices_generation(df_prices, df_generation)
     df_flow = transform.merge_export_import(import_flow, export_flow, from_api=True)
-    df_model_data = transform.transform_model_data_from_df(df_weather, df_prices_generation , df_flow)
+    df_hourly_features = transform.transform_model_data_from_df(df_weather, df_prices_generation)
     
     # -------------------- LOAD --------------------
+    if dry_run:
+        _print_dry_run(weather=df_weather, prices_generation=df_prices_generation, physical_flow=df_flow, hourly_features=df_hourly_features)
+        return
+
     # Retrieve feature group
     weather_fg = load.retrieve_feature_group(name='weather_open_meteo', version=version)
     prices_generation_fg = load.retrieve_feature_group(name='prices_generation', version=version)
     physical_flow_fg = load.retrieve_feature_group(name='physical_flow', version=version)
-    model_data_fg = load.retrieve_feature_group(name='model_data', version=version)
+    hourly_features_fg = load.get_or_create_hourly_features_fg(version)
+    hourly_features_empty = load.latest_feature_group_datetime(hourly_features_fg) is None
    
     # Insert data into the feature store
     load.insert_data_to_fg(df_weather, weather_fg)
     load.insert_data_to_fg(df_prices_generation, prices_generation_fg)
     load.insert_data_to_fg(df_flow, physical_flow_fg)
-    load.insert_data_to_fg(df_model_data, model_data_fg)
+    if hourly_features_empty:
+        _backfill_hourly_features(weather_fg, prices_generation_fg, hourly_features_fg)
+    else:
+        load.insert_data_to_fg(df_hourly_features, hourly_features_fg)
 
     print("Daily feature pipeline run complete.")
 
 
-def daily_forecast_run(version: int = 1) -> pd.DataFrame:
+@copy_on_write
+def incremental_run(version: int = 1, max_workers: int = extract.MAX_WORKERS) -> None:
+    """
+    An ETL pipeline that catches the feature groups up after the daily pipeline did not run:
+    1) Finds the newest hour already stored in the feature groups for each source and zone, and in hourly_features.
+    2) Extracts only the newer hours, from the local CSV files as far as they go and from the APIs after that.
+    3) Transforms them and loads/appends them into the same feature store groups as the backfill (same version). An
+       empty hourly_features group is filled from the weather and prices_generation groups instead.
+    """
+    print("Starting incremental feature pipeline...")
+
+    weather_fg = load.retrieve_feature_group(name='weather_open_meteo', version=version)
+    prices_generation_fg = load.retrieve_feature_group(name='prices_generation', version=version)
+    physical_flow_fg = load.retrieve_feature_group(name='physical_flow', version=version)
+    hourly_features_fg = load.get_or_create_hourly_features_fg(version)
+
+    latest_weather = load.latest_feature_group_timestamps(weather_fg)
+    latest_prices_generation = load.latest_feature_group_timestamps(prices_generation_fg)
+    latest_flow = load.latest_feature_group_timestamps(physical_flow_fg, zone_column='country_from')
+    latest_flow = min(latest_flow.values()) if latest_flow else None
+    # the hourly features have their own cutoff, they are rebuilt from the weather and prices/generation after it
+    latest_hourly_features = load.latest_feature_group_datetime(hourly_features_fg)
+    # an empty hourly_features group is filled from the feature groups after the load instead
+    hourly_features_empty = latest_hourly_features is None
+
+    # -------------------- EXTRACT --------------------
+    local_frames, api_frames = extract.extract_incremental_data(
+        latest_weather, latest_prices_generation, latest_flow, latest_hourly_features, max_workers=max_workers
+    )
+
+    # -------------------- TRANSFORM --------------------
+    df_weather = _transform_rows(transform.transform_weather_data, local_frames[0:6], api_frames[0:6], takes_from_api=True)
+    df_prices = _transform_rows(transform.transform_day_ahead_prices, local_frames[6:12], api_frames[6:12])
+    df_generation = _transform_rows(transform.transform_generation_data, local_frames[12:18], api_frames[12:18], takes_from_api=True)
+    df_flow = _rows_after(_transform_rows(transform.merge_export_import, local_frames[18:20], api_frames[18:20], takes_from_api=True), latest_flow)
+
+    df_prices_generation = None
+    if df_prices is not None and df_generation is not None:
+        df_prices_generation = transform.transform_prices_generation(df_prices, df_generation)
+    df_hourly_features = None
+    if df_weather is not None and df_prices_generation is not None:
+        df_hourly_features = _rows_after(transform.transform_model_data_from_df(df_weather, df_prices_generation), latest_hourly_features)
+    df_weather = _rows_after(df_weather, latest_weather)
+    df_prices_generation = _rows_after(df_prices_generation, latest_prices_generation)
+
+    # -------------------- LOAD --------------------
+    for df, fg in [
+        (df_weather, weather_fg),
+        (df_prices_generation, prices_generation_fg),
+        (df_flow, physical_flow_fg),
+        (None if hourly_features_empty else df_hourly_features, hourly_features_fg)
+    ]:
+        if df is None or df.empty:
+            print(f"No new rows for feature group '{fg.name}'.")
+            continue
+        print(f"Inserting {len(df)} new rows into feature group '{fg.name}'.")
+        load.insert_data_to_fg(df, fg)
+    if hourly_features_empty:
+        _backfill_hourly_features(weather_fg, prices_generation_fg, hourly_features_fg)
+
+    print("Incremental feature pipeline run complete.")
+
+
+def _backfill_hourly_features(weather_fg, prices_generation_fg, hourly_features_fg) -> None:
+    """
+    Fills an empty hourly_features feature group (a deployment from before the group existed) with the hourly features
+    of everything in the weather and prices_generation feature groups.
+    """
+    print("Feature group 'hourly_features' is empty, filling it from the weather and prices_generation feature groups.")
+    load.insert_data_to_fg(transform.transform_hourly_features(weather_fg, prices_generation_fg), hourly_features_fg)
+
+
+def _transform_rows(transform_fn: Callable, local_frames: tuple, api_frames: tuple, takes_from_api: bool = False) -> Optional[pd.DataFrame]:
+    """
+    Transforms the frames of a source read from the local files and from the APIs into one frame, or None without
+    frames. takes_from_api tells whether transform_fn needs from_api=True for the frames of the APIs.
+    """
+    transformed = []
+    if local_frames[0] is not None:
+        transformed.append(transform_fn(*local_frames))
+    if api_frames[0] is not None:
+        transformed.append(transform_fn(*api_frames, from_api=True) if takes_from_api else transform_fn(*api_frames))
+    if not transformed:
+        return None
+    return pd.concat(transformed, ignore_index=True)
+
+
+def _rows_after(df: Optional[pd.DataFrame], latest: Union[Dict[str, pd.Timestamp], pd.Timestamp, None]) -> Optional[pd.DataFrame]:
+    """
+    Keeps only the rows that are newer than the latest timestamp stored in a feature group (per country_code, or a
+    single timestamp).
+    """
+    if df is None:
+        return None
+    if isinstance(latest, dict):
+        cutoff = df['country_code'].astype(object).map(latest).fillna(pd.Timestamp.min.tz_localize('UTC'))
+        df = df[df['datetime'] > cutoff]
+    elif latest is not None:
+        df = df[df['datetime'] > latest]
+    return df.reset_index(drop=True)
+
+
+@copy_on_write
+def daily_forecast_run(
+    version: int = 1,
+    max_workers: int = extract.MAX_WORKERS,
+    as_dataset: bool = False
+) -> Union[pd.DataFrame, HourlyZoneDataset]:
     """
     A smaller-scale ETL pipeline for daily predictions:
     1) Extracts the most recent day's weather, prices, and generation data.
     2) Transforms them into consistent DataFrames.
     3) Loads/appends them into the same feature store groups as the backfill (same version).
+    Returns the forecast model data, or with as_dataset the model dataset it is built from.
     """
     print("Starting daily feature forecast pipeline...")
 
@@ -106,7 +287,7 @@ def daily_forecast_run(version: int = 1) -> pd.DataFrame:
     # Example: these could be partial or near real-time extracts for the "current" day
     weather_NL, weather_BE, weather_DE_LU, weather_DK_1, weather_GB, weather_NO_2, \
         energy_price_NL, energy_price_BE, energy_price_DE_LU, energy_price_DK_1, energy_price_GB, energy_price_NO_2, \
-        generation_NL, generation_BE, generation_DE_LU, generation_DK_1, _, generation_NO_2 = extract.extract_daily_data(forecast=True)
+        generation_NL, generation_BE, generation_DE_LU, generation_DK_1, _, generation_NO_2 = extract.extract_daily_data(forecast=True, max_workers=max_workers)
 
     # -------------------- TRANSFORM --------------------
     df_weather = transform.transform_weather_data(
@@ -128,19 +309,29 @@ def daily_forecast_run(version: int = 1) -> pd.DataFrame:
     df_generation = df_generation.sort_values(by='datetime', ascending=True)
     
     df_prices_generation = transform.transform_prices_generation(df_prices, df_generation)
-    df_forecast_data = transform.transform_model_data_from_df(df_weather, df_prices_generation, None)
+    forecast_dataset = transform.build_model_dataset(df_weather, df_prices_generation, None)
     print("Daily feature forecast pipeline run complete.")
-    return df_forecast_data
+    return forecast_dataset if as_dataset else transform.model_data_frame(forecast_dataset)
 
 
 if __name__ == "__main__":
     parser = get_parser()
     args = parser.parse_args()
     version = args.version
-    if args.backfill:
-        backfill_run(args.version)
+    extract.FAST_ENTSOE_PARSER = args.fast_parser
+    if args.record:
+        extract.record_responses(args.record)
+    elif args.replay:
+        extract.replay_responses(args.replay, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    if args.backfill and args.streaming:
+        streaming_backfill_run(args.version, dry_run=args.dry_run)
+    elif args.backfill:
+        backfill_run(args.version, dry_run=args.dry_run)
     elif args.forecast:
-        daily_forecast_run(args.version)
+        daily_forecast_run(args.version, args.max_workers)
+    elif args.incremental:
+        incremental_run(args.version, args.max_workers)
     else:
-        daily_run(args.version)
+        daily_run(args.version, args.max_workers, dry_run=args.dry_run)
+    print(f'ENTSO-E requests: {extract.get_entsoe_scheduler().stats()}')
         
@@ -4,7 +4,7 @@ from feature_pipeline.pipeline import daily_forecast_run
 from utils import data, utils
 from xgboost import XGBRegressor
 from inference_pipeline.monitoring import get_monitoring_metrics
-from utils.settings import PREDICTIONS_PATH
+from utils.settings import PREDICTIONS_PATH, copy_on_write
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -13,6 +13,7 @@ def get_parser() -> argparse.ArgumentParser:
     return parser
 
 
+@copy_on_write
 def daily_inference(version: int = 1) -> None:
     """
     A daily inference pipeline that, given the most recent day's data, predicts the energy_sent for each country pair.
@@ -24,9 +25,9 @@ def daily_inference(version: int = 1) -> None:
     model = XGBRegressor()
     model.load_model(model_dir + '/model.json')
 
-    batch_data = daily_forecast_run(version=version)
-    batch_data_datetime = data.add_country_codes_for_prediction(batch_data)
-    batch_data = data.prepare_data_for_predictions(batch_data_datetime)
+    forecast_dataset = daily_forecast_run(version=version, as_dataset=True)
+    batch_data_datetime = data.prediction_frame(forecast_dataset)
+    batch_data = data.prediction_features(forecast_dataset)
 
     predictions = model.predict(batch_data)
 
@@ -2,7 +2,8 @@ import pandas as pd
 from feature_pipeline.ETL import load
 from sklearn.metrics import mean_absolute_error
 import os
-from typing import Tuple
+import warnings
+from typing import Optional, Tuple
 from utils.settings import PREDICTIONS_PATH, MAE_PATH
     
 
@@ -15,14 +16,17 @@ def _load_predictions(csv_path: str = PREDICTIONS_PATH) -> pd.DataFrame:
     return df[['datetime', 'country_from', 'country_to', 'energy_sent', 'energy_price_nl', 'total_generation_nl']]
 
 
-def _load_model_data(fg_name: str, version: int, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+def _load_model_data(version: int, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
     '''
-    Load the model data from the feature store.
+    Load the model data from the feature store: the flows, joined to the NL price and generation of their hour.
     '''
-    model_fg = load.retrieve_feature_group(name=fg_name, version=version)
-    model_data_df = model_fg.filter(
-        (model_fg.datetime > start) & 
-        (model_fg.datetime < end)
+    flow_fg = load.retrieve_feature_group(name='physical_flow', version=version)
+    hourly_features_fg = load.retrieve_feature_group(name='hourly_features', version=version)
+    model_data_df = flow_fg.select_all().join(
+        hourly_features_fg.select(['datetime', 'energy_price_nl', 'total_generation_nl']), on=['datetime']
+    ).filter(
+        (flow_fg.datetime > start) & 
+        (flow_fg.datetime < end)
     ).read()
     return model_data_df[['datetime', 'country_from', 'country_to', 'energy_sent', 'energy_price_nl', 'total_generation_nl']]
 
@@ -65,16 +69,19 @@ def save_metrics_to_csv(date: pd.Timestamp, mae_import: float, mae_export: float
     print(f"MAE results saved to {csv_file}")
 
 
-def get_monitoring_metrics(fg_name: str = 'model_data', version: int = 1, csv_file: str = MAE_PATH) -> Tuple[float, float]:
+def get_monitoring_metrics(fg_name: Optional[str] = None, version: int = 1, csv_file: str = MAE_PATH) -> Tuple[float, float]:
     '''
-    Get the monitoring metrics for the daily inference pipeline.
+    Get the monitoring metrics for the daily inference pipeline. fg_name is deprecated and ignored: the model data is
+    always read from the physical_flow and hourly_features feature groups.
     '''
+    if fg_name is not None:
+        warnings.warn('fg_name of get_monitoring_metrics is deprecated and ignored.', DeprecationWarning, stacklevel=2)
     yesterday = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
     start = yesterday.replace(hour=23, minute=0, second=0, microsecond=0) - pd.Timedelta(days=1)
     end = pd.Timestamp.today().normalize()
 
     # Load and process model data
-    model_data_df = _load_model_data(fg_name, version, start, end)
+    model_data_df = _load_model_data(version, start, end)
     model_filtered_df = _filter_and_process_data(model_data_df)
 
     model_filtered_df_import = model_filtered_df[model_filtered_df['flow_direction'] == 'Import']
@@ -0,0 +1,33 @@
+import os
+import sys
+import pytest
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+@pytest.fixture(autouse=True)
+def root_dir(monkeypatch):
+    '''
+    Runs every test from the root of the repository, which the relative data paths of the pipelines expect.
+    '''
+    monkeypatch.chdir(ROOT_DIR)
+    return ROOT_DIR
+
+
+def pytest_addoption(parser):
+    parser.addoption('--slow', action='store_true', help='Also run the tests marked slow (full backfill runs).')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: runs the full backfill, only with --slow.')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--slow'):
+        return
+    skip_slow = pytest.mark.skip(reason='runs the full backfill, use --slow to run it')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip_slow)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+
+# Namespaces of the ENTSO-E documents built by entsoe_document
+GENERATION_NAMESPACE = 'urn:iec62325.351:tc57wg16:451-6:generationloaddocument:3:0'
+PUBLICATION_NAMESPACE = 'urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:3'
+# Steps of the ENTSO-E resolutions of the documents
+RESOLUTION_STEPS = {'PT15M': '15min', 'PT30M': '30min', 'PT60M': '60min', 'P1D': '1D'}
+
+
+def entsoe_timeseries(start: pd.Timestamp, end: pd.Timestamp, resolution: str, seed: int, value_element: str = 'quantity', extra: str = '') -> str:
+    '''
+    Returns a TimeSeries element with a single Period from start to end in the resolution, of random values.
+    '''
+    step = pd.Timedelta(RESOLUTION_STEPS[resolution])
+    start, end = start.tz_convert('UTC'), end.tz_convert('UTC')
+    values = np.round(np.random.default_rng(seed).random((end - start) // step) * 1000, 1)
+    points = ''.join(
+        f'<Point><position>{position}</position><{value_element}>{value}</{value_element}></Point>' for position, value in enumerate(values, start=1)
+    )
+    return (
+        f'<TimeSeries><mRID>{seed}</mRID>{extra}<curveType>A01</curveType><Period><timeInterval><start>{start:%Y-%m-%dT%H:%MZ}</start>'
+        f'<end>{end:%Y-%m-%dT%H:%MZ}</end></timeInterval><resolution>{resolution}</resolution>{points}</Period></TimeSeries>'
+    )
+
+
+def entsoe_document(namespace: str, timeseries: List[str]) -> str:
+    '''
+    Returns an ENTSO-E document (a generation document or a publication document) holding the TimeSeries.
+    '''
+    root = 'GL_MarketDocument' if namespace == GENERATION_NAMESPACE else 'Publication_MarketDocument'
+    return f'<?xml version="1.0" encoding="UTF-8"?><{root} xmlns="{namespace}"><mRID>1</mRID>{"".join(timeseries)}</{root}>'
+
+
+def generation_document(days: List[Tuple[pd.DatetimeIndex, str]]) -> str:
+    '''
+    An A75 document of three production types and the consumption of one of them, with a TimeSeries per type over
+    each run of days, like the ENTSO-E API returns them.
+    '''
+    timeseries = []
+    for seed, (psr_type, direction) in enumerate([('B16', 'in'), ('B10', 'in'), ('B04', 'in'), ('B10', 'out')]):
+        extra = f'<{direction}BiddingZone_Domain.mRID codingScheme="A01">10YNL----------L</{direction}BiddingZone_Domain.mRID><MktPSRType><psrType>{psr_type}</psrType></MktPSRType>'
+        timeseries += [
+            entsoe_timeseries(local_days[0], local_days[-1], resolution, seed * 10 + i, extra=extra) for i, (local_days, resolution) in enumerate(days)
+        ]
+    return entsoe_document(GENERATION_NAMESPACE, timeseries)
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import pytest
+
+
+# Budget of the peak traced memory of the backfill dry run with Copy-on-Write, relative to the same run without it in
+# the same environment (about 0.78 measured: 303 MB against 388 MB)
+MAX_PEAK_RATIO = 0.9
+
+# A traced backfill dry run in a fresh process, so no run starts from the caches or the memory of another one.
+# The raw store, the cache of parsed CSV files and the cache of parsed timestamps are all bypassed.
+BACKFILL_RUN = '''
+import sys
+import tracemalloc
+from feature_pipeline import pipeline
+from feature_pipeline.ETL import raw_store, timestamps
+from utils import settings
+
+settings.COPY_ON_WRITE = sys.argv[1] == 'on'
+raw_store.RAW_STORE = False
+raw_store.CSV_CACHE = False
+timestamps.CACHE_SIZE = 0
+tracemalloc.start()
+pipeline.backfill_run(dry_run=True)
+print(tracemalloc.get_traced_memory()[1] / 2**20)
+'''
+
+
+def backfill_peak_mb(root_dir: str, copy_on_write: bool) -> float:
+    '''
+    Returns the peak traced memory in MB of a backfill dry run in a fresh process.
+    '''
+    run = subprocess.run(
+        [sys.executable, '-c', BACKFILL_RUN, 'on' if copy_on_write else 'off'],
+        cwd=root_dir, capture_output=True, text=True, check=True
+    )
+    return float(run.stdout.split()[-1])
+
+
+@pytest.mark.slow
+def test_copy_on_write_lowers_the_peak_memory(root_dir):
+    baseline_mb = backfill_peak_mb(root_dir, copy_on_write=False)
+    peak_mb = backfill_peak_mb(root_dir, copy_on_write=True)
+    print(f'peak traced memory of the backfill: {baseline_mb:.1f} MB -> {peak_mb:.1f} MB with Copy-on-Write')
+    assert peak_mb <= MAX_PEAK_RATIO * baseline_mb
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from feature_pipeline.ETL import schema, transform
+from utils import data
+
+
+# Zones of the columns of COLUMNS_MODEL_TOTAL_PRODUCTION, longest first so 'de_lu' is not split
+ZONES = sorted((zone.lower() for zone in schema.ZONE_CODES), key=len, reverse=True)
+HOURS = pd.date_range('2023-12-31 22:00', periods=4, freq='h', tz='UTC')
+
+
+def long_frame(variables: list, seed: int) -> pd.DataFrame:
+    '''
+    Returns a long frame of random values of the variables for every zone over HOURS.
+    '''
+    zones = [zone.upper() for zone in ZONES]
+    df = pd.DataFrame({'datetime': HOURS.repeat(len(zones)), 'country_code': zones * len(HOURS)})
+    rng = np.random.default_rng(seed)
+    for variable in variables:
+        df[variable] = rng.random(len(df)).round(3) * 100
+    return df
+
+
+def model_variables() -> list:
+    columns = data.COLUMNS_MODEL_TOTAL_PRODUCTION[3:]
+    return list(dict.fromkeys(next(column[:-len(zone) - 1] for zone in ZONES if column.endswith(f'_{zone}')) for column in columns))
+
+
+def expected_training_data(df_model: pd.DataFrame, columns: list, test_start: pd.Timestamp) -> tuple:
+    '''
+    The joined model data split on test_start, with the feature columns and the borders one-hot encoded.
+    '''
+    is_test = df_model['datetime'] >= test_start
+    splits = []
+    for rows in (~is_test, is_test):
+        df = df_model[rows].reset_index(drop=True)
+        one_hot = [pd.get_dummies(df[f'country_{direction}'], prefix=prefix, dtype=int) for direction, prefix in (('from', 'from'), ('to', 'to'))]
+        splits.append((pd.concat([df[columns], *one_hot], axis=1), df[['energy_sent']]))
+    (X_train, y_train), (X_test, y_test) = splits
+    return X_train, X_test, y_train, y_test
+
+
+def test_factorized_training_data_equals_the_joined_model_data():
+    variables = model_variables()
+    df_weather = long_frame([variable for variable in variables if variable != 'energy_price'], seed=0)
+    df_prices_generation = long_frame(['energy_price', 'fossil_gas'], seed=1)
+    # unsorted flows, a missing value and a flow of an hour without features
+    df_flow = schema.apply_schema(pd.DataFrame({
+        'datetime': HOURS[[3, 0, 1, 0, 2, 3]].append(pd.DatetimeIndex([HOURS[3] + pd.Timedelta(hours=1)])),
+        'country_from': ['NL', 'NL', 'BE', 'BE', 'NL', 'GB', 'NL'],
+        'country_to': ['BE', 'BE', 'NL', 'NL', 'GB', 'NL', 'BE'],
+        'energy_sent': [1.0, 2.0, 3.0, np.nan, 5.0, 6.0, 7.0],
+    }))
+    test_start = HOURS[2]
+    df_model = transform.transform_model_data_from_df(df_weather, df_prices_generation, df_flow)
+    df_hourly_features = transform.transform_model_data_from_df(df_weather, df_prices_generation)
+
+    columns = data.COLUMNS_MODEL_TOTAL_PRODUCTION[3:]
+    result = data.prepare_factorized_training_data(df_hourly_features.iloc[::-1], df_flow, test_start=test_start)
+    for expected, actual in zip(expected_training_data(df_model, columns, test_start), result):
+        pd.testing.assert_frame_equal(expected, actual)
+    assert result[2]['energy_sent'].tolist() == [2.0, 3.0]
+    assert result[3]['energy_sent'].tolist() == [5.0, 1.0, 6.0]
+
+    # without the total production, every hourly feature but the total generation
+    columns = [column for column in df_hourly_features.columns[1:] if not column.startswith('total_generation_')]
+    result = data.prepare_factorized_training_data(df_hourly_features, df_flow, total_production=False, test_start=test_start)
+    for expected, actual in zip(expected_training_data(df_model, columns, test_start), result):
+        pd.testing.assert_frame_equal(expected, actual)
+
+
+def expanded_row_by_row(df_forecast: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Expands every forecast hour to the borders of prediction_borders one row at a time, like the original iterrows
+    implementation of the border expansion.
+    '''
+    rows = []
+    for _, row in df_forecast.iterrows():
+        for country_from, country_to in data.prediction_borders():
+            rows.append({**row.to_dict(), 'country_from': country_from, 'country_to': country_to})
+    return schema.apply_schema(pd.DataFrame(rows))
+
+
+def test_prediction_rows_equal_the_row_by_row_border_expansion():
+    variables = model_variables()
+    df_weather = long_frame([variable for variable in variables if variable != 'energy_price'], seed=0)
+    df_prices_generation = long_frame(['energy_price', 'fossil_gas'], seed=1)
+    df_forecast = transform.transform_model_data_from_df(df_weather, df_prices_generation, None)
+    dataset = transform.build_model_dataset(df_weather, df_prices_generation, None)
+    expected = expanded_row_by_row(df_forecast)
+
+    pd.testing.assert_frame_equal(data.prediction_frame(dataset), expected)
+    one_hot = [pd.get_dummies(expected[f'country_{direction}'], prefix=direction, dtype=int) for direction in ('from', 'to')]
+    pd.testing.assert_frame_equal(
+        data.prediction_features(dataset),
+        pd.concat([expected.drop(columns=['datetime', 'country_from', 'country_to']), *one_hot], axis=1)
+    )
+
+
+def training_input() -> tuple:
+    variables = model_variables()
+    df_weather = long_frame([variable for variable in variables if variable != 'energy_price'], seed=0)
+    df_prices_generation = long_frame(['energy_price', 'fossil_gas'], seed=1)
+    df_flow = schema.apply_schema(pd.DataFrame({
+        'datetime': HOURS[[0, 0, 1, 2, 3]],
+        'country_from': ['NL', 'BE', 'NL', 'NL', 'GB'],
+        'country_to': ['BE', 'NL', 'GB', 'BE', 'NL'],
+        'energy_sent': [1.0, 2.0, 3.0, 4.0, 5.0],
+    }))
+    df_hourly_features = transform.transform_model_data_from_df(df_weather, df_prices_generation)
+    return df_hourly_features, data.prepare_factorized_training_data(df_hourly_features, df_flow, test_start=HOURS[2])
+
+
+def test_compact_dtypes_only_round_the_training_input(monkeypatch):
+    df_hourly_features, compact = training_input()
+    monkeypatch.setattr(schema, 'COMPACT_DTYPES', False)
+    df_hourly_features_float64, float64 = training_input()
+
+    assert (df_hourly_features.dtypes.iloc[1:] == 'float32').all()
+    assert (df_hourly_features_float64.dtypes.iloc[1:] == 'float64').all()
+    for X in compact[:2]:
+        assert (X.dtypes[[column for column in X.columns if not column.startswith(('from_', 'to_'))]] == 'float32').all()
+    for X_compact, X_float64 in zip(compact, float64):
+        pd.testing.assert_frame_equal(X_compact, X_float64, check_dtype=False, rtol=1e-6)
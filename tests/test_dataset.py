@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from feature_pipeline.ETL.dataset import HourlyZoneDataset
+
+
+def test_from_frame_is_the_inverse_of_to_frame():
+    hours = pd.date_range('2024-01-01', periods=3, freq='h', tz='UTC')
+    df = pd.DataFrame({
+        'datetime': hours,
+        'energy_price_de_lu': [1.0, 2.0, 3.0],
+        'energy_price_nl': [4.0, 5.0, 6.0],
+        'nuclear_nl': [7.0, 8.0, 9.0],
+    })
+    dataset = HourlyZoneDataset.from_frame(df.iloc[::-1], ['nl', 'de_lu', 'lu'])
+    assert dataset.variables == ['energy_price', 'nuclear']
+    assert dataset.zones == ['de_lu', 'nl']
+    assert dataset.present.tolist() == [[True, True], [False, True]]
+    assert np.shares_memory(dataset.model_matrix(), dataset.values)
+    pd.testing.assert_frame_equal(dataset.to_frame(), df)
+
+
+def pivot_table_frame(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    '''
+    The pivoted frame of pivot_table, as the original implementation built it.
+    '''
+    df_pivot = df.pivot_table(index='datetime', columns='country_code', values=columns)
+    df_pivot.columns = [f'{variable}_{zone}' for variable, zone in df_pivot.columns]
+    return df_pivot.reset_index().sort_values(by=['datetime'])
+
+
+def long_frame() -> pd.DataFrame:
+    '''
+    Returns a long frame in random order with a missing value, a zone without one hour and a variable without values.
+    '''
+    hours = pd.date_range('2024-10-26 22:00', periods=5, freq='h', tz='UTC')
+    df = pd.DataFrame({'datetime': hours.repeat(3), 'country_code': ['NL', 'BE', 'NO_2'] * len(hours)})
+    rng = np.random.default_rng(0)
+    df['temperature_2m'] = rng.random(len(df))
+    df['energy_price'] = rng.random(len(df))
+    df['snow_depth'] = np.nan
+    df.loc[4, 'energy_price'] = np.nan
+    return df.drop(index=5).sample(frac=1, random_state=0)
+
+
+def test_from_long_equals_pivot_table():
+    df = long_frame()
+    columns = list(df.columns)[2:]
+    pd.testing.assert_frame_equal(HourlyZoneDataset.from_long(df, columns).to_frame(), pivot_table_frame(df, columns))
+
+
+def test_from_long_averages_duplicated_hours_like_pivot_table(capsys):
+    df = long_frame()
+    df = pd.concat([df, df.iloc[:2].assign(temperature_2m=[10.0, 20.0])])
+    columns = list(df.columns)[2:]
+    pd.testing.assert_frame_equal(HourlyZoneDataset.from_long(df, columns).to_frame(), pivot_table_frame(df, columns))
+    assert '4 rows share a (datetime, country_code) pair' in capsys.readouterr().out
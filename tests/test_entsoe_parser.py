@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+from entsoe import parsers as entsoe_parsers
+from pandas.tseries.frequencies import to_offset
+from feature_pipeline.ETL import entsoe_parser
+from tests.entsoe_documents import PUBLICATION_NAMESPACE, entsoe_document, entsoe_timeseries, generation_document
+
+
+# Local days of the ENTSO-E documents: hourly over the change to summer time, quarter-hourly over the change back
+ENTSOE_DAYS = [
+    (pd.date_range('2024-03-29', '2024-04-02', freq='D', tz='Europe/Amsterdam'), 'PT60M'),
+    (pd.date_range('2024-10-25', '2024-10-29', freq='D', tz='Europe/Amsterdam'), 'PT15M'),
+]
+# Points past the end and before the start of their period
+OUT_OF_RANGE_POINTS = [
+    '<Point><position>1000</position><quantity>1.0</quantity></Point>',
+    '<Point><position>0</position><quantity>1.0</quantity></Point>',
+]
+
+
+def price_document() -> str:
+    '''
+    An A44 document with a price TimeSeries per day of ENTSOE_DAYS.
+    '''
+    return entsoe_document(PUBLICATION_NAMESPACE, [
+        entsoe_timeseries(start, end, resolution, seed * 10 + i, value_element='price.amount')
+        for seed, (local_days, resolution) in enumerate(ENTSOE_DAYS) for i, (start, end) in enumerate(zip(local_days[:-1], local_days[1:]))
+    ])
+
+
+def flow_document() -> str:
+    '''
+    An A11 document with a flow TimeSeries over each run of days of ENTSOE_DAYS.
+    '''
+    return entsoe_document(PUBLICATION_NAMESPACE, [
+        entsoe_timeseries(local_days[0], local_days[-1], resolution, seed) for seed, (local_days, resolution) in enumerate(ENTSOE_DAYS)
+    ])
+
+
+def entsoe_py_prices(xml_text: str) -> dict:
+    '''
+    The prices of entsoe-py per frequency, keyed by the step in nanoseconds. entsoe-py parse_prices keys the series by
+    the old '60T' aliases, which pandas 2.2 no longer gives, so its TimeSeries parser is grouped by frequency instead.
+    '''
+    prices = {}
+    for soup in entsoe_parsers._extract_timeseries(xml_text):
+        series = entsoe_parsers._parse_price_timeseries(soup)
+        prices.setdefault(series.index.freq.nanos, []).append(series)
+    return {step: pd.concat(series).sort_index() for step, series in prices.items()}
+
+
+def test_documents_cross_both_dst_changes_and_a_change_of_resolution():
+    index = entsoe_parser.parse_crossborder_flows(flow_document()).index.tz_convert('Europe/Amsterdam')
+    hours_per_day = index.floor('D').value_counts()
+    assert hours_per_day[pd.Timestamp('2024-03-31', tz='Europe/Amsterdam')] == 23
+    assert hours_per_day[pd.Timestamp('2024-10-27', tz='Europe/Amsterdam')] == 25 * 4
+    assert set(index.to_series().diff().dropna().unique()) >= {pd.Timedelta('15min'), pd.Timedelta('1h')}
+
+
+def test_parse_generation():
+    xml_text = generation_document(ENTSOE_DAYS)
+    pd.testing.assert_frame_equal(entsoe_parsers.parse_generation(xml_text), entsoe_parser.parse_generation(xml_text), check_freq=False)
+
+
+def test_parse_prices():
+    xml_text = price_document()
+    expected = entsoe_py_prices(xml_text)
+    parsed = {to_offset(frequency).nanos: series for frequency, series in entsoe_parser.parse_prices(xml_text).items()}
+    assert sorted(parsed) == sorted(expected)
+    for step, series in parsed.items():
+        pd.testing.assert_series_equal(expected[step], series, check_freq=False)
+
+
+def test_parse_crossborder_flows():
+    xml_text = flow_document()
+    pd.testing.assert_series_equal(entsoe_parsers.parse_crossborder_flows(xml_text), entsoe_parser.parse_crossborder_flows(xml_text), check_freq=False)
+
+
+@pytest.mark.parametrize('point', OUT_OF_RANGE_POINTS)
+def test_points_outside_their_period_are_skipped(point):
+    xml_text = flow_document()
+    out_of_range = xml_text.replace('</Period>', f'{point}</Period>', 1)
+    pd.testing.assert_series_equal(entsoe_parsers.parse_crossborder_flows(xml_text), entsoe_parser.parse_crossborder_flows(out_of_range), check_freq=False)
+
+
+@pytest.mark.parametrize('point', OUT_OF_RANGE_POINTS)
+def test_generation_points_outside_their_period_are_skipped(point):
+    xml_text = generation_document(ENTSOE_DAYS)
+    out_of_range = xml_text.replace('</Period>', f'{point}</Period>', 1)
+    pd.testing.assert_frame_equal(entsoe_parsers.parse_generation(xml_text), entsoe_parser.parse_generation(out_of_range), check_freq=False)
+
+
+def test_other_resolutions_fall_back_to_entsoe_py():
+    days = [(pd.date_range('2024-01-01', '2024-01-10', freq='D', tz='UTC'), 'P1D')]
+    xml_text = generation_document(days)
+    pd.testing.assert_frame_equal(entsoe_parsers.parse_generation(xml_text), entsoe_parser.parse_generation(xml_text))
+    xml_text = entsoe_document(PUBLICATION_NAMESPACE, [entsoe_timeseries(days[0][0][0], days[0][0][-1], 'P1D', 0)])
+    pd.testing.assert_series_equal(entsoe_parsers.parse_crossborder_flows(xml_text), entsoe_parser.parse_crossborder_flows(xml_text))
+
+
+def test_prices_in_other_resolutions_raise():
+    days = pd.date_range('2024-01-01', '2024-01-10', freq='D', tz='UTC')
+    xml_text = entsoe_document(PUBLICATION_NAMESPACE, [entsoe_timeseries(days[0], days[-1], 'P1D', 0, value_element='price.amount')])
+    with pytest.raises(ValueError, match='P1D'):
+        entsoe_parser.parse_prices(xml_text)
@@ -0,0 +1,229 @@
+import io
+import os
+import pandas as pd
+import pytest
+import requests
+import requests_cache
+import urllib3
+from feature_pipeline.ETL import extract
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    '''
+    Runs a test from an empty directory with a feature_pipeline/data directory for raw CSV files.
+    '''
+    os.makedirs(tmp_path / 'feature_pipeline' / 'data')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / 'feature_pipeline' / 'data'
+
+
+def test_read_csv_after(data_dir):
+    (data_dir / 'NL_day_ahead_prices.csv').write_text(
+        ',Timestamp,Price\n'
+        '0,2024-12-31 22:00:00+01:00,10.0\n'
+        '1,2024-12-31 23:00:00+01:00,11.0\n'
+        '2,2025-01-01 00:00:00+01:00,12.0\n'
+        '3,2025-01-01 01:00:00+01:00,13.0\n'
+    )
+    df = extract._read_csv_after('day_ahead_prices', 'NL', pd.Timestamp('2024-12-31 22:00', tz='UTC'), pd.Timestamp('2025-01-01', tz='UTC'))
+    assert df['Price'].tolist() == [12.0, 13.0]
+
+
+@pytest.mark.parametrize('after', [None, pd.Timestamp('2024-12-31 22:00', tz='UTC')])
+def test_read_csv_after_without_rows(data_dir, after):
+    (data_dir / 'NL_day_ahead_prices.csv').write_text(',Timestamp,Price\n')
+    df = extract._read_csv_after('day_ahead_prices', 'NL', after, pd.Timestamp('2025-01-01', tz='UTC'))
+    assert df.empty
+    assert list(df.columns) == ['Unnamed: 0', 'Timestamp', 'Price']
+
+
+def test_monthly_windows():
+    windows = extract._monthly_windows(pd.Timestamp('2024-01-15', tz='UTC'), pd.Timestamp('2024-03-10', tz='UTC'))
+    assert windows == [
+        (pd.Timestamp('2024-01-15', tz='UTC'), pd.Timestamp('2024-02-01', tz='UTC')),
+        (pd.Timestamp('2024-02-01', tz='UTC'), pd.Timestamp('2024-03-01', tz='UTC')),
+        (pd.Timestamp('2024-03-01', tz='UTC'), pd.Timestamp('2024-03-10', tz='UTC')),
+    ]
+
+
+@pytest.fixture
+def fetched_windows(tmp_path, monkeypatch):
+    '''
+    Replaces the ENTSO-E requests of the backfill with hourly prices per window, and returns the fetched windows.
+    Windows that start at an entry of the returned 'errors' dict raise that exception instead.
+    '''
+    fetched = []
+    errors = {}
+
+    def fetch_window(source, country_code, start, end):
+        fetched.append(start)
+        if start in errors:
+            raise errors[start]
+        timestamps = pd.date_range(start, end, freq='h', inclusive='left')
+        return (pd.DataFrame({'Timestamp': timestamps, 'Price': range(len(timestamps))}),)
+
+    monkeypatch.setattr(extract, 'BACKFILL_CHECKPOINT_DIR', str(tmp_path / 'backfill'))
+    monkeypatch.setattr(extract, '_fetch_entsoe_window', fetch_window)
+    return fetched, errors
+
+
+START = pd.Timestamp('2024-01-15', tz='UTC')
+END = pd.Timestamp('2024-03-10', tz='UTC')
+
+
+def backfill(start=START, end=END):
+    return extract.extract_entsoe_backfill('day_ahead_prices', 'NL', start, end, max_workers=2, to_CSV=False)[0]
+
+
+def test_backfill_skips_checkpointed_windows(fetched_windows):
+    fetched, _ = fetched_windows
+    prices = backfill()
+    assert prices['Timestamp'].tolist() == list(pd.date_range(START, END, freq='h', inclusive='left'))
+    assert sorted(fetched) == [START, pd.Timestamp('2024-02-01', tz='UTC'), pd.Timestamp('2024-03-01', tz='UTC')]
+
+    fetched.clear()
+    pd.testing.assert_frame_equal(backfill(), prices)
+    assert fetched == []
+
+
+def test_backfill_raises_on_failed_window_and_resumes(fetched_windows):
+    fetched, errors = fetched_windows
+    errors[pd.Timestamp('2024-02-01', tz='UTC')] = ConnectionError('timeout')
+    with pytest.raises(RuntimeError, match='1 windows'):
+        backfill()
+
+    fetched.clear()
+    del errors[pd.Timestamp('2024-02-01', tz='UTC')]
+    assert len(backfill()) == (END - START) / pd.Timedelta(hours=1)
+    assert fetched == [pd.Timestamp('2024-02-01', tz='UTC')]
+
+
+def test_backfill_fetches_empty_windows_again(fetched_windows):
+    fetched, errors = fetched_windows
+    errors[START] = extract.NoMatchingDataError()
+    assert backfill()['Timestamp'].min() == pd.Timestamp('2024-02-01', tz='UTC')
+
+    fetched.clear()
+    backfill()
+    assert fetched == [START]
+
+
+def test_backfill_fetches_recent_windows_again(fetched_windows):
+    fetched, _ = fetched_windows
+    end = pd.Timestamp.now(tz='UTC').floor('h')
+    start = (end - pd.DateOffset(months=2)).floor('D')
+    backfill(start, end)
+
+    fetched.clear()
+    backfill(start, end)
+    settled_before = pd.Timestamp.now(tz='UTC') - extract.BACKFILL_SETTLE_TIME
+    recent = [window_start for window_start, window_end in extract._monthly_windows(start, end) if window_end > settled_before]
+    assert sorted(fetched) == recent
+    assert len(recent) < 3
+
+
+def test_backfill_checkpoints_per_parser(fetched_windows, monkeypatch):
+    fetched, _ = fetched_windows
+    backfill()
+    monkeypatch.setattr(extract, 'FAST_ENTSOE_PARSER', not extract.FAST_ENTSOE_PARSER)
+
+    fetched.clear()
+    backfill()
+    assert len(fetched) == 3
+
+
+class FakeOpenMeteo:
+    '''
+    Answers batched Open-Meteo requests with a daily frame per location, holding the latitude of the location.
+    '''
+    def __init__(self):
+        self.requests = []
+
+    def weather_api(self, url, params):
+        self.requests.append((url, params['start_date'], params['end_date']))
+        time = pd.date_range(params['start_date'], params['end_date'], freq='D', name='time')
+        return [pd.DataFrame({'latitude': float(latitude)}, index=time) for latitude in params['latitude'].split(',')]
+
+
+def test_weather_batch_requests_the_archive_per_year(monkeypatch):
+    client = FakeOpenMeteo()
+    monkeypatch.setattr(extract, 'get_openmeteo_client', lambda: client)
+    monkeypatch.setattr(extract, '_weather_response_to_df', lambda response: response)
+    monkeypatch.setattr(extract, 'get_country_center_coordinates', lambda zone: (len(zone), 0.0))
+
+    frames = extract.extract_weather_batch(
+        ('NL', 'DE_LU'), pd.Timestamp('2023-06-01', tz='UTC'), pd.Timestamp('2025-01-05', tz='UTC'), historical=True
+    )
+    assert client.requests == [
+        (extract.WEATHER_ARCHIVE_URL, '2023-06-01', '2023-12-31'),
+        (extract.WEATHER_ARCHIVE_URL, '2024-01-01', '2024-12-31'),
+        (extract.WEATHER_ARCHIVE_URL, '2025-01-01', '2025-01-05'),
+    ]
+    for zone in ('NL', 'DE_LU'):
+        assert frames[zone].index.equals(pd.date_range('2023-06-01', '2025-01-05', freq='D', name='time'))
+        assert (frames[zone]['latitude'] == len(zone)).all()
+
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+    '''
+    Answers every request with an empty 200 response and counts the requests that reach it.
+    '''
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response.raw = urllib3.HTTPResponse(body=io.BytesIO(b''), status=200, preload_content=False, request_url=request.url)
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    '''
+    Builds the shared HTTP session with every request answered by a FakeAdapter. The responses are cached in memory,
+    with the expiry and cache keys of the session settings.
+    '''
+    monkeypatch.setattr(extract, 'HTTP_CACHE_PATH', str(tmp_path / 'http_cache.sqlite'))
+    extract.get_session.cache_clear()
+    session = extract.get_session()
+    settings = session.settings
+    session.cache = requests_cache.BaseCache()
+    session.settings = settings
+    session.adapter = FakeAdapter()
+    session.mount('https://', session.adapter)
+    session.mount(extract.ENTSOE_URL, session.adapter)
+    yield session
+    extract.get_session.cache_clear()
+
+
+@pytest.mark.parametrize('url, expiry', [
+    ('https://archive-api.open-meteo.com/v1/era5?latitude=52.1', None),
+    ('https://api.open-meteo.com/v1/forecast?latitude=52.1', pd.Timedelta(hours=3)),
+    ('https://web-api.tp.entsoe.eu/api?documentType=A44', pd.Timedelta(hours=1)),
+])
+def test_session_caches_per_endpoint(session, url, expiry):
+    response = session.get(url)
+    if expiry is None:
+        assert response.expires is None
+    else:
+        expires = pd.Timestamp(response.expires)
+        assert abs(expires - (pd.Timestamp.now(tz='UTC') + expiry)) < pd.Timedelta(minutes=1)
+    assert session.get(url).from_cache
+
+
+def test_session_leaves_api_key_out_of_the_cache(session):
+    session.get('https://web-api.tp.entsoe.eu/api?documentType=A44&securityToken=first')
+    response = session.get('https://web-api.tp.entsoe.eu/api?documentType=A44&securityToken=second')
+    assert response.from_cache
+    assert session.adapter.sent == 1
+    for cached in session.cache.responses.values():
+        assert 'first' not in cached.request.url
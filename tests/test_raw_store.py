@@ -0,0 +1,102 @@
+import os
+import pandas as pd
+import pytest
+from feature_pipeline.ETL import extract, raw_store, transform
+
+
+def test_gb_generation_has_a_two_row_header():
+    assert raw_store.csv_header_rows('./feature_pipeline/data/GB_energy_generation.csv') == 2
+    assert extract._csv_layout('energy_generation', 'GB') == (2, 0)
+    assert raw_store.csv_header_rows('./feature_pipeline/data/DK_1_energy_generation.csv') == 1
+
+
+def test_gb_generation_skips_the_consumption_columns():
+    fast = raw_store.to_raw_frame(raw_store.read_raw_csv_fast('energy_generation', 'GB'))
+    slow = raw_store.to_raw_frame(raw_store.read_raw_csv('energy_generation', 'GB'))
+    assert not [name for name in fast.columns if 'Consumption' in name]
+    assert fast.equals(slow[fast.columns])
+
+
+def test_gb_generation_columns_are_production_types():
+    df = raw_store.read_raw_csv_fast('energy_generation', 'GB')
+    columns = transform._clean_generation_columns(df).columns
+    assert not [column for column in columns if '.' in column]
+    assert {'fossil_gas', 'wind_onshore', 'nuclear'} <= set(columns)
+
+
+def test_csv_cache_is_invalidated_when_the_csv_changes(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / 'feature_pipeline' / 'data')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(raw_store, 'CSV_CACHE_DIR', str(tmp_path / 'csv_cache'))
+    parsed = []
+    read_raw_csv_fast = raw_store.read_raw_csv_fast
+    monkeypatch.setattr(raw_store, 'read_raw_csv_fast', lambda *args: parsed.append(args) or read_raw_csv_fast(*args))
+    csv_path = tmp_path / 'feature_pipeline' / 'data' / 'NL_day_ahead_prices.csv'
+    header = ',Timestamp,Price\n0,2025-01-01 00:00:00+01:00,10.0\n'
+
+    csv_path.write_text(header)
+    assert raw_store.read_raw_csv_cached('day_ahead_prices', 'NL')['Price'].tolist() == [10.0]
+    assert raw_store.read_raw_csv_cached('day_ahead_prices', 'NL')['Price'].tolist() == [10.0]
+    assert len(parsed) == 1
+
+    # the same size, so only the content hash tells the files apart
+    mtime_ns = csv_path.stat().st_mtime_ns
+    csv_path.write_text(header.replace('10.0', '12.0'))
+    os.utime(csv_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    assert raw_store.read_raw_csv_cached('day_ahead_prices', 'NL')['Price'].tolist() == [12.0]
+    csv_path.write_text(header + '1,2025-01-01 01:00:00+01:00,11.0\n')
+    assert raw_store.read_raw_csv_cached('day_ahead_prices', 'NL')['Price'].tolist() == [10.0, 11.0]
+    assert len(parsed) == 3
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(raw_store, 'RAW_STORE_DIR', str(tmp_path / 'raw'))
+    return tmp_path / 'raw'
+
+
+def csv_prices(start, periods):
+    '''
+    Returns hourly prices as read from a raw CSV file: the saved row numbers and the timestamps as local time strings.
+    '''
+    times = pd.date_range(start, periods=periods, freq='h', tz='Europe/Amsterdam')
+    return pd.DataFrame({'Unnamed: 0': range(periods), 'Timestamp': times.astype(str), 'Price': [float(i) for i in range(periods)]})
+
+
+def test_write_raw_read_raw_round_trip(store_dir):
+    df = csv_prices('2024-12-31 20:00', 8)
+    raw_store.write_raw(df, 'day_ahead_prices', 'NL')
+    assert raw_store.raw_years('day_ahead_prices', 'NL') == [2024, 2025]
+
+    stored = raw_store.read_raw('day_ahead_prices', 'NL')
+    assert list(stored.columns) == ['Timestamp', 'Price']
+    pd.testing.assert_series_equal(stored['Timestamp'], pd.to_datetime(df['Timestamp'], utc=True), check_dtype=False)
+    assert stored['Price'].tolist() == df['Price'].tolist()
+    assert raw_store.read_raw('day_ahead_prices', 'NL', start_year=2025)['Timestamp'].dt.year.unique().tolist() == [2025]
+
+
+def test_write_raw_read_raw_round_trip_with_multiindex_columns(store_dir):
+    columns = pd.MultiIndex.from_tuples([('Unnamed: 0_level_0', 'Unnamed: 0_level_1'), ('Nuclear', 'Actual Aggregated')])
+    df = pd.DataFrame([['2024-01-01 00:00:00+01:00', 10.0], ['2024-01-01 01:00:00+01:00', 11.0]], columns=columns)
+    raw_store.write_raw(df, 'energy_generation', 'BE')
+    stored = raw_store.read_raw('energy_generation', 'BE')
+    assert stored.columns.equals(columns)
+    assert stored[('Nuclear', 'Actual Aggregated')].tolist() == [10.0, 11.0]
+
+
+def test_append_raw_rewrites_only_the_partitions_of_new_rows(store_dir):
+    raw_store.write_raw(csv_prices('2023-12-31 20:00', 30), 'day_ahead_prices', 'NL')
+    old_partition = store_dir / 'source=day_ahead_prices' / 'zone=NL' / 'year=2023'
+    written = {path.name: path.stat().st_mtime_ns for path in old_partition.iterdir()}
+
+    full = csv_prices('2023-12-31 20:00', 40)
+    full.loc[0, 'Price'] = -1.0  # older rows are left as stored
+    raw_store.append_raw(full, 'day_ahead_prices', 'NL')
+    assert {path.name: path.stat().st_mtime_ns for path in old_partition.iterdir()} == written
+
+    stored = raw_store.read_raw('day_ahead_prices', 'NL')
+    assert stored['Price'].tolist() == [float(i) for i in range(40)]
+    pd.testing.assert_series_equal(stored['Timestamp'], pd.to_datetime(full['Timestamp'], utc=True), check_dtype=False)
+
+    raw_store.append_raw(full, 'day_ahead_prices', 'NL')
+    assert len(raw_store.read_raw('day_ahead_prices', 'NL')) == 40
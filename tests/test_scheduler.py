@@ -0,0 +1,98 @@
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from feature_pipeline.ETL import scheduler
+from feature_pipeline.ETL.scheduler import RequestScheduler
+
+
+class FakeTransport(BaseAdapter):
+    '''
+    Answers every request with the next status code and Retry-After header, and records the closed responses.
+    '''
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.closed = []
+
+    def send(self, request, **kwargs):
+        status_code, retry_after = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status_code
+        if retry_after is not None:
+            response.headers['Retry-After'] = retry_after
+        response.close = lambda: self.closed.append(status_code)
+        return response
+
+    def close(self):
+        pass
+
+
+def make_scheduler(responses, **kwargs):
+    transport = FakeTransport(responses)
+    return RequestScheduler(requests_per_minute=6000, burst=10, transport=transport, **kwargs), transport
+
+
+def response_with(retry_after):
+    response = requests.Response()
+    response.headers['Retry-After'] = retry_after
+    return response
+
+
+def test_backoff_ignores_invalid_retry_after():
+    adapter, _ = make_scheduler([], backoff_factor=0.5)
+    for retry_after in ('soon', 'Mon, 99 Foo 2024 25:00:00 GMT'):
+        assert 0 <= adapter._backoff(0, response_with(retry_after)) <= 0.5
+
+
+def test_backoff_is_capped_at_max_backoff():
+    adapter, _ = make_scheduler([], max_backoff=2.0)
+    assert adapter._backoff(20, None) <= 2.0
+
+
+def test_backoff_honours_retry_after_up_to_max_retry_after():
+    adapter, _ = make_scheduler([], max_backoff=2.0, max_retry_after=600.0)
+    assert adapter._backoff(0, response_with('300')) == 300.0
+    assert adapter._backoff(0, response_with('3600')) == 600.0
+
+
+def test_send_closes_retried_responses(monkeypatch):
+    monkeypatch.setattr(scheduler.time, 'sleep', lambda seconds: None)
+    adapter, transport = make_scheduler([(429, 'soon'), (503, None), (200, None)])
+    response = adapter.send(requests.Request('GET', 'http://example.com').prepare())
+    assert response.status_code == 200
+    assert transport.closed == [429, 503]
+    assert adapter.stats()['retries'] == 2
+    assert adapter.stats()['throttled'] == 1
+
+
+class FakeClock:
+    '''
+    Monotonic clock that only advances when it sleeps.
+    '''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_enforces_rate_and_burst(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(scheduler.time, 'sleep', clock.sleep)
+    adapter = RequestScheduler(requests_per_minute=120, burst=5, transport=FakeTransport([]))
+    times = []
+    for _ in range(125):
+        adapter.bucket.acquire()
+        times.append(clock.now)
+
+    # the burst goes out at once, after that one request every half second
+    assert times[:5] == [0.0] * 5
+    assert times[5:] == pytest.approx([0.5 * (i + 1) for i in range(120)])
+    assert sum(time < 60 for time in times) == 5 + 119
@@ -0,0 +1,14 @@
+import pandas as pd
+from utils import settings
+
+
+def test_copy_on_write_is_set_around_the_pipeline_function(monkeypatch):
+    @settings.copy_on_write
+    def run():
+        return pd.get_option('mode.copy_on_write')
+
+    with pd.option_context('mode.copy_on_write', False):
+        assert run() is True
+        monkeypatch.setattr(settings, 'COPY_ON_WRITE', False)
+        assert run() is False
+        assert pd.get_option('mode.copy_on_write') is False
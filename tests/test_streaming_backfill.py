@@ -0,0 +1,90 @@
+import os
+import pandas as pd
+import pytest
+from feature_pipeline.ETL import extract, raw_store, transform
+
+
+# The raw CSV files are cut off at this time, so the backfill spans the change of year from 2019 to 2020
+CUTOFF = '2020-01-08'
+# Columns that identify a row of every source
+KEYS = {
+    'weather': ['datetime', 'country_code'],
+    'prices_generation': ['datetime', 'country_code'],
+    'physical_flow': ['datetime', 'country_from', 'country_to'],
+    'hourly_features': ['datetime'],
+}
+
+
+def raw_files() -> list:
+    '''
+    The (source, zone) pairs of the raw files read by the streaming backfill.
+    '''
+    return [raw_file for _, _, chunk_files in extract.BACKFILL_CHUNKS for raw_file in chunk_files]
+
+
+@pytest.fixture
+def short_data(root_dir, tmp_path, monkeypatch):
+    '''
+    Runs a test from a directory with the raw CSV files of feature_pipeline/data up to CUTOFF.
+    '''
+    os.makedirs(tmp_path / 'feature_pipeline' / 'data')
+    for path_specific, code in raw_files():
+        header_rows, timestamp_column = extract._csv_layout(path_specific, code)
+        with open(extract._local_csv_path(path_specific, code)) as f:
+            lines = f.readlines()
+        rows = [line for line in lines[header_rows:] if line.split(',')[timestamp_column] < CUTOFF]
+        with open(tmp_path / extract._local_csv_path(path_specific, code), 'w') as f:
+            f.writelines(lines[:header_rows] + rows)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(raw_store, 'CSV_CACHE', False)
+    # every year is read in several chunks
+    monkeypatch.setattr(raw_store, 'CSV_CHUNK_ROWS', 1000)
+    return tmp_path
+
+
+def backfill_frames() -> dict:
+    '''
+    The frames of the backfill transformed at once, per feature group.
+    '''
+    frames = extract.extract_backfill_data()
+    df_weather = transform.transform_weather_data(*frames[0:6])
+    df_prices_generation = transform.transform_prices_generation(
+        transform.transform_day_ahead_prices(*frames[6:12]), transform.transform_generation_data(*frames[12:18])
+    )
+    return {
+        'weather': df_weather,
+        'prices_generation': df_prices_generation,
+        'physical_flow': transform.merge_export_import(*frames[18:20]),
+        'hourly_features': transform.transform_model_data_from_df(df_weather, df_prices_generation),
+    }
+
+
+def streamed_chunks() -> list:
+    df_generation_columns = transform.generation_columns(extract.local_columns('energy_generation', zone) for zone in extract.ZONE_ORDER)
+    return list(transform.transform_backfill_chunks(extract.iter_backfill_chunks(), df_generation_columns))
+
+
+@pytest.mark.parametrize('from_raw_store', [False, True])
+def test_streamed_chunks_equal_the_backfill(short_data, from_raw_store):
+    if from_raw_store:
+        raw_store.convert_csv_store()
+    expected = backfill_frames()
+    chunks = streamed_chunks()
+
+    for source, df in expected.items():
+        streamed = pd.concat([chunk for _, chunk_source, _, chunk in chunks if chunk_source == source], ignore_index=True)
+        assert list(streamed.columns) == list(df.columns)
+        pd.testing.assert_frame_equal(
+            streamed.sort_values(KEYS[source]).reset_index(drop=True), df.sort_values(KEYS[source]).reset_index(drop=True)
+        )
+
+
+def test_chunks_are_per_year_source_and_zone(short_data):
+    chunks = streamed_chunks()
+    assert all(len(df) for _, _, _, df in chunks)
+    keys = [(year, source, zone) for year, source, zone, _ in chunks]
+    assert len(keys) == len(set(keys))
+    # the weather of the last hour of 2018 in UTC has no values and gives no chunk
+    assert [year for year, source, _ in keys if source == 'weather'] == [2019] * 6 + [2020] * 6
+    assert [zone for year, source, zone in keys if source == 'prices_generation' and year == 2019] == list(extract.ZONE_ORDER)
+    assert [year for year, source, _ in keys if source == 'hourly_features'] == [2019, 2020]
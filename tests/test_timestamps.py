@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from feature_pipeline.ETL import timestamps
+
+
+def local_strings(start, periods, freq='h'):
+    '''
+    Returns ENTSO-E style strings of local Amsterdam times with their '+HH:MM' UTC offset.
+    '''
+    times = pd.date_range(start, periods=periods, freq=freq, tz='Europe/Amsterdam')
+    return [time.isoformat(sep=' ') for time in times]
+
+
+# hourly grids over both DST changes, with one string out of place or missing, quarter hours, and the same strings
+# repeated and in another order
+SPRING = local_strings('2024-03-30 22:00', 8)
+AUTUMN = local_strings('2024-10-26 22:00', 8)
+INPUTS = {
+    'spring': SPRING,
+    'autumn': AUTUMN,
+    'swapped': AUTUMN[:3] + [AUTUMN[4], AUTUMN[3]] + AUTUMN[5:],
+    'gap': AUTUMN[:3] + AUTUMN[4:],
+    'quarter_hours': local_strings('2024-10-27 01:00', 12, freq='15min'),
+    'repeated': AUTUMN + SPRING + AUTUMN,
+    'shuffled': [AUTUMN[i] for i in np.random.default_rng(0).permutation(len(AUTUMN))] * 2,
+    'naive': ['2024-10-27 01:00:00', '2024-10-27 02:00:00', '2024-10-27 02:00:00', '2024-10-27 03:00:00'],
+    'naive_grid': [f'2024-02-28 {hour:02d}:00:00' for hour in range(20, 24)] + [f'2024-02-29 {hour:02d}:00:00' for hour in range(3)],
+    'mixed': ['2024-10-27 01:00:00+02:00', '2024-10-27 01:00:00Z', '2024-10-27T02:00:00', '2024-10-27 02:30:00-01:30'],
+    'missing': [AUTUMN[0], None, AUTUMN[2], np.nan],
+    'other_layout': ['2024-10-27', '2024-10-28'],
+}
+
+
+@pytest.mark.parametrize('name', INPUTS)
+def test_parse_utc_matches_to_datetime(name):
+    timestamps._cache.clear()
+    values = pd.Series(INPUTS[name], dtype=object, name='Timestamp')
+    # pd.to_datetime takes the layout of the first string for all of them, unless it is told they are mixed
+    expected = pd.DatetimeIndex(pd.to_datetime(values, utc=True, format='ISO8601' if name == 'mixed' else None))
+    parsed = timestamps.parse_utc(values)
+    assert parsed.equals(expected)
+    assert parsed.name == 'Timestamp'
+    # served from the cache the second time
+    assert timestamps.parse_utc(values).equals(expected)
+
+
+def test_runs_of_a_sorted_column_are_parsed_from_their_first_row():
+    chars = np.asarray(AUTUMN, dtype=f'S{timestamps.TIMESTAMP_WIDTH + 1}')
+    # a new date at midnight and a new offset when the clocks go back
+    assert timestamps._run_starts(chars.view('uint8').reshape(len(chars), -1)).tolist() == [0, 2, 5]
+
+
+@pytest.mark.parametrize('time', ['24:00:00', '12:60:00', '12:00:60', '1/:00:00', '12-00:00'])
+def test_invalid_times_within_a_run_are_not_parsed(time):
+    strings = ['2024-10-27 10:00:00+01:00', f'2024-10-27 {time}+01:00', '2024-10-27 12:00:00+01:00']
+    assert timestamps._parse_epochs(np.asarray(strings, dtype=f'S{timestamps.TIMESTAMP_WIDTH + 1}')) is None
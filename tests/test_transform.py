@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from feature_pipeline.ETL import schema, transform
+
+
+HOURS = pd.date_range('2024-01-01', periods=3, freq='h', tz='UTC')
+
+
+def wide_flow(hours: pd.DatetimeIndex, values: dict) -> pd.DataFrame:
+    '''
+    Returns a wide raw flow frame of the hours (as the local timestamp strings of the CSV files) with a column per zone.
+    '''
+    df = pd.DataFrame({'Unnamed: 0': hours.tz_convert('Europe/Amsterdam').astype(str), **values})
+    df['sum'] = df[list(values)].sum(axis=1)
+    return df
+
+
+def flow_rows(rows: list) -> pd.DataFrame:
+    return schema.apply_schema(pd.DataFrame(rows, columns=['datetime', 'country_from', 'country_to', 'energy_sent']))
+
+
+def test_merge_export_import():
+    export_data = wide_flow(HOURS[:2], {'BE': [1.0, np.nan], 'DE_LU': [2.0, 3.0]})
+    import_data = wide_flow(HOURS[:2], {'BE': [4.0, 5.0], 'DE_AT_LU': [6.0, 7.0]})
+    pd.testing.assert_frame_equal(transform.merge_export_import(export_data, import_data), flow_rows([
+        (HOURS[0], 'NL', 'BE', 1.0),
+        (HOURS[0], 'NL', 'DE_LU', 2.0),
+        (HOURS[0], 'BE', 'NL', 4.0),
+        (HOURS[0], 'DE_LU', 'NL', 6.0),
+        (HOURS[1], 'NL', 'BE', 0.0),
+        (HOURS[1], 'NL', 'DE_LU', 3.0),
+        (HOURS[1], 'BE', 'NL', 5.0),
+        (HOURS[1], 'DE_LU', 'NL', 7.0),
+    ]))
+
+
+def test_merge_export_import_of_different_hours():
+    export_data = wide_flow(HOURS[[1, 0]], {'BE': [2.0, 1.0]})
+    import_data = wide_flow(HOURS[1:], {'BE': [3.0, 4.0]})
+    pd.testing.assert_frame_equal(transform.merge_export_import(export_data, import_data), flow_rows([
+        (HOURS[0], 'NL', 'BE', 1.0),
+        (HOURS[1], 'NL', 'BE', 2.0),
+        (HOURS[1], 'BE', 'NL', 3.0),
+        (HOURS[2], 'BE', 'NL', 4.0),
+    ]))
+
+
+def test_merge_export_import_adds_former_zones():
+    export_data = wide_flow(HOURS[:1], {'DE_LU': [1.0], 'DE_AT_LU': [2.0]})
+    import_data = wide_flow(HOURS[:1], {'DE_LU': [np.nan], 'DE_AT_LU': [3.0]})
+    pd.testing.assert_frame_equal(transform.merge_export_import(export_data, import_data), flow_rows([
+        (HOURS[0], 'NL', 'DE_LU', 3.0),
+        (HOURS[0], 'DE_LU', 'NL', 3.0),
+    ]))
+
+
+def long_frame(column: str, values: list) -> pd.DataFrame:
+    '''
+    Returns a long frame of a feature for NL and BE over the four hours from HOURS[0], values in (NL, BE) pairs.
+    '''
+    hours = pd.date_range(HOURS[0], periods=4, freq='h')
+    return pd.DataFrame({'datetime': hours.repeat(2), column: values, 'country_code': ['NL', 'BE'] * 4})
+
+
+def test_transform_model_data_from_df():
+    # the third hour has missing weather and the fourth no prices: both are dropped, a missing price is 0
+    df_weather = long_frame('temperature_2m', [1.0, 2.0, 3.0, 4.0, np.nan, 6.0, 7.0, 8.0])
+    df_prices_generation = long_frame('energy_price', [10.0, 20.0, 30.0, np.nan, 50.0, 60.0, 70.0, 80.0]).iloc[:6]
+    df_flow = flow_rows([
+        (HOURS[0], 'NL', 'BE', 1.0),
+        (HOURS[0], 'BE', 'NL', 2.0),
+        (HOURS[1], 'NL', 'BE', 3.0),
+        (HOURS[1], 'BE', 'NL', np.nan),
+        (HOURS[2], 'NL', 'BE', 5.0),
+    ])
+    expected = flow_rows([
+        (HOURS[0], 'NL', 'BE', 1.0),
+        (HOURS[0], 'BE', 'NL', 2.0),
+        (HOURS[1], 'NL', 'BE', 3.0),
+    ])
+    expected[['temperature_2m_be', 'temperature_2m_nl', 'energy_price_be', 'energy_price_nl']] = np.array([
+        [2.0, 1.0, 20.0, 10.0],
+        [2.0, 1.0, 20.0, 10.0],
+        [4.0, 3.0, 0.0, 30.0],
+    ], dtype='float32')
+    df_model = transform.transform_model_data_from_df(df_weather, df_prices_generation, df_flow)
+    pd.testing.assert_frame_equal(df_model, expected)
+
+
+def test_transform_model_data_from_df_without_flows():
+    df_weather = long_frame('temperature_2m', [1.0, 2.0, 3.0, 4.0, np.nan, 6.0, 7.0, 8.0])
+    df_prices_generation = long_frame('energy_price', [10.0, 20.0, 30.0, np.nan, 50.0, 60.0, 70.0, 80.0])
+    expected = schema.apply_schema(pd.DataFrame({
+        'datetime': HOURS[[0, 1]].append(pd.DatetimeIndex([HOURS[0] + pd.Timedelta(hours=3)])),
+        'temperature_2m_be': [2.0, 4.0, 8.0],
+        'temperature_2m_nl': [1.0, 3.0, 7.0],
+        'energy_price_be': [20.0, 0.0, 80.0],
+        'energy_price_nl': [10.0, 30.0, 70.0],
+    }))
+    pd.testing.assert_frame_equal(transform.transform_model_data_from_df(df_weather, df_prices_generation), expected)
+
+
+def per_zone_resample(dfs: dict, total_column: str) -> pd.DataFrame:
+    '''
+    Resamples every zone on its own with resample('h').sum() and concatenates them, the way the zones used to be resampled.
+    '''
+    columns = list(dict.fromkeys(column for df in dfs.values() for column in df.columns))
+    frames = []
+    for zone, df in dfs.items():
+        hourly = df.tz_convert('UTC').resample('h').sum()
+        hourly[total_column] = hourly.sum(axis=1)
+        hourly = hourly.reindex(columns=columns + [total_column], fill_value=0.0)
+        frames.append(hourly.rename_axis('datetime').reset_index().assign(country_code=zone))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_resample_hourly_by_zone_matches_the_per_zone_resample():
+    rng = np.random.default_rng(0)
+    quarters = pd.date_range('2024-03-31 00:00', '2024-03-31 05:45', freq='15min', tz='Europe/Amsterdam')
+    nl = pd.DataFrame(rng.random((len(quarters), 2)), index=quarters, columns=['solar', 'wind_onshore'])
+    nl.iloc[3, 0] = np.nan
+    # hours without any rows are filled with zeros, rows out of order are summed into their hour
+    hours = pd.date_range('2024-03-30 22:00', periods=6, freq='h', tz='UTC').delete(2)[[1, 0, 2, 3, 4]]
+    no = pd.DataFrame(rng.random((len(hours), 2)), index=hours, columns=['hydro_run_of_river', 'wind_onshore'])
+    dfs = {'NL': nl, 'NO_2': no}
+
+    pd.testing.assert_frame_equal(
+        transform._resample_hourly_by_zone(dfs, total_column='total_generation'),
+        per_zone_resample(dfs, 'total_generation'),
+        check_freq=False
+    )
@@ -3,7 +3,7 @@ import os
 import hopsworks
 import pandas as pd
 from utils import data
-from utils.settings import ENV_VARS
+from utils.settings import ENV_VARS, copy_on_write
 from hsml.schema import Schema
 from hsml.model_schema import ModelSchema
 from xgboost import XGBRegressor, plot_importance
@@ -20,7 +20,8 @@ def get_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
     parser.add_argument('--version', '-v', type=int, default=1, help='Version for the feature groups.')
     parser.add_argument('--hyperparameter_tuning', '-ht', default=False, action='store_true', help='Decides if hyperparametertuning is performed or not.')
-    parser.add_argument('--create_feature_view', '-cfv', default=False, action='store_true', help='Decides if a new feature view is created or not.')
+    parser.add_argument('--build_features', '-bf', default=False, action='store_true', help='Decides if the hourly_features feature group is built from the weather and prices_generation feature groups first.')
+    parser.add_argument('--create_feature_view', '-cfv', dest='build_features', action='store_true', help='Deprecated alias of --build_features (there is no feature view any more).')
     parser.add_argument("--model_name", type=str, default='model_all_production_2', help='Name given when saving the model both locally and in Hopsworks.')
     # Mutually exclusive group:
     group = parser.add_mutually_exclusive_group(required=True)
@@ -151,21 +152,22 @@ def save_feature_importance_and_residual_plot(
     plt.clf()
 
 
+@copy_on_write
 def train_run(
     version: int,
     total_production: bool, 
     hyperparameter_tuning: bool, 
     model_name: str, 
-    create_feature_view: bool = False
+    build_features: bool = False
 ) -> None:
     '''
     Trains the model and saves it locally and in Hopsworks.
     '''
     print("Starting training...")
     if total_production:
-        X_train_one_hot, X_test_one_hot, y_train, y_test = data.get_training_data(version, True, create_feature_view)
+        X_train_one_hot, X_test_one_hot, y_train, y_test = data.get_training_data(version, True, build_features)
     else:
-        X_train_one_hot, X_test_one_hot, y_train, y_test = data.get_training_data(version, False, create_feature_view)
+        X_train_one_hot, X_test_one_hot, y_train, y_test = data.get_training_data(version, False, build_features)
     
     model = train(hyperparameter_tuning, X_train_one_hot, y_train)
 
@@ -193,4 +195,4 @@ def train_run(
 if __name__ == "__main__":
     parser = get_parser()
     args = parser.parse_args()
-    train_run(args.version, args.total_production, args.hyperparameter_tuning, args.model_name, args.create_feature_view)
+    train_run(args.version, args.total_production, args.hyperparameter_tuning, args.model_name, args.build_features)
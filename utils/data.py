@@ -1,8 +1,9 @@
+import numpy as np
 import pandas as pd
-import hsfs
-from feature_pipeline.ETL import load
-from typing import Tuple
-from utils.utils import create_feature_view
+from feature_pipeline.ETL import load, schema
+from feature_pipeline.ETL.dataset import HourlyZoneDataset
+from typing import List, Tuple
+from utils.utils import build_hourly_features
 
 
 BZN2COUNTRY = {
@@ -107,47 +108,17 @@ COLUMNS_MODEL_TOTAL_PRODUCTION = [
 ]
 
 
-def prepare_data_for_training(X_train: pd.DataFrame, X_test: pd.DataFrame, total_production: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    '''
-    Prepares the data for training by removing unnecessary columns, applying one-hot encoding, and dropping the datetime column.
-    '''
-    X_train_result = X_train.copy()
-    X_test_result = X_test.copy()
-
-    # Remove not needed columns 
-    if total_production:
-        X_train_result = X_train_result[COLUMNS_MODEL_TOTAL_PRODUCTION]
-        X_test_result = X_test_result[COLUMNS_MODEL_TOTAL_PRODUCTION]
-    else:
-        columns_to_drop = ['total_generation_nl', 'total_generation_be', 'total_generation_de_lu', 'total_generation_dk_1', 'total_generation_gb',  'total_generation_no_2']
-        X_train_result = X_train_result.drop(columns = columns_to_drop)
-        X_test_result = X_test_result.drop(columns = columns_to_drop)
-    
-    # Remove datetime column
-    X_train_result = X_train_result.drop(columns = ['datetime'])
-    X_test_result = X_test_result.drop(columns = ['datetime'])
-
-    # Apply one-hot encoding with prefixes
-    X_train_result = one_hot_encoding(X_train_result, 'country_from', prefix='from')
-    X_train_result = one_hot_encoding(X_train_result, 'country_to', prefix='to')   
-    X_test_result = one_hot_encoding(X_test_result, 'country_from', prefix='from')
-    X_test_result = one_hot_encoding(X_test_result, 'country_to', prefix='to')  
- 
-    return X_train_result, X_test_result
-
-
 def one_hot_encoding(df, feature, prefix=None) -> pd.DataFrame:
     """
     Performs one-hot encoding on the specified feature and ensures the result is 1 and 0.
     Adds a prefix to the columns to avoid name collisions.
     """
-    df_result = df.copy()
     # Generate one-hot encoding
     df_one_hot = pd.get_dummies(df[feature], prefix=prefix or feature)
     # Convert to integers to ensure 1 and 0
     df_one_hot = df_one_hot.astype(int)
     # Drop the original feature column and join one-hot encoding
-    df_result = df_result.drop(columns=[feature], axis=1)
+    df_result = df.drop(columns=[feature], axis=1)
     df_result = df_result.join(df_one_hot)
     return df_result
 
@@ -164,80 +135,137 @@ def revert_one_hot_encoding(df: pd.DataFrame, column_prefix: str, original_colum
     Returns:
     - pd.DataFrame: The DataFrame with the original column restored.
     """
-    df_result = df.copy()
-    
     # Filter out the one-hot encoded columns based on the prefix
     one_hot_columns = [col for col in df.columns if col.startswith(f"{column_prefix}_")]
     
     # Map one-hot encoded columns back to the original categorical column
-    df_result[original_column] = df_result[one_hot_columns].idxmax(axis=1).str[len(column_prefix) + 1:]
+    original_values = df[one_hot_columns].idxmax(axis=1).str[len(column_prefix) + 1:]
     
     # Drop the one-hot encoded columns
-    df_result = df_result.drop(columns=one_hot_columns)
+    df_result = df.drop(columns=one_hot_columns)
+    df_result[original_column] = original_values
     
     return df_result
 
 
-def split_training_data(
-    feature_view: hsfs.feature_view.FeatureView,
+def read_training_data(version: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    '''
+    Reads the factorized training data from the feature store: the hourly features (one row per hour) and the border
+    rows of the physical flows (datetime, country_from, country_to, energy_sent).
+    '''
+    hourly_features_fg = load.retrieve_feature_group(name='hourly_features', version=version)
+    physical_flow_fg = load.retrieve_feature_group(name='physical_flow', version=version)
+    return hourly_features_fg.read(), physical_flow_fg.read()
+
+
+def prepare_factorized_training_data(
+    hourly_features: pd.DataFrame,
+    flows: pd.DataFrame,
+    total_production: bool = True,
     test_start: pd.Timestamp = pd.Timestamp('2024-01-01', tz='UTC').normalize()
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     '''
-    Splits the data from the feature view into training and testing datasets.
+    Prepares the training and testing data from the factorized data, as the one-hot encoded flows joined to the hourly
+    features: the hourly features become a model dataset with the flows of its hours (with_flows), the flows are split
+    on test_start, and the model matrix row of every hour is only repeated for its borders when the model input is
+    built (border_model_input).
     '''
-    X_train, X_test, y_train, y_test = feature_view.train_test_split(test_start=test_start)
+    dataset = HourlyZoneDataset.from_frame(schema.apply_schema(hourly_features), [zone.lower() for zone in schema.ZONE_CODES])
+    dataset = dataset.with_flows(schema.apply_schema(flows))
+    if total_production:
+        columns = [column for column in COLUMNS_MODEL_TOTAL_PRODUCTION if column not in ('datetime', 'country_from', 'country_to')]
+    else:
+        columns_to_drop = ['total_generation_nl', 'total_generation_be', 'total_generation_de_lu', 'total_generation_dk_1', 'total_generation_gb',  'total_generation_no_2']
+        columns = [column for column in dataset.columns if column not in columns_to_drop]
+    matrix = dataset.model_matrix()
+    if not dataset.present.all():
+        matrix = matrix[:, dataset.present.ravel()]
+    positions = pd.Index(dataset.columns).get_indexer(columns)
+    if (positions < 0).any():
+        raise KeyError(f'Hourly features without the columns {[column for column, position in zip(columns, positions) if position < 0]}.')
+    # taken along the columns, so the hour rows stay contiguous for border_model_input
+    features = matrix.take(positions, axis=1)
+
+    is_test = (dataset.flows['datetime'] >= test_start).to_numpy()
+    splits = []
+    for rows in (np.flatnonzero(~is_test), np.flatnonzero(is_test)):
+        border_rows = dataset.flows.take(rows)
+        splits.append((
+            border_model_input(features, columns, dataset.flow_hours[rows], border_rows['country_from'], border_rows['country_to']),
+            border_rows[['energy_sent']].reset_index(drop=True)
+        ))
+    (X_train, y_train), (X_test, y_test) = splits
     return X_train, X_test, y_train, y_test
 
 
-def get_training_data(version: int, total_production: bool, create_fv: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def get_training_data(version: int, total_production: bool, build_features: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     '''
-    Loads the feature view from the feature store and splits the data into training and testing sets.
+    Loads the hourly features and the flows from the feature store and splits them into training and testing sets. The
+    hourly features are (re)built from the weather and prices_generation feature groups first with build_features.
     '''
-    feature_store = load.get_feature_store()
-
-    if create_fv:
-        feature_view = create_feature_view(version)
-    else:
-        feature_view = feature_store.get_feature_view(
-            name = 'cross_border_electricity_fv',
-            version = version
-        )
-    X_train, X_test, y_train, y_test = split_training_data(feature_view)
-    X_train_one_hot, X_test_one_hot = prepare_data_for_training(X_train, X_test, total_production) 
+    if build_features:
+        build_hourly_features(version)
+    hourly_features, flows = read_training_data(version)
+    X_train_one_hot, X_test_one_hot, y_train, y_test = prepare_factorized_training_data(hourly_features, flows, total_production)
+    print(f'Memory of the training data, as read from the feature store: {schema.memory_mb(hourly_features) + schema.memory_mb(flows):.1f} MB, '
+          f'as model input: {schema.memory_mb(X_train_one_hot) + schema.memory_mb(X_test_one_hot):.1f} MB.')
     return X_train_one_hot, X_test_one_hot, y_train, y_test
 
 
-def prepare_data_for_predictions(X: pd.DataFrame, total_production: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def border_model_input(features: np.ndarray, columns: List[str], hours: np.ndarray, countries_from, countries_to) -> pd.DataFrame:
     '''
-    Prepares the data for training by removing unnecessary columns, applying one-hot encoding, and dropping the datetime column.
+    Builds the model input of border rows from the hourly features (a row per hour): every row gets the features of its
+    hour, followed by the one-hot columns of get_dummies on its zones (from_<zone> and to_<zone> for all ZONE_CODES,
+    as 1 and 0). The hourly features are only repeated for the borders here.
     '''
-    X_result = X.copy()
-    # Apply one-hot encoding with prefixes
-    X_result = X_result.drop(columns = ['datetime'])
-    X_result = one_hot_encoding(X_result, 'country_from', prefix='from')
-    X_result = one_hot_encoding(X_result, 'country_to', prefix='to')
-    return X_result
+    X_result = schema.apply_schema(pd.DataFrame(features.take(hours, axis=0), columns=columns, copy=False))
+    one_hot = np.zeros((len(hours), 2 * len(schema.ZONE_CODES)), dtype=int)
+    rows = np.arange(len(hours))
+    one_hot[rows, schema.zone_codes(countries_from)] = 1
+    one_hot[rows, len(schema.ZONE_CODES) + schema.zone_codes(countries_to)] = 1
+    one_hot_columns = [f'{prefix}_{zone}' for prefix in ('from', 'to') for zone in schema.ZONE_CODES]
+    return pd.concat([X_result, pd.DataFrame(one_hot, columns=one_hot_columns, copy=False)], axis=1)
 
 
-def add_country_codes_for_prediction(X: pd.DataFrame) -> pd.DataFrame:
+def prediction_borders() -> List[Tuple[str, str]]:
     '''
-    Adds the country codes to the DataFrame.
+    Returns the borders to predict, as (country_from, country_to): NL to NEIGHBOUR_ZONES, then NEIGHBOUR_ZONES to NL.
     '''
-    df = X.copy()
+    return [('NL', zone) for zone in NEIGHBOUR_ZONES] + [(zone, 'NL') for zone in NEIGHBOUR_ZONES]
 
-    # Create combinations of NL to NEIGHBOUR_ZONES and NEIGHBOUR_ZONES to NL
-    combinations = [('NL', zone) for zone in NEIGHBOUR_ZONES] + [(zone, 'NL') for zone in NEIGHBOUR_ZONES]
 
-    # Create a DataFrame with every combination
-    expanded_rows = []
-    for index, row in df.iterrows():
-        for country_from, country_to in combinations:
-            new_row = row.copy()
-            new_row['country_from'] = country_from
-            new_row['country_to'] = country_to
-            expanded_rows.append(new_row)
+def _prediction_rows(dataset: HourlyZoneDataset) -> tuple:
+    '''
+    Returns the present columns of the model matrix of the forecast, and for every prediction row (each hour repeated
+    for each border of prediction_borders) its hour and its countries.
+    '''
+    combinations = prediction_borders()
+    matrix = dataset.model_matrix()
+    if not dataset.present.all():
+        matrix = matrix[:, dataset.present.ravel()]
+    countries_from, countries_to = (schema.zone_column(np.tile(schema.zone_codes(countries), len(matrix))) for countries in zip(*combinations))
+    hours = np.repeat(np.arange(len(matrix)), len(combinations))
+    return matrix, hours, countries_from, countries_to
 
-    # Create a new DataFrame with the expanded rows
-    expanded_df = pd.DataFrame(expanded_rows)
-    expanded_df.reset_index(drop=True, inplace=True) 
-    return expanded_df
+
+def prediction_features(dataset: HourlyZoneDataset) -> pd.DataFrame:
+    '''
+    Builds the model input of the predictions straight from the model dataset of the forecast: every hour of the model
+    matrix is joined to each border by border_model_input, without expanding, dropping and encoding a frame.
+    '''
+    matrix, hours, countries_from, countries_to = _prediction_rows(dataset)
+    return border_model_input(matrix, [column.lower() for column in dataset.columns], hours, countries_from, countries_to)
+
+
+def prediction_frame(dataset: HourlyZoneDataset) -> pd.DataFrame:
+    '''
+    Builds the frame of the predictions straight from the model dataset of the forecast: a row per hour and border of
+    prediction_borders, with the datetime, the features of the hour and the countries, without building the model data
+    frame first.
+    '''
+    matrix, hours, countries_from, countries_to = _prediction_rows(dataset)
+    df = pd.DataFrame(matrix[hours], columns=[column.lower() for column in dataset.columns], copy=False)
+    df.insert(0, 'datetime', dataset.datetimes[hours])
+    df['country_from'] = countries_from
+    df['country_to'] = countries_to
+    return schema.apply_schema(df)
@@ -1,7 +1,8 @@
+import functools
 import os
+import pandas as pd
 from pathlib import Path
-from typing import Union
-
+from typing import Callable, Union
 from dotenv import load_dotenv
 
 
@@ -41,4 +42,22 @@ def get_root_dir(default_value: str = ".") -> Path:
 ML_PIPELINE_ROOT_DIR = get_root_dir()
 PREDICTIONS_PATH = 'inference_pipeline/predictions/predictions.csv' 
 MAE_PATH = 'inference_pipeline/monitoring/mae_metrics.csv'
+HTTP_CACHE_PATH = '.cache/http_cache.sqlite'
+BACKFILL_CHECKPOINT_DIR = '.cache/backfill'
+CSV_CACHE_DIR = '.cache/csv'
 ENV_VARS = load_env_vars(root_dir=ML_PIPELINE_ROOT_DIR)
+
+# Run pandas with Copy-on-Write: selections and methods that return a new frame share the data until it is written to,
+# so the transforms do not need defensive copies of their inputs. Set around the pipeline runs (copy_on_write), not on import
+COPY_ON_WRITE = True
+
+
+def copy_on_write(function: Callable) -> Callable:
+    """
+    Runs a pipeline function with pandas Copy-on-Write set to COPY_ON_WRITE, also when it is called as a library.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with pd.option_context('mode.copy_on_write', COPY_ON_WRITE):
+            return function(*args, **kwargs)
+    return wrapper
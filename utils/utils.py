@@ -36,24 +36,17 @@ def get_model_registry(model_name: str = 'model', version: int = 1) -> str:
     return model_dir.download()
 
 
-def create_feature_view(version: int = 1) -> hsfs.feature_view.FeatureView:
+def build_hourly_features(version: int = 1) -> hsfs.feature_group.FeatureGroup:
     '''
-    Creates a feature view with the pivoted multi-country weather, generation, and energy price features for each timestamp, along with country_from and country_to.
+    Builds the hourly_features feature group, the pivoted multi-country weather, generation, and energy price features
+    for each timestamp, from the weather and prices_generation feature groups. There is no feature view of the flows
+    joined to these features: the training data joins them in memory (data.read_training_data), so the features of an
+    hour are not copied for every border.
     '''
-    feature_store = load.get_feature_store()
-    
-    weather_fg, prices_generation_fg, physical_flow_fg = _retrieve_feature_groups(version=version)
-    restructured_fg = transform.transform_data_for_feature_view(weather_fg, prices_generation_fg, physical_flow_fg, feature_store, version)
-    selected_features = restructured_fg.select_all()
-
-    feature_view = feature_store.create_feature_view(
-        name='cross_border_electricity_fv',
-        description='Cross-border electricity dataset with energy_sent as the target, combining pivoted multi-country weather, generation, and energy price features for each timestamp, along with country_from and country_to.',
-        version=version,
-        labels=['energy_sent'],
-        query=selected_features
-    )
-    return feature_view
+    weather_fg, prices_generation_fg, _ = _retrieve_feature_groups(version=version)
+    hourly_features_fg = load.get_or_create_hourly_features_fg(version)
+    load.insert_data_to_fg(transform.transform_hourly_features(weather_fg, prices_generation_fg), hourly_features_fg)
+    return hourly_features_fg
 
 
 def _retrieve_feature_groups(version: int = 1) -> Tuple[hsfs.feature_group.FeatureGroup, hsfs.feature_group.FeatureGroup, hsfs.feature_group.FeatureGroup]:
@@ -66,15 +59,6 @@ def _retrieve_feature_groups(version: int = 1) -> Tuple[hsfs.feature_group.Featu
     return weather_fg, prices_generation_fg, physical_flow_fg
 
 
-def get_feature_view(feature_view_name: str = 'cross_border_electricity_fv', version: int = 1) -> hsfs.feature_view.FeatureView:
-    '''
-    Returns the feature view from the feature store.
-    '''
-    feature_store = load.get_feature_store()
-    feature_view = feature_store.get_feature_view(feature_view_name, version=version)
-    return feature_view
-
-
 def get_feature_group(name: str, version: int = 1) -> hsfs.feature_group.FeatureGroup:
     '''
     Returns the feature group from the feature store.